@@ -2,7 +2,20 @@
 Init file for the asymmetric module.
 """
 
+from asymmetric.backends import CacheBackend, MemoryCacheBackend, SQLiteCacheBackend
+from asymmetric.configs import (
+    AdaptiveLimitConfig,
+    BatchConfig,
+    CacheConfig,
+    CompressionConfig,
+    DeltaConfig,
+    ExecutorConfig,
+    PrecomputeConfig,
+    RevalidateConfig,
+)
 from asymmetric.core import asymmetric_object as asymmetric
+from asymmetric.deadlines import remaining_time
+from asymmetric.disconnects import CancellationToken, cancellation_token
 
 version_info = (0, 3, 0)
 __version__ = ".".join([str(x) for x in version_info])
@@ -0,0 +1,327 @@
+"""
+A module for containing the storage backends of the result caches of
+asymmetric. Every cache stores its results in its own namespace of a
+backend, so one backend can be shared by every endpoint. The in-memory
+backend is local to each process, while the SQLite backend stores the
+results in a file shared by every worker of the host (and survives
+restarts).
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Tuple, Type
+
+# Amount of pending usage marks of the SQLite backend that get written at once
+TOUCH_BATCH_SIZE = 64
+
+
+class CacheEntry(NamedTuple):
+
+    """
+    An encoded result and the moment (in seconds since the epoch, so that
+    it means the same for every process) when it expires, or None if it
+    never does.
+    """
+
+    body: bytes
+    expires_at: Optional[float]
+
+
+class CacheBackend:
+
+    """
+    Base class of the cache backends. The entries of every namespace get
+    evicted least recently used first. Backends that block (doing I/O)
+    get used outside of the event loop, and their :errors count as cache
+    misses instead of failing the request.
+    """
+
+    blocking: bool = False
+    errors: Tuple[Type[Exception], ...] = ()
+
+    def get(self, namespace: str, key: str) -> Optional[CacheEntry]:
+        """
+        Returns the entry stored under :key (marking it as used), or None
+        if there is no entry.
+        """
+        raise NotImplementedError
+
+    def set(self, namespace: str, key: str, entry: CacheEntry) -> None:
+        """Stores :entry under :key, replacing the previous entry (if any)."""
+        raise NotImplementedError
+
+    def delete(self, namespace: str, key: str) -> None:
+        """Removes the entry stored under :key (if any)."""
+        raise NotImplementedError
+
+    def clear(self, namespace: str) -> None:
+        """Removes every entry of :namespace."""
+        raise NotImplementedError
+
+    def evict(
+        self,
+        namespace: str,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ) -> None:
+        """
+        Removes the least recently used entries of :namespace until there
+        are up to :max_entries entries using up to :max_bytes bytes.
+        """
+        raise NotImplementedError
+
+    def count(self, namespace: str) -> int:
+        """Returns the amount of entries of :namespace."""
+        raise NotImplementedError
+
+    def size(self, namespace: str) -> int:
+        """Returns the amount of bytes used by the entries of :namespace."""
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+
+    """
+    Cache backend that stores the entries in the memory of the process.
+    """
+
+    def __init__(self) -> None:
+        self.__entries: Dict[str, "OrderedDict[str, CacheEntry]"] = {}
+        self.__sizes: Dict[str, int] = {}
+
+    def get(self, namespace: str, key: str) -> Optional[CacheEntry]:
+        entries = self.__entries.get(namespace)
+        if entries is None or key not in entries:
+            return None
+        entries.move_to_end(key)
+        return entries[key]
+
+    def set(self, namespace: str, key: str, entry: CacheEntry) -> None:
+        self.delete(namespace, key)
+        self.__entries.setdefault(namespace, OrderedDict())[key] = entry
+        self.__sizes[namespace] = self.size(namespace) + len(entry.body)
+
+    def delete(self, namespace: str, key: str) -> None:
+        entries = self.__entries.get(namespace)
+        if entries is not None and key in entries:
+            self.__sizes[namespace] -= len(entries.pop(key).body)
+
+    def clear(self, namespace: str) -> None:
+        self.__entries.pop(namespace, None)
+        self.__sizes.pop(namespace, None)
+
+    def evict(
+        self,
+        namespace: str,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ) -> None:
+        entries = self.__entries.get(namespace)
+        while entries and (
+            (max_entries is not None and len(entries) > max_entries)
+            or (max_bytes is not None and self.__sizes[namespace] > max_bytes)
+        ):
+            self.delete(namespace, next(iter(entries)))
+
+    def count(self, namespace: str) -> int:
+        return len(self.__entries.get(namespace, ()))
+
+    def size(self, namespace: str) -> int:
+        return self.__sizes.get(namespace, 0)
+
+
+class SQLiteCacheBackend(CacheBackend):
+
+    """
+    Cache backend that stores the entries in a SQLite database file (in
+    WAL mode, so that the workers reading it don't block each other).
+    Every process opens its own connection to the file. To avoid a write
+    on every hit, the usage marks of the entries get written in batches.
+    """
+
+    blocking = True
+    errors = (sqlite3.Error,)
+
+    def __init__(self, path: str) -> None:
+        self.__path: str = path
+        self.__connection: Optional[sqlite3.Connection] = None
+        self.__pid: Optional[int] = None
+        self.__lock: threading.Lock = threading.Lock()
+        self.__touched: Dict[Tuple[str, str], float] = {}
+
+    @property
+    def path(self) -> str:
+        """Returns the path of the database file."""
+        return self.__path
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """
+        Returns the connection to the database of the current process. If
+        it does not exist, it creates it (and the table of the entries).
+        """
+        if self.__connection is None or self.__pid != os.getpid():
+            connection = sqlite3.connect(
+                self.__path, timeout=5, isolation_level=None, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "namespace TEXT NOT NULL, "
+                "key TEXT NOT NULL, "
+                "body BLOB NOT NULL, "
+                "size INTEGER NOT NULL, "
+                "expires_at REAL, "
+                "used_at REAL NOT NULL, "
+                "PRIMARY KEY (namespace, key))"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS entries_usage "
+                "ON entries (namespace, used_at)"
+            )
+            self.__connection = connection
+            self.__pid = os.getpid()
+            self.__touched.clear()
+        return self.__connection
+
+    def close(self) -> None:
+        """
+        Writes the pending usage marks and closes the connection of the
+        current process (if any).
+        """
+        with self.__lock:
+            if self.__connection is not None and self.__pid == os.getpid():
+                self.__flush_touched()
+                self.__connection.close()
+            self.__connection = None
+
+    def get(self, namespace: str, key: str) -> Optional[CacheEntry]:
+        with self.__lock:
+            row = self.connection.execute(
+                "SELECT body, expires_at FROM entries "
+                "WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+            if row is None:
+                return None
+            self.__touched[(namespace, key)] = time.time()
+            if len(self.__touched) >= TOUCH_BATCH_SIZE:
+                self.__flush_touched()
+        return CacheEntry(bytes(row[0]), row[1])
+
+    def set(self, namespace: str, key: str, entry: CacheEntry) -> None:
+        with self.__lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(namespace, key, body, size, expires_at, used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    namespace,
+                    key,
+                    entry.body,
+                    len(entry.body),
+                    entry.expires_at,
+                    time.time(),
+                ),
+            )
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self.__lock:
+            self.connection.execute(
+                "DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+            )
+
+    def clear(self, namespace: str) -> None:
+        with self.__lock:
+            self.connection.execute(
+                "DELETE FROM entries WHERE namespace = ?", (namespace,)
+            )
+
+    def evict(
+        self,
+        namespace: str,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ) -> None:
+        if max_entries is None and max_bytes is None:
+            return
+        with self.__lock:
+            self.__flush_touched()
+            count, size = self.connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries "
+                "WHERE namespace = ?",
+                (namespace,),
+            ).fetchone()
+            if (max_entries is None or count <= max_entries) and (
+                max_bytes is None or size <= max_bytes
+            ):
+                return
+            cutoff = self.__get_eviction_cutoff(namespace, max_entries, max_bytes)
+            if cutoff is None:
+                return
+            used_at, rowid = cutoff
+            self.connection.execute(
+                "DELETE FROM entries WHERE namespace = ? "
+                "AND (used_at < ? OR (used_at = ? AND rowid <= ?))",
+                (namespace, used_at, used_at, rowid),
+            )
+
+    def count(self, namespace: str) -> int:
+        with self.__lock:
+            return self.connection.execute(
+                "SELECT COUNT(*) FROM entries WHERE namespace = ?", (namespace,)
+            ).fetchone()[0]
+
+    def size(self, namespace: str) -> int:
+        with self.__lock:
+            return self.connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM entries WHERE namespace = ?",
+                (namespace,),
+            ).fetchone()[0]
+
+    def __get_eviction_cutoff(
+        self, namespace: str, max_entries: Optional[int], max_bytes: Optional[int]
+    ) -> Optional[Tuple[float, int]]:
+        """
+        Returns the usage mark and the rowid of the most recently used
+        entry of :namespace that doesn't fit in the limits (every entry
+        used before it doesn't fit either), or None if every entry fits.
+        """
+        rows = self.connection.execute(
+            "SELECT used_at, rowid, size FROM entries WHERE namespace = ? "
+            "ORDER BY used_at DESC, rowid DESC",
+            (namespace,),
+        )
+        total = 0
+        try:
+            for position, (used_at, rowid, size) in enumerate(rows, start=1):
+                total += size
+                if (max_entries is not None and position > max_entries) or (
+                    max_bytes is not None and total > max_bytes
+                ):
+                    return used_at, rowid
+        finally:
+            rows.close()
+        return None
+
+    def __flush_touched(self) -> None:
+        """
+        Writes the pending usage marks of the entries (with the lock
+        already held). An entry replaced after its mark keeps its newer one.
+        """
+        if not self.__touched:
+            return
+        touched = [
+            (used_at, namespace, key)
+            for (namespace, key), used_at in self.__touched.items()
+        ]
+        self.__touched.clear()
+        self.connection.executemany(
+            "UPDATE entries SET used_at = MAX(used_at, ?) "
+            "WHERE namespace = ? AND key = ?",
+            touched,
+        )
@@ -0,0 +1,162 @@
+"""
+A module for containing the micro-batching logic of asymmetric.
+Concurrent calls to a batched endpoint get collected and run as a
+single call, where every parameter receives the list of the values
+of every collected call.
+"""
+
+import asyncio
+from concurrent.futures import Executor
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from asymmetric.configs import BatchConfig
+from asymmetric.errors import InvalidBatchingError, InvalidBatchResultError
+from asymmetric.plans import CallPlan
+from asymmetric.utils import generic_call, get_detached_context, start_detached
+
+PendingCall = Tuple[Dict[str, Any], "asyncio.Future[Any]"]
+
+
+def validate_batching(
+    config: BatchConfig,
+    plan: CallPlan,
+    callback: Any = False,
+    stream_body: bool = False,
+) -> None:
+    """
+    Raises an error if :config is invalid or if the function of :plan
+    can't be batched.
+    """
+    name = plan.function.__qualname__
+    if config.max_size < 1:
+        raise InvalidBatchingError(
+            f"Invalid batch size '{config.max_size}'. The batch size must be "
+            "a positive integer."
+        )
+    if config.max_wait_ms < 0:
+        raise InvalidBatchingError(
+            f"Invalid batch wait '{config.max_wait_ms}'. The batch wait can't "
+            "be negative."
+        )
+    if plan.is_generator or plan.is_async_generator:
+        raise InvalidBatchingError(f"Function '{name}' is a generator.")
+    if callback:
+        raise InvalidBatchingError(f"Function '{name}' is a callback.")
+    if stream_body:
+        raise InvalidBatchingError(f"Function '{name}' receives a streamed body.")
+
+
+class Batcher:
+
+    """
+    Class to collect the concurrent calls of a function into batches. A
+    batch gets run when :max_size calls were collected or :max_wait_ms
+    milliseconds after its first call, whatever happens first.
+    """
+
+    def __init__(self, config: BatchConfig, plan: CallPlan) -> None:
+        self.__config: BatchConfig = config
+        self.__plan: CallPlan = plan
+        self.__pending: List[PendingCall] = []
+        self.__executor: Optional[Executor] = None
+        self.__timer: Optional[asyncio.TimerHandle] = None
+        self.__running: Set["asyncio.Future[Any]"] = set()
+        self.__batch_count: int = 0
+
+    @property
+    def config(self) -> BatchConfig:
+        """Returns the batch configuration."""
+        return self.__config
+
+    @property
+    def pending(self) -> int:
+        """Returns the amount of calls waiting for their batch to run."""
+        return len(self.__pending)
+
+    @property
+    def batch_count(self) -> int:
+        """Returns the amount of batches run so far."""
+        return self.__batch_count
+
+    async def submit(
+        self, params: Dict[str, Any], executor: Optional[Executor] = None
+    ) -> Any:
+        """
+        Adds a call with :params to the current batch and waits for its own
+        result (cancelling the wait doesn't cancel the batch). Sync functions
+        get run inside :executor (if given).
+        """
+        params = self.__complete_params(params)
+        future = asyncio.get_event_loop().create_future()
+        self.__pending.append((params, future))
+        self.__executor = executor
+        if len(self.__pending) >= self.__config.max_size:
+            self.__flush()
+        elif self.__timer is None:
+            self.__timer = asyncio.get_event_loop().call_later(
+                self.__config.max_wait_ms / 1000,
+                self.__flush,
+                context=get_detached_context(),
+            )
+        return await future
+
+    def __complete_params(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Fills the missing params of a call using the defaults."""
+        missing = [
+            arg
+            for arg in self.__plan.args
+            if arg not in params and arg not in self.__plan.defaults
+        ]
+        if missing:
+            raise TypeError(
+                f"{self.__plan.function.__qualname__}() missing required "
+                "arguments: " + ", ".join(f"'{arg}'" for arg in missing)
+            )
+        return {
+            arg: params[arg] if arg in params else self.__plan.defaults[arg]
+            for arg in self.__plan.args
+        }
+
+    def __flush(self) -> None:
+        """Takes the pending calls out as a batch and runs it."""
+        if self.__timer is not None:
+            self.__timer.cancel()
+            self.__timer = None
+        batch, self.__pending = self.__pending, []
+        if not batch:
+            return
+        # The batch serves every call, so it runs detached from the request
+        # that completed it
+        task = start_detached(self.__run(batch, self.__executor))
+        # Keep a reference to the task until it finishes
+        self.__running.add(task)
+        task.add_done_callback(self.__running.discard)
+
+    async def __run(
+        self, batch: List[PendingCall], executor: Optional[Executor]
+    ) -> None:
+        """Runs :batch as a single call and hands each call its result."""
+        self.__batch_count += 1
+        columns = {
+            arg: [params[arg] for params, _ in batch] for arg in self.__plan.args
+        }
+        try:
+            results = await generic_call(
+                self.__plan.function, columns, plan=self.__plan, executor=executor
+            )
+            if hasattr(results, "tolist"):  # Turn arrays into plain lists
+                results = results.tolist()
+            if not isinstance(results, (list, tuple)) or len(results) != len(batch):
+                raise InvalidBatchResultError(
+                    f"Function '{self.__plan.function.__qualname__}' must return "
+                    f"a list with one result for each of the {len(batch)} calls "
+                    "of the batch."
+                )
+        except Exception as error:  # pylint: disable=W0703
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():  # The call could have been cancelled
+                future.set_result(result)
@@ -0,0 +1,329 @@
+"""
+A module for containing the result caching logic of asymmetric. The
+results get stored already encoded, so a cache hit skips both the call
+and the encoding of the result.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from asymmetric.backends import CacheBackend, CacheEntry, MemoryCacheBackend
+from asymmetric.configs import CacheConfig, RevalidateConfig
+from asymmetric.errors import InvalidCachingError
+from asymmetric.loggers import log
+from asymmetric.plans import CallPlan
+from asymmetric.utils import filter_params, start_detached
+
+
+def validate_caching(
+    config: Union[CacheConfig, RevalidateConfig],
+    plan: CallPlan,
+    callback: Any = False,
+    stream_body: bool = False,
+    chunk_size: Optional[int] = None,
+) -> None:
+    """
+    Raises an error if :config is invalid or if the results of the
+    function of :plan can't be cached.
+    """
+    name = plan.function.__qualname__
+    for field, value in config._asdict().items():
+        if isinstance(value, (int, float)) and value <= 0:
+            raise InvalidCachingError(
+                f"Invalid cache {field} '{value}'. It must be positive (or None)."
+            )
+    if isinstance(config, RevalidateConfig) and config.hard_ttl < config.soft_ttl:
+        raise InvalidCachingError(
+            f"Invalid cache hard_ttl '{config.hard_ttl}'. It can't be smaller "
+            f"than the soft_ttl ('{config.soft_ttl}')."
+        )
+    if plan.is_generator or plan.is_async_generator:
+        raise InvalidCachingError(f"Function '{name}' is a generator.")
+    if callback:
+        raise InvalidCachingError(f"Function '{name}' is a callback.")
+    if stream_body:
+        raise InvalidCachingError(f"Function '{name}' receives a streamed body.")
+    if chunk_size is not None:
+        raise InvalidCachingError(
+            f"Function '{name}' sends its results in chunks, so they can't be "
+            "cached as a whole."
+        )
+
+
+def get_cache_key(params: Dict[str, Any]) -> str:
+    """
+    Returns a canonical hash of :params (the same params, in any order,
+    always get the same key).
+    """
+    canonical = json.dumps(
+        params,
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=repr,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+
+    """
+    Class to cache the encoded results of a function, keyed by the hash
+    of its params. The results get stored in the :namespace of the backend
+    of the configuration (a new in-memory backend if there is none).
+    """
+
+    def __init__(
+        self, config: CacheConfig, plan: CallPlan, namespace: Optional[str] = None
+    ) -> None:
+        self.__config: CacheConfig = config
+        self.__plan: CallPlan = plan
+        self.__backend: CacheBackend = config.backend or MemoryCacheBackend()
+        self.__namespace: str = namespace or (
+            f"{plan.function.__module__}.{plan.function.__qualname__}"
+        )
+        self.__hits: int = 0
+        self.__misses: int = 0
+
+    @property
+    def config(self) -> CacheConfig:
+        """Returns the cache configuration."""
+        return self.__config
+
+    @property
+    def backend(self) -> CacheBackend:
+        """Returns the backend storing the results."""
+        return self.__backend
+
+    @property
+    def namespace(self) -> str:
+        """Returns the namespace of the results inside the backend."""
+        return self.__namespace
+
+    @property
+    def hits(self) -> int:
+        """Returns the amount of lookups that found a cached result."""
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        """Returns the amount of lookups that found no cached result."""
+        return self.__misses
+
+    @property
+    def size(self) -> int:
+        """Returns the amount of bytes used by the cached results."""
+        return self.__backend.size(self.__namespace)
+
+    def __len__(self) -> int:
+        return self.__backend.count(self.__namespace)
+
+    def key(self, params: Dict[str, Any]) -> str:
+        """Returns the cache key of the (already filtered) :params."""
+        return get_cache_key(params)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Returns the result cached under :key, or None if there is no result,
+        if it expired or if the backend failed.
+        """
+        try:
+            entry = self.__backend.get(self.__namespace, key)
+            if entry is not None and (
+                entry.expires_at is None or entry.expires_at > time.time()
+            ):
+                self.__hits += 1
+                return entry.body
+            if entry is not None:
+                self.__backend.delete(self.__namespace, key)
+        except self.__backend.errors as error:
+            log(f"Error while reading the cache: {error}", level="warning")
+        self.__misses += 1
+        return None
+
+    def set(self, key: str, body: bytes) -> None:
+        """
+        Caches the encoded result :body under :key, evicting the least
+        recently used results if needed. Results bigger than the whole
+        cache (or that the backend fails to store) don't get cached.
+        """
+        if self.__config.max_bytes is not None and len(body) > self.__config.max_bytes:
+            return
+        expires_at = (
+            time.time() + self.__config.ttl if self.__config.ttl is not None else None
+        )
+        try:
+            self.__backend.set(self.__namespace, key, CacheEntry(body, expires_at))
+            self.__backend.evict(
+                self.__namespace,
+                max_entries=self.__config.max_entries,
+                max_bytes=self.__config.max_bytes,
+            )
+        except self.__backend.errors as error:
+            log(f"Error while writing the cache: {error}", level="warning")
+
+    async def fetch(
+        self, key: str, executor: Optional[Executor] = None
+    ) -> Optional[bytes]:
+        """
+        Returns the result cached under :key (just like get), reading it
+        inside :executor if the backend blocks.
+        """
+        if not self.__backend.blocking:
+            return self.get(key)
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(executor, self.get, key)
+
+    async def store(
+        self, key: str, body: bytes, executor: Optional[Executor] = None
+    ) -> None:
+        """
+        Caches the encoded result :body under :key (just like set), writing
+        it inside :executor if the backend blocks.
+        """
+        if not self.__backend.blocking:
+            self.set(key, body)
+            return
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(executor, self.set, key, body)
+
+    def invalidate(self, params: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Removes the result cached for :params (filtered just like the
+        params of a request), or every cached result if no params are given.
+        """
+        if params is None:
+            self.__backend.clear(self.__namespace)
+            return
+        key = self.key(filter_params(self.__plan.function, params, plan=self.__plan))
+        self.__backend.delete(self.__namespace, key)
+
+
+class RevalidatingCache:
+
+    """
+    Class to cache the encoded results of a function, serving them while
+    stale. Results older than the soft TTL get returned immediately while
+    a single refresh runs in the background, and results older than the
+    hard TTL (or missing) make the callers wait for the refresh.
+    """
+
+    def __init__(self, config: RevalidateConfig, plan: CallPlan) -> None:
+        self.__config: RevalidateConfig = config
+        self.__plan: CallPlan = plan
+        self.__entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self.__refreshes: Dict[str, "asyncio.Future[bytes]"] = {}
+        self.__hits: int = 0
+        self.__stale_hits: int = 0
+        self.__misses: int = 0
+
+    @property
+    def config(self) -> RevalidateConfig:
+        """Returns the cache configuration."""
+        return self.__config
+
+    @property
+    def hits(self) -> int:
+        """Returns the amount of lookups that found a fresh result."""
+        return self.__hits
+
+    @property
+    def stale_hits(self) -> int:
+        """Returns the amount of lookups that got served a stale result."""
+        return self.__stale_hits
+
+    @property
+    def misses(self) -> int:
+        """Returns the amount of lookups that had to wait for a refresh."""
+        return self.__misses
+
+    @property
+    def refreshing(self) -> int:
+        """Returns the amount of results being refreshed."""
+        return len(self.__refreshes)
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def key(self, params: Dict[str, Any]) -> str:
+        """Returns the cache key of the (already filtered) :params."""
+        return get_cache_key(params)
+
+    async def get(self, key: str, compute: Callable[[], Awaitable[bytes]]) -> bytes:
+        """
+        Returns the result cached under :key, using :compute to get the
+        encoded result when it needs to be refreshed.
+        """
+        entry = self.__entries.get(key)
+        age = time.monotonic() - entry[1] if entry is not None else float("inf")
+        if entry is not None and age < self.__config.hard_ttl:
+            self.__entries.move_to_end(key)
+            if age < self.__config.soft_ttl:
+                self.__hits += 1
+            else:
+                self.__stale_hits += 1
+                self.__refresh(key, compute)
+            return entry[0]
+        self.__misses += 1
+        # Don't let a cancelled caller cancel the refresh for the others
+        return await asyncio.shield(self.__refresh(key, compute))
+
+    def invalidate(self, params: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Removes the result cached for :params (filtered just like the
+        params of a request), or every cached result if no params are given.
+        """
+        if params is None:
+            self.__entries.clear()
+            return
+        key = self.key(filter_params(self.__plan.function, params, plan=self.__plan))
+        self.__entries.pop(key, None)
+
+    def __refresh(
+        self, key: str, compute: Callable[[], Awaitable[bytes]]
+    ) -> "asyncio.Future[bytes]":
+        """
+        Starts refreshing the result of :key in the background (unless it
+        is already being refreshed) and returns the refresh. The refresh
+        runs detached from the request that started it.
+        """
+        refresh = self.__refreshes.get(key)
+        if refresh is None:
+            refresh = start_detached(self.__store(key, compute))
+            self.__refreshes[key] = refresh
+            refresh.add_done_callback(lambda _: self.__forget(key))
+        return refresh
+
+    def __forget(self, key: str) -> None:
+        """Forgets the finished refresh of :key."""
+        refresh = self.__refreshes.pop(key)
+        if not refresh.cancelled():
+            refresh.exception()  # Background errors were already logged
+
+    async def __store(self, key: str, compute: Callable[[], Awaitable[bytes]]) -> bytes:
+        """Computes the result of :key and caches it."""
+        try:
+            body = await compute()
+        except Exception as error:
+            if key in self.__entries:  # The stale result keeps being served
+                log(f"Error while refreshing a cached result: {error}", level="error")
+            raise
+        self.__entries[key] = (body, time.monotonic())
+        self.__entries.move_to_end(key)
+        max_entries = self.__config.max_entries
+        while max_entries is not None and len(self.__entries) > max_entries:
+            self.__entries.popitem(last=False)
+        return body
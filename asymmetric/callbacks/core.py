@@ -3,6 +3,8 @@ A module for asymmetric's core callback logic.
 """
 
 import asyncio
+import inspect
+from concurrent.futures import Executor
 from typing import Any, Callable, Dict, Optional, Union
 
 import httpx
@@ -10,9 +12,13 @@ from starlette.datastructures import Headers
 from starlette.responses import JSONResponse
 
 from asymmetric.callbacks.utils import get_header_finders, validate_callback_data
+from asymmetric.codecs import JSONCodec
 from asymmetric.constants import HTTP_METHODS
+from asymmetric.deadlines import check_deadline, get_call_timeout, remaining_time
 from asymmetric.errors import InvalidCallbackHeadersError, InvalidCallbackObjectError
 from asymmetric.loggers import log
+from asymmetric.plans import CallPlan
+from asymmetric.streaming import iterate_chunks
 from asymmetric.utils import generic_call
 
 
@@ -23,9 +29,15 @@ class CallbackClient:
     """
 
     def __init__(
-        self, function: Callable[..., Any], callback: Union[Dict[str, Any], bool]
+        self,
+        function: Callable[..., Any],
+        callback: Union[Dict[str, Any], bool],
+        plan: Optional[CallPlan] = None,
+        timeout: Optional[float] = None,
     ) -> None:
         self.__function = function
+        self.__plan = plan
+        self.__timeout = timeout
         self.__attribute_finders = self.__prepare_and_validate_finders(callback)
         self.__headers = Headers()
         self.__params: Dict[str, str] = {}
@@ -53,10 +65,18 @@ class CallbackClient:
             return self.__headers.get(location)
         return None
 
-    def handle_callback(self, headers: Headers, params: Dict[str, Any]) -> JSONResponse:
+    def handle_callback(
+        self,
+        headers: Headers,
+        params: Dict[str, Any],
+        executor: Optional[Executor] = None,
+        codec: Optional[JSONCodec] = None,
+    ) -> JSONResponse:
         """
         Validates that the callback data from the request is correct
-        and delegates the main function call. Returns a JSON response.
+        and delegates the main function call (to :executor, if given,
+        when the function is sync). The callback body gets encoded by
+        :codec, if given. Returns a JSON response.
         """
         if self.__invalid_callback_object:
             # Callback object was defective, server should have stopped
@@ -74,7 +94,7 @@ class CallbackClient:
             self.__validate_callback_http_method()
 
             # Delegate function
-            asyncio.ensure_future(self.__callback_call())
+            asyncio.ensure_future(self.__callback_call(executor, codec))
 
             return JSONResponse({}, status_code=202)
         except InvalidCallbackHeadersError as error:
@@ -82,7 +102,7 @@ class CallbackClient:
 
     @staticmethod
     def __prepare_and_validate_finders(
-        callback: Union[Dict[str, Any], bool]
+        callback: Union[Dict[str, Any], bool],
     ) -> Dict[str, str]:
         """
         Collects and returns the callback data finders and validates
@@ -111,20 +131,43 @@ class CallbackClient:
         if self.http_method.lower() not in HTTP_METHODS:
             raise InvalidCallbackHeadersError("Invalid callback HTTP method")
 
-    async def __callback_call(self) -> None:
+    async def __callback_call(
+        self, executor: Optional[Executor] = None, codec: Optional[JSONCodec] = None
+    ) -> None:
         """
-        Executes the function and makes the request to the callback endpoint.
+        Executes the function and makes the request to the callback endpoint,
+        within the time left until the deadline of the request (if any).
         """
         try:
-            response = await generic_call(self.__function, self.__params)
+            response = await generic_call(
+                self.__function,
+                self.__params,
+                plan=self.__plan,
+                executor=executor,
+                timeout=get_call_timeout(self.__timeout),
+            )
+            if inspect.isgenerator(response) or inspect.isasyncgen(response):
+                # Generators can't be streamed to the callback, collect them
+                response = [
+                    item
+                    async for chunk in iterate_chunks(response, executor)
+                    for item in chunk
+                ]
             if self.custom_key is not None:
                 response = {self.custom_key: response}
 
-            async with httpx.AsyncClient() as client:
+            # Don't keep calling back after the deadline of the request
+            check_deadline()
+            options: Dict[str, Any] = {}
+            remaining = remaining_time()
+            if remaining is not None:
+                options["timeout"] = remaining
+            async with httpx.AsyncClient(**options) as client:
                 await client.request(
                     self.http_method,
                     self.url,
-                    json=response,
+                    content=(codec or JSONCodec()).dumps(response),
+                    headers={"Content-Type": "application/json"},
                 )
         except Exception as error:
             message = "Error while executing the delegated method: "
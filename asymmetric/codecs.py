@@ -0,0 +1,150 @@
+"""
+A module for containing the JSON codecs of asymmetric. Every codec but
+the standard one depends on an optional package, so they get imported
+only when the codec gets instantiated.
+"""
+
+import json
+from importlib import import_module
+from typing import Any, Dict, List, Optional, Type, Union
+
+
+class JSONCodec:
+
+    """
+    Base class to encode data to JSON and decode JSON into data. Uses
+    the standard library json module.
+    """
+
+    name = "json"
+
+    def dumps(self, data: Any, pretty: bool = False) -> bytes:
+        """
+        Encodes :data into compact JSON bytes, or into indented JSON
+        bytes if :pretty is True (meant for humans, so it allows NaNs).
+        """
+        return json.dumps(
+            data,
+            ensure_ascii=False,
+            allow_nan=pretty,
+            indent=2 if pretty else None,
+            separators=None if pretty else (",", ":"),
+        ).encode("utf-8")
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """
+        Decodes the JSON :data. Raises a ValueError if it is not valid JSON.
+        """
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+
+    """
+    JSON codec that uses the orjson package.
+    """
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        self.__orjson: Any = import_module("orjson")
+        self.__options: int = (
+            self.__orjson.OPT_NON_STR_KEYS | self.__orjson.OPT_SERIALIZE_NUMPY
+        )
+
+    def dumps(self, data: Any, pretty: bool = False) -> bytes:
+        """
+        Encodes :data into compact JSON bytes, or into indented JSON
+        bytes if :pretty is True.
+        """
+        options = self.__options
+        if pretty:
+            options |= self.__orjson.OPT_INDENT_2
+        return self.__orjson.dumps(data, option=options)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """
+        Decodes the JSON :data. Raises a ValueError if it is not valid JSON.
+        """
+        return self.__orjson.loads(data)
+
+
+class UjsonCodec(JSONCodec):
+
+    """
+    JSON codec that uses the ujson package.
+    """
+
+    name = "ujson"
+
+    def __init__(self) -> None:
+        self.__ujson: Any = import_module("ujson")
+
+    def dumps(self, data: Any, pretty: bool = False) -> bytes:
+        """
+        Encodes :data into compact JSON bytes, or into indented JSON
+        bytes if :pretty is True.
+        """
+        return self.__ujson.dumps(
+            data, ensure_ascii=False, indent=2 if pretty else 0
+        ).encode("utf-8")
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """
+        Decodes the JSON :data. Raises a ValueError if it is not valid JSON.
+        """
+        return self.__ujson.loads(data)
+
+
+class RapidjsonCodec(JSONCodec):
+
+    """
+    JSON codec that uses the python-rapidjson package.
+    """
+
+    name = "rapidjson"
+
+    def __init__(self) -> None:
+        self.__rapidjson: Any = import_module("rapidjson")
+
+    def dumps(self, data: Any, pretty: bool = False) -> bytes:
+        """
+        Encodes :data into compact JSON bytes, or into indented JSON
+        bytes if :pretty is True.
+        """
+        return self.__rapidjson.dumps(
+            data, ensure_ascii=False, indent=2 if pretty else None
+        ).encode("utf-8")
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """
+        Decodes the JSON :data. Raises a ValueError if it is not valid JSON.
+        """
+        return self.__rapidjson.loads(data)
+
+
+# Codecs ordered by preference
+CODECS: List[Type[JSONCodec]] = [OrjsonCodec, UjsonCodec, RapidjsonCodec, JSONCodec]
+CODECS_BY_NAME: Dict[str, Type[JSONCodec]] = {codec.name: codec for codec in CODECS}
+
+
+def get_codec(name: Optional[str] = None) -> JSONCodec:
+    """
+    Returns the codec named :name. If no name is given, returns the
+    fastest codec whose package is installed, falling back to the
+    standard library.
+    """
+    if name is not None:
+        if name not in CODECS_BY_NAME:
+            raise ValueError(
+                f"Invalid JSON codec '{name}'. Valid JSON codecs are "
+                + ", ".join(f"'{codec}'" for codec in CODECS_BY_NAME)
+                + "."
+            )
+        return CODECS_BY_NAME[name]()
+    for codec in CODECS:
+        try:
+            return codec()
+        except ImportError:
+            continue
+    return JSONCodec()  # pragma: no cover
@@ -0,0 +1,304 @@
+"""
+A module for containing the response compression logic of asymmetric.
+Responses get compressed with the best encoding accepted by the client
+(brotli, if its package is installed, then gzip and deflate). Every
+compressor but the zlib ones depends on an optional package, so they get
+imported only when the compressor gets instantiated.
+"""
+
+import asyncio
+import zlib
+from functools import lru_cache
+from importlib import import_module
+from typing import Any, Callable, Dict, List, Optional, Type, Union
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from asymmetric.configs import CompressionConfig
+from asymmetric.constants import (
+    COMPRESSIBLE_MEDIA_TYPES,
+    COMPRESSION_SCOPE_KEY,
+    NO_BODY_STATUS_CODES,
+)
+from asymmetric.errors import InvalidCompressionError
+from asymmetric.etags import get_encoded_etag
+from asymmetric.executors import Executors
+
+
+def validate_compression(config: CompressionConfig) -> None:
+    """Raises an error if :config is invalid."""
+    if not 1 <= config.level <= 9:
+        raise InvalidCompressionError(
+            f"Invalid compression level '{config.level}'. It must be between "
+            "1 and 9."
+        )
+    if not 0 <= config.brotli_quality <= 11:
+        raise InvalidCompressionError(
+            f"Invalid brotli quality '{config.brotli_quality}'. It must be "
+            "between 0 and 11."
+        )
+    for field in ("minimum_size", "offload_size"):
+        if getattr(config, field) < 0:
+            raise InvalidCompressionError(
+                f"Invalid compression {field} '{getattr(config, field)}'. It "
+                "can't be negative."
+            )
+
+
+class Compressor:
+
+    """
+    Base class to compress a body (or a stream of chunks) incrementally.
+    Uses the gzip format of the standard library zlib module.
+    """
+
+    encoding = "gzip"
+    wbits = 16 + zlib.MAX_WBITS
+
+    def __init__(self, config: CompressionConfig) -> None:
+        self.__compressor: Any = zlib.compressobj(
+            config.level, zlib.DEFLATED, self.wbits
+        )
+
+    def compress(self, data: bytes) -> bytes:
+        """
+        Compresses :data, flushing it so that the client can decompress
+        every chunk as soon as it arrives.
+        """
+        return self.__compressor.compress(data) + self.__compressor.flush(
+            zlib.Z_SYNC_FLUSH
+        )
+
+    def finish(self, data: bytes = b"") -> bytes:
+        """Compresses the last :data and ends the compressed stream."""
+        return self.__compressor.compress(data) + self.__compressor.flush()
+
+
+class DeflateCompressor(Compressor):
+
+    """
+    Compressor that uses the deflate format (zlib-wrapped, as HTTP says)
+    of the standard library zlib module.
+    """
+
+    encoding = "deflate"
+    wbits = zlib.MAX_WBITS
+
+
+class BrotliCompressor(Compressor):
+
+    """
+    Compressor that uses the brotli package.
+    """
+
+    encoding = "br"
+
+    def __init__(self, config: CompressionConfig) -> None:  # pylint: disable=W0231
+        brotli = import_module("brotli")
+        self.__compressor: Any = brotli.Compressor(quality=config.brotli_quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.__compressor.process(data) + self.__compressor.flush()
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self.__compressor.process(data) + self.__compressor.finish()
+
+
+# Compressors ordered by preference
+COMPRESSORS: List[Type[Compressor]] = [BrotliCompressor, Compressor, DeflateCompressor]
+
+
+@lru_cache(maxsize=None)
+def get_compressors() -> Dict[str, Type[Compressor]]:
+    """
+    Returns the compressors whose package is installed, by encoding (in
+    order of preference).
+    """
+    compressors = {}
+    for compressor in COMPRESSORS:
+        try:
+            compressor(CompressionConfig())
+        except ImportError:
+            continue
+        compressors[compressor.encoding] = compressor
+    return compressors
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Returns the preferred encoding of the Accept-Encoding header (the one
+    with the highest quality, breaking ties using the order of preference
+    of the compressors), or None if no available encoding is accepted.
+    """
+    qualities: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        encoding, *params = [part.strip() for part in item.split(";")]
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if encoding:
+            qualities[encoding.lower()] = quality
+    candidates = [
+        (qualities.get(encoding, qualities.get("*", 0.0)), -index, encoding)
+        for index, encoding in enumerate(get_compressors())
+    ]
+    quality, _, encoding = max(candidates, default=(0.0, 0, ""))
+    return encoding if quality > 0 else None
+
+
+def is_compressible(content_type: str) -> bool:
+    """Returns True if the :content_type is worth compressing."""
+    media_type = content_type.split(";")[0].strip().lower()
+    return media_type.startswith("text/") or any(
+        media_type.endswith(suffix) for suffix in COMPRESSIBLE_MEDIA_TYPES
+    )
+
+
+class CompressionMiddleware:  # pylint: disable=R0903
+
+    """
+    ASGI middleware to compress the responses of the app. The endpoints
+    can tune (or disable) the compression of their responses by storing
+    their own configuration (or False) in the request scope.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        get_config: Callable[[], Optional[CompressionConfig]],
+        executors: Executors,
+    ) -> None:
+        self.__app: ASGIApp = app
+        self.__get_config: Callable[[], Optional[CompressionConfig]] = get_config
+        self.__executors: Executors = executors
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+            if encoding is not None:
+                responder = CompressionResponder(
+                    scope, send, encoding, self.__get_config, self.__executors
+                )
+                await self.__app(scope, receive, responder.send)
+                return
+        await self.__app(scope, receive, send)
+
+
+class CompressionResponder:  # pylint: disable=R0902,R0903
+
+    """
+    Class to compress the messages of a single response before sending
+    them. Bodies smaller than the minimum size of the configuration get
+    sent as they are, and bodies bigger than its offload size get
+    compressed in the thread pool, so they don't block the event loop.
+    """
+
+    def __init__(
+        self,
+        scope: Scope,
+        send: Send,
+        encoding: str,
+        get_config: Callable[[], Optional[CompressionConfig]],
+        executors: Executors,
+    ) -> None:
+        self.__scope: Scope = scope
+        self.__send: Send = send
+        self.__encoding: str = encoding
+        self.__get_config: Callable[[], Optional[CompressionConfig]] = get_config
+        self.__executors: Executors = executors
+        self.__start: Optional[Message] = None
+        self.__config: Optional[CompressionConfig] = None
+        self.__compressor: Optional[Compressor] = None
+
+    async def send(self, message: Message) -> None:
+        """Compresses :message (if needed) and sends it."""
+        if message["type"] == "http.response.start":
+            self.__start = message
+            return
+        if message["type"] != "http.response.body":
+            await self.__send(message)
+            return
+        if self.__start is not None:
+            start, self.__start = self.__start, None
+            await self.__send_first(start, message)
+            return
+        if self.__compressor is None or self.__config is None:
+            await self.__send(message)
+            return
+        more_body = message.get("more_body", False)
+        body = await self.__run(
+            self.__compressor.compress if more_body else self.__compressor.finish,
+            message.get("body", b""),
+        )
+        await self.__send(
+            {"type": "http.response.body", "body": body, "more_body": more_body}
+        )
+
+    async def __send_first(self, start: Message, message: Message) -> None:
+        """
+        Sends the :start of the response and its first body :message,
+        deciding whether the response gets compressed.
+        """
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        headers = MutableHeaders(raw=start["headers"])
+        self.__config = (
+            None
+            if start["status"] in NO_BODY_STATUS_CODES
+            else self.__get_response_config()
+        )
+        if (
+            self.__config is None
+            or "content-encoding" in headers
+            or not is_compressible(headers.get("content-type", ""))
+            or (not more_body and len(body) < self.__config.minimum_size)
+        ):
+            await self.__send(start)
+            await self.__send(message)
+            return
+
+        self.__compressor = get_compressors()[self.__encoding](self.__config)
+        headers["content-encoding"] = self.__encoding
+        headers.add_vary_header("Accept-Encoding")
+        if "etag" in headers:
+            # The compressed response is a different representation
+            headers["etag"] = get_encoded_etag(headers["etag"], self.__encoding)
+        if more_body:
+            del headers["content-length"]
+            body = await self.__run(self.__compressor.compress, body)
+        else:
+            body = await self.__run(self.__compressor.finish, body)
+            headers["content-length"] = str(len(body))
+        await self.__send(start)
+        await self.__send(
+            {"type": "http.response.body", "body": body, "more_body": more_body}
+        )
+
+    def __get_response_config(self) -> Optional[CompressionConfig]:
+        """
+        Returns the compression configuration of the response (the one of
+        its endpoint, if it has one), or None if it must not be compressed.
+        """
+        config: Union[bool, CompressionConfig] = self.__scope.get(
+            COMPRESSION_SCOPE_KEY, True
+        )
+        if config is True:
+            return self.__get_config()
+        if config is False:
+            return None
+        return config
+
+    async def __run(self, function: Callable[[bytes], bytes], data: bytes) -> bytes:
+        """
+        Runs :function with :data, in the thread pool if :data is big
+        enough to block the event loop for a while.
+        """
+        if self.__config is None or len(data) < self.__config.offload_size:
+            return function(data)
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self.__executors.thread_pool, function, data)
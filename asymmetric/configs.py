@@ -0,0 +1,125 @@
+"""
+A module for every configuration object of asymmetric.
+"""
+
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional, Union
+
+from asymmetric.backends import CacheBackend
+
+
+class ExecutorConfig(NamedTuple):
+
+    """
+    Configuration of the own executor of an endpoint (its bulkhead). The
+    endpoint gets :max_workers workers and can queue up to :max_queue calls
+    while every worker is busy. Any call exceeding that gets rejected.
+    """
+
+    max_workers: int
+    max_queue: int = 0
+
+
+class BatchConfig(NamedTuple):
+
+    """
+    Configuration of the micro-batching of an endpoint. Concurrent calls
+    get collected for up to :max_wait_ms milliseconds (or until :max_size
+    calls were collected) and then get run as a single call.
+    """
+
+    max_size: int
+    max_wait_ms: float = 10.0
+
+
+class CacheConfig(NamedTuple):
+
+    """
+    Configuration of the result cache of an endpoint. Results expire after
+    :ttl seconds (never, if None) and the least recently used results get
+    evicted when there are more than :max_entries results or when they use
+    more than :max_bytes bytes (no limit, if None). The results get stored
+    in :backend (a new in-memory backend, if None), which can be shared by
+    several endpoints (and by several workers, depending on the backend).
+    """
+
+    ttl: Optional[float] = None
+    max_entries: Optional[int] = 1024
+    max_bytes: Optional[int] = None
+    backend: Optional[CacheBackend] = None
+
+
+class RevalidateConfig(NamedTuple):
+
+    """
+    Configuration of the stale-while-revalidate cache of an endpoint.
+    Results older than :soft_ttl seconds still get returned, but get
+    refreshed in the background. Results older than :hard_ttl seconds
+    make the caller wait for the refresh. Up to :max_entries results get
+    kept (no limit, if None).
+    """
+
+    soft_ttl: float
+    hard_ttl: float
+    max_entries: Optional[int] = 1024
+
+
+class PrecomputeConfig(NamedTuple):
+
+    """
+    Configuration of the precomputed results of an endpoint. When the
+    server starts, the function gets called with every argument set of
+    :params (an iterable of dicts, or a callable returning one, like a
+    generator function) and the results get served to the matching calls
+    for :ttl seconds (forever, if None).
+    """
+
+    params: Union[Iterable[Dict[str, Any]], Callable[[], Iterable[Dict[str, Any]]]]
+    ttl: Optional[float] = None
+
+
+class DeltaConfig(NamedTuple):
+
+    """
+    Configuration of the delta responses of an endpoint. Up to
+    :max_versions recent versions of the response of each call get kept
+    (for up to :max_keys distinct calls, no limit if None), so clients
+    presenting one of them get a JSON Patch instead of the full response.
+    """
+
+    max_versions: int = 4
+    max_keys: Optional[int] = 128
+
+
+class CompressionConfig(NamedTuple):
+
+    """
+    Configuration of the response compression. Bodies smaller than
+    :minimum_size bytes don't get compressed, and bodies (or chunks) of at
+    least :offload_size bytes get compressed in the thread pool. Gzip and
+    deflate use the compression :level (1 to 9) and brotli uses the
+    :brotli_quality (0 to 11).
+    """
+
+    minimum_size: int = 1024
+    offload_size: int = 256 * 1024
+    level: int = 6
+    brotli_quality: int = 4
+
+
+class AdaptiveLimitConfig(NamedTuple):
+
+    """
+    Configuration of the adaptive concurrency limit of an endpoint. The
+    limit starts at :initial_limit and stays between :min_limit and
+    :max_limit. It grows by one while the requests take less than
+    :latency_tolerance times their usual duration and the event loop lags
+    less than :max_loop_lag_ms milliseconds, and it gets multiplied by
+    :backoff as soon as either of them exceeds its bound.
+    """
+
+    initial_limit: int = 10
+    min_limit: int = 1
+    max_limit: int = 200
+    latency_tolerance: float = 2.0
+    max_loop_lag_ms: float = 50.0
+    backoff: float = 0.9
@@ -2,6 +2,8 @@
 A module for every constant of asymmetric.
 """
 
+import collections.abc
+
 # HTTP related
 HTTP_METHODS = [
     "get",
@@ -14,6 +16,79 @@ HTTP_METHODS = [
     "trace",
 ]
 
+# Methods whose requests can be answered with a 304 (Not Modified)
+CONDITIONAL_METHODS = ["GET", "HEAD"]
+
+# Content codings whose name gets appended to the ETags of the responses
+# compressed with them (as they are different representations)
+ETAG_CONTENT_CODINGS = ["br", "gzip", "deflate"]
+
+# Delta responses (RFC 3229)
+DELTA_STATUS_CODE = 226
+JSON_PATCH_IM = "json-patch"
+
+# Compression (media types ending with these suffixes, or text ones,
+# get compressed)
+COMPRESSIBLE_MEDIA_TYPES = ["json", "javascript", "xml", "ndjson"]
+COMPRESSION_SCOPE_KEY = "asymmetric.compression"
+NO_BODY_STATUS_CODES = [204, 304]
+
+# Request decompression (zlib window bits of every supported encoding,
+# 31 for gzip and 15 for zlib-wrapped deflate)
+DECOMPRESSION_WBITS = {"gzip": 31, "x-gzip": 31, "deflate": 15}
+MAX_DECOMPRESSED_SIZE = 64 * 1024 * 1024
+
+# Payload offloading (payloads of at least this many bytes get decoded
+# and encoded in a thread)
+OFFLOAD_SIZE = 256 * 1024
+LOOP_TIMING_NAME = "loop"
+
+# Concurrency limits (weight of the last request in the average duration
+# used to estimate the Retry-After of the rejected requests)
+LIMITER_SMOOTHING = 0.2
+
+# Adaptive concurrency limits (weight of the slower requests in the usual
+# duration of the requests, so it follows them slowly)
+LIMITER_BASELINE_DRIFT = 0.01
+
+# Deadlines (an absolute UNIX timestamp in seconds, or the remaining
+# milliseconds)
+DEADLINE_HEADER = "x-request-deadline"
+DEADLINE_TIMEOUT_HEADER = "x-request-timeout-ms"
+
+# Execution modes
+RUN_IN_LOOP = "loop"
+RUN_IN_THREAD = "thread"
+RUN_IN_PROCESS = "process"
+EXECUTION_MODES = [RUN_IN_LOOP, RUN_IN_THREAD, RUN_IN_PROCESS]
+
+# Streaming formats
+STREAM_NDJSON = "ndjson"
+STREAM_ARRAY = "array"
+STREAMING_FORMATS = [STREAM_NDJSON, STREAM_ARRAY]
+STREAM_CHUNK_ITEMS = 64
+
+# Chunked responses (containers with up to this many items and without
+# nested containers get encoded at once)
+ENCODING_INLINE_ITEMS = 64
+
+# Streamed request bodies
+SYNC_ITERATOR_TYPES = (
+    collections.abc.Iterator,
+    collections.abc.Iterable,
+    collections.abc.Generator,
+)
+ASYNC_ITERATOR_TYPES = (
+    collections.abc.AsyncIterator,
+    collections.abc.AsyncIterable,
+    collections.abc.AsyncGenerator,
+)
+
+# Media types
+JSON_MEDIA_TYPE = "application/json"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+JSON_PATCH_MEDIA_TYPE = "application/json-patch+json"
+
 # Docs
 OPENAPI_SPEC_ROUTE = "/openapi.json"
 SWAGGER_DOCUMENTATION_ROUTE = "/docs"
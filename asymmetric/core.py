@@ -2,32 +2,90 @@
 The main module of asymmetric.
 """
 
-import asyncio
-from typing import Any, Callable, Dict, List, Union
+from typing import Any, Callable, Dict, List, Optional, Union
 
 from starlette.applications import Starlette
 from starlette.requests import Request
-from starlette.responses import HTMLResponse, JSONResponse
+from starlette.responses import HTMLResponse, Response
 from starlette.types import Receive, Scope, Send
 
+from asymmetric.batching import Batcher, validate_batching
+from asymmetric.caching import ResultCache, RevalidatingCache, validate_caching
 from asymmetric.callbacks.core import CallbackClient
+from asymmetric.codecs import JSONCodec, get_codec
+from asymmetric.compression import CompressionMiddleware, validate_compression
+from asymmetric.configs import (
+    AdaptiveLimitConfig,
+    BatchConfig,
+    CacheConfig,
+    CompressionConfig,
+    DeltaConfig,
+    ExecutorConfig,
+    PrecomputeConfig,
+    RevalidateConfig,
+)
 from asymmetric.constants import (
     HTTP_METHODS,
+    MAX_DECOMPRESSED_SIZE,
+    OFFLOAD_SIZE,
     OPENAPI_SPEC_ROUTE,
     REDOC_DOCUMENTATION_ROUTE,
+    RUN_IN_PROCESS,
+    STREAM_NDJSON,
     SWAGGER_DOCUMENTATION_ROUTE,
 )
+from asymmetric.decompression import (
+    DecompressionMiddleware,
+    validate_max_decompressed_size,
+)
+from asymmetric.deltas import DeltaHistory, validate_deltas
+from asymmetric.disconnects import validate_cancel_on_disconnect
 from asymmetric.endpoints import Endpoints
-from asymmetric.errors import DuplicatedEndpointError
+from asymmetric.errors import (
+    DuplicatedEndpointError,
+    InvalidBatchingError,
+    InvalidCachingError,
+    InvalidCancellationError,
+    InvalidChunkSizeError,
+    InvalidCompressionError,
+    InvalidConcurrencyLimitError,
+    InvalidDeltaError,
+    InvalidETagError,
+    InvalidExecutionModeError,
+    InvalidPrecomputingError,
+    InvalidSingleFlightError,
+    InvalidStreamingFormatError,
+    InvalidStreamingParameterError,
+    InvalidTimeoutError,
+)
+from asymmetric.etags import conditional_response, validate_etags
+from asymmetric.executors import (
+    BoundedExecutor,
+    Executors,
+    validate_execution_mode,
+)
+from asymmetric.flights import SingleFlight, validate_single_flight
+from asymmetric.handlers import EndpointHandler
 from asymmetric.helpers import http_verb
-from asymmetric.loggers import log, log_request
+from asymmetric.ingestion import get_streaming_parameter, validate_body_streaming
+from asymmetric.limiting import (
+    AdaptiveConcurrencyLimiter,
+    ConcurrencyLimiter,
+    validate_concurrency_limit,
+)
+from asymmetric.loggers import log, log_critical_errors
+from asymmetric.offloading import validate_offload_size
 from asymmetric.openapi.core import get_openapi
 from asymmetric.openapi.docs import get_redoc_html, get_swagger_html
+from asymmetric.plans import CallPlan, get_call_plan
+from asymmetric.precomputing import PrecomputedTable, validate_precomputing
+from asymmetric.responses import CodecJSONResponse
 from asymmetric.singleton import AsymmetricSingleton
-from asymmetric.utils import filter_params, generic_call, get_body, handle_error
+from asymmetric.streaming import validate_chunk_size, validate_streaming_format
+from asymmetric.timeouts import validate_timeout
 
 
-class _Asymmetric(metaclass=AsymmetricSingleton):
+class _Asymmetric(metaclass=AsymmetricSingleton):  # pylint: disable=R0902
 
     """
     Main class to encapsulate every important feature of
@@ -37,6 +95,11 @@ class _Asymmetric(metaclass=AsymmetricSingleton):
     def __init__(self) -> None:
         self.__app: Starlette = Starlette()
         self.__endpoints: Endpoints = Endpoints()
+        self.__executors: Executors = Executors()
+        self.__codec: JSONCodec = get_codec()
+        self.__compression: Optional[CompressionConfig] = CompressionConfig()
+        self.__max_decompressed_size: Optional[int] = MAX_DECOMPRESSED_SIZE
+        self.__offload_size: Optional[int] = OFFLOAD_SIZE
         self.__openapi_schema: Union[Dict[str, Any], None] = None
         self.__setup()
 
@@ -60,13 +123,105 @@ class _Asymmetric(metaclass=AsymmetricSingleton):
             self.__openapi_schema = get_openapi(self, "Asymmetric API")
         return self.__openapi_schema
 
+    @property
+    def endpoints(self) -> Endpoints:
+        """
+        Returns the endpoints object, used to inspect every endpoint
+        (and its runtime state) of the API.
+        """
+        return self.__endpoints
+
+    @property
+    def executors(self) -> Executors:
+        """
+        Returns the executors object, used to configure where the sync
+        functions get run.
+        """
+        return self.__executors
+
+    @property
+    def codec(self) -> JSONCodec:
+        """
+        Returns the JSON codec used to decode the requests and to encode
+        the responses. Defaults to the fastest codec installed.
+        """
+        return self.__codec
+
+    @codec.setter
+    def codec(self, codec: JSONCodec) -> None:
+        """Sets the JSON codec (use asymmetric.codecs.get_codec to get one)."""
+        self.__codec = codec
+
+    @property
+    def compression(self) -> Optional[CompressionConfig]:
+        """
+        Returns the default response compression configuration (None means
+        that the responses don't get compressed).
+        """
+        return self.__compression
+
+    @compression.setter
+    def compression(self, config: Optional[CompressionConfig]) -> None:
+        """Sets the default response compression configuration."""
+        if config is not None:
+            with log_critical_errors(InvalidCompressionError):
+                validate_compression(config)
+        self.__compression = config
+
+    @property
+    def max_decompressed_size(self) -> Optional[int]:
+        """
+        Returns the maximum size (in bytes) of a decompressed request body
+        (None means that there is no limit).
+        """
+        return self.__max_decompressed_size
+
+    @max_decompressed_size.setter
+    def max_decompressed_size(self, max_size: Optional[int]) -> None:
+        """Sets the maximum size (in bytes) of a decompressed request body."""
+        validate_max_decompressed_size(max_size)
+        self.__max_decompressed_size = max_size
+
+    @property
+    def offload_size(self) -> Optional[int]:
+        """
+        Returns the size (in bytes) from which the request bodies get decoded
+        and the results get encoded in a thread instead of inside the event
+        loop (None means that they never leave the event loop).
+        """
+        return self.__offload_size
+
+    @offload_size.setter
+    def offload_size(self, offload_size: Optional[int]) -> None:
+        """Sets the size (in bytes) from which the payloads get offloaded."""
+        validate_offload_size(offload_size)
+        self.__offload_size = offload_size
+
     def __setup(self) -> None:
         """Sets up the API."""
+        # Compress the responses accepting it and decompress the compressed
+        # request bodies
+        self.__app.add_middleware(
+            CompressionMiddleware,
+            get_config=lambda: self.compression,
+            executors=self.__executors,
+        )
+        self.__app.add_middleware(
+            DecompressionMiddleware, get_max_size=lambda: self.max_decompressed_size
+        )
+
+        # Spawn the worker processes before serving and release the
+        # executors when the server shuts down
+        self.__app.add_event_handler("startup", self.__executors.start)
+        self.__app.add_event_handler("shutdown", self.__executors.shutdown)
+
         # Set up the endpoint for the openapi json schema
         # pylint: disable=W0612
         @self.__app.route(OPENAPI_SPEC_ROUTE)
-        def openapi_schema(request: Request) -> JSONResponse:
-            return JSONResponse(self.openapi)
+        def openapi_schema(request: Request) -> Response:
+            return conditional_response(
+                request, CodecJSONResponse(self.openapi, codec=self.codec)
+            )
 
         # Set up the endpoint for the Swagger interactive documentation
         # pylint: disable=W0612
@@ -80,16 +235,74 @@ class _Asymmetric(metaclass=AsymmetricSingleton):
         def redoc(request: Request) -> HTMLResponse:
             return HTMLResponse(get_redoc_html("Asymmetric API"))
 
-    def router(
+    def router(  # pylint: disable=R0914
         self,
         route: str,
         methods: List[str] = ["post"],
         response_code: int = 200,
         callback: Union[Dict[str, Any], bool] = False,
+        run_in: Optional[str] = None,
+        executor: Optional[ExecutorConfig] = None,
+        stream: str = STREAM_NDJSON,
+        stream_body: bool = False,
+        chunk_size: Optional[int] = None,
+        batch: Optional[BatchConfig] = None,
+        cache: Optional[CacheConfig] = None,
+        single_flight: bool = False,
+        revalidate: Optional[RevalidateConfig] = None,
+        precompute: Optional[PrecomputeConfig] = None,
+        etag: bool = True,
+        version: Optional[Callable[..., Any]] = None,
+        delta: Optional[DeltaConfig] = None,
+        compression: Union[bool, CompressionConfig] = True,
+        max_concurrency: Union[int, AdaptiveLimitConfig, None] = None,
+        max_queue: int = 0,
+        timeout: Optional[float] = None,
+        cancel_on_disconnect: bool = False,
     ) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
         """
         Method to use for decorating the function wanting to be transformed
-        to an API.
+        to an API. Sync functions get run where :run_in says ("loop", "thread"
+        or "process"), defaulting to the execution mode of the executors object.
+        If :executor is given, the function gets its own bounded executor.
+        Generator functions get their items streamed using the :stream
+        format ("ndjson" or "array"). If :stream_body is True, the records of
+        the request body (NDJSON or a JSON array) get passed one by one to the
+        iterator parameter of the function as they arrive, while the rest of
+        the params get read from the query string. If :chunk_size is given,
+        list and dict results get encoded incrementally and sent in chunks of
+        :chunk_size bytes. If :batch is given, concurrent calls get collected
+        and run as a single call, where every parameter receives a list with
+        the values of every call (and the function must return a list with
+        the result of each call). If :cache is given, the encoded results get
+        cached, keyed by the params of the call. If :single_flight is True,
+        identical calls arriving while the first one is running share its
+        result instead of calling the function again. If :revalidate is given,
+        the encoded results get cached and keep being served while stale,
+        while they get refreshed in the background. If :precompute is given,
+        the results of its argument sets get computed when the server starts
+        and get served to the matching calls. If :etag is True, successful
+        responses get a strong ETag and the GET and HEAD requests whose
+        If-None-Match header matches it get a 304 response. If :version is
+        given, it gets called with the params of each call and the ETag comes
+        from its result, so the 304 response gets returned without calling
+        the function. If :delta is given, the recent versions of the responses
+        get kept, and requests accepting JSON Patch deltas (with an A-IM
+        header) whose If-None-Match header matches one of them get a JSON Patch
+        from that version instead of the whole response. The responses get
+        compressed using the default compression configuration, unless
+        :compression is False (never compressed) or a configuration of its own.
+        If :max_concurrency is given, up to :max_concurrency requests get handled
+        at the same time and up to :max_queue requests wait for their turn,
+        while the rest get rejected with a 503 response (before reading them).
+        If :max_concurrency is an adaptive limit configuration instead, the
+        maximum adapts itself to the latency of the requests and to the lag
+        of the event loop. If :timeout is given, calls taking longer than
+        :timeout seconds get cancelled (or abandoned, if they run in an
+        executor) and get a 504 response. If :cancel_on_disconnect is True,
+        the connection of the client gets watched while the function runs,
+        and async functions get cancelled (while the cancellation token of
+        sync functions gets cancelled) if the client disconnects.
         """
         methods = [http_verb(x) for x in methods if http_verb(x) in HTTP_METHODS]
 
@@ -99,31 +312,120 @@ class _Asymmetric(metaclass=AsymmetricSingleton):
             starlette endpoint. Returns the original unwrapped function.
             """
 
-            if callback:
-                callback_client = CallbackClient(function, callback)
+            # Introspect the function only once
+            plan = get_call_plan(function)
+
+            # Resolve where the function gets run
+            bounded_executor = self.__resolve_executor(
+                plan, run_in=run_in, executor=executor
+            )
+            with log_critical_errors(InvalidTimeoutError):
+                validate_timeout(timeout, plan, run_in=run_in)
+            if cancel_on_disconnect:
+                with log_critical_errors(InvalidCancellationError):
+                    validate_cancel_on_disconnect(
+                        plan, callback=callback, stream_body=stream_body
+                    )
+
+            # Validate how the results get sent
+            with log_critical_errors(InvalidStreamingFormatError):
+                validate_streaming_format(stream)
+            with log_critical_errors(InvalidChunkSizeError):
+                validate_chunk_size(chunk_size)
+
+            streaming_parameter: Optional[str] = None
+            if stream_body:
+                with log_critical_errors(InvalidStreamingParameterError):
+                    validate_body_streaming(plan, run_in=run_in, callback=callback)
+                    streaming_parameter = get_streaming_parameter(plan)
+
+            batcher: Optional[Batcher] = None
+            if batch is not None:
+                with log_critical_errors(InvalidBatchingError):
+                    validate_batching(
+                        batch, plan, callback=callback, stream_body=stream_body
+                    )
+                    batcher = Batcher(batch, plan)
 
-            @self.__app.route(route, methods=methods)
-            async def wrapper(request: Request) -> JSONResponse:
-                asyncio.ensure_future(log_request(request, route, function))
+            result_cache = self.__create_cache(
+                route,
+                plan,
+                cache=cache,
+                revalidate=revalidate,
+                callback=callback,
+                stream_body=stream_body,
+                chunk_size=chunk_size,
+            )
 
-                try:
-                    # Get the body
-                    body = await get_body(request)
+            flights: Optional[SingleFlight] = None
+            if single_flight:
+                with log_critical_errors(InvalidSingleFlightError):
+                    validate_single_flight(
+                        plan, callback=callback, stream_body=stream_body
+                    )
+                    flights = SingleFlight()
 
-                    # Get params and headers
-                    params = filter_params(function, body)
-                    headers = request.headers
+            precomputed: Optional[PrecomputedTable] = None
+            if precompute is not None:
+                with log_critical_errors(InvalidPrecomputingError):
+                    validate_precomputing(
+                        precompute,
+                        plan,
+                        callback=callback,
+                        stream_body=stream_body,
+                        chunk_size=chunk_size,
+                    )
+                    precomputed = PrecomputedTable(precompute, plan)
 
-                    if not callback:
-                        # Process and return the result
-                        return JSONResponse(
-                            await generic_call(function, params),
-                            status_code=response_code,
-                        )
+            deltas = self.__create_deltas(
+                plan,
+                etag=etag,
+                version=version,
+                delta=delta,
+                callback=callback,
+                stream_body=stream_body,
+                chunk_size=chunk_size,
+            )
 
-                    return callback_client.handle_callback(headers, params)
-                except Exception as error:
-                    return handle_error(error)
+            if isinstance(compression, CompressionConfig):
+                with log_critical_errors(InvalidCompressionError):
+                    validate_compression(compression)
+
+            limiter = self.__create_limiter(max_concurrency, max_queue=max_queue)
+
+            handler = EndpointHandler(
+                route,
+                plan,
+                lambda: self.codec,
+                self.__executors,
+                get_offload_size=lambda: self.offload_size,
+                response_code=response_code,
+                callback_client=(
+                    CallbackClient(function, callback, plan=plan, timeout=timeout)
+                    if callback
+                    else None
+                ),
+                run_in=run_in,
+                executor=bounded_executor,
+                stream=stream,
+                streaming_parameter=streaming_parameter,
+                chunk_size=chunk_size,
+                batcher=batcher,
+                cache=result_cache,
+                flights=flights,
+                precomputed=precomputed,
+                etag=etag,
+                version=version,
+                deltas=deltas,
+                compression=compression,
+                limiter=limiter,
+                timeout=timeout,
+                cancel_on_disconnect=cancel_on_disconnect,
+            )
+            wrapper = self.__app.route(route, methods=methods)(handler.handle)
+            if precomputed is not None:
+                # Runs after the executors start, before serving any request
+                self.__app.add_event_handler("startup", handler.precompute)
 
             # Save Endpoint
             try:
@@ -134,6 +436,15 @@ class _Asymmetric(metaclass=AsymmetricSingleton):
                     wrapper,  # Save starlette decorated function
                     callback=callback,
                     response_code=response_code,
+                    run_in=run_in,
+                    timeout=timeout,
+                    executor=bounded_executor,
+                    batcher=batcher,
+                    cache=result_cache,
+                    flights=flights,
+                    precomputed=precomputed,
+                    deltas=deltas,
+                    limiter=limiter,
                 )
             except DuplicatedEndpointError as error:
                 log(f"DuplicatedEndpointError: {error}", level="critical")
@@ -143,5 +454,109 @@ class _Asymmetric(metaclass=AsymmetricSingleton):
 
         return decorator
 
+    def __create_cache(
+        self,
+        route: str,
+        plan: CallPlan,
+        cache: Optional[CacheConfig] = None,
+        revalidate: Optional[RevalidateConfig] = None,
+        callback: Union[Dict[str, Any], bool] = False,
+        stream_body: bool = False,
+        chunk_size: Optional[int] = None,
+    ) -> Optional[Union[ResultCache, RevalidatingCache]]:
+        """
+        Returns the result cache (or the revalidating cache) of the function
+        of :plan, or None if its results don't get cached.
+        """
+        with log_critical_errors(InvalidCachingError):
+            if cache is not None and revalidate is not None:
+                raise InvalidCachingError(
+                    f"Function '{plan.function.__qualname__}' can't use both "
+                    "a cache and a revalidating cache."
+                )
+            for config in (cache, revalidate):
+                if config is not None:
+                    validate_caching(
+                        config,
+                        plan,
+                        callback=callback,
+                        stream_body=stream_body,
+                        chunk_size=chunk_size,
+                    )
+        if cache is not None:
+            return ResultCache(cache, plan, namespace=route)
+        if revalidate is not None:
+            return RevalidatingCache(revalidate, plan)
+        return None
+
+    def __create_deltas(
+        self,
+        plan: CallPlan,
+        etag: bool = True,
+        version: Optional[Callable[..., Any]] = None,
+        delta: Optional[DeltaConfig] = None,
+        callback: Union[Dict[str, Any], bool] = False,
+        stream_body: bool = False,
+        chunk_size: Optional[int] = None,
+    ) -> Optional[DeltaHistory]:
+        """
+        Validates the ETags of the function of :plan and returns the history
+        of the versions of its responses, or None if they don't get delta
+        encoded.
+        """
+        with log_critical_errors(InvalidETagError):
+            validate_etags(plan, etag=etag, version=version, callback=callback)
+        if delta is None:
+            return None
+        with log_critical_errors(InvalidDeltaError):
+            validate_deltas(
+                delta,
+                plan,
+                etag=etag,
+                callback=callback,
+                stream_body=stream_body,
+                chunk_size=chunk_size,
+            )
+        return DeltaHistory(delta)
+
+    def __resolve_executor(
+        self,
+        plan: CallPlan,
+        run_in: Optional[str] = None,
+        executor: Optional[ExecutorConfig] = None,
+    ) -> Optional[BoundedExecutor]:
+        """
+        Validates where the function of :plan gets run and returns its own
+        bounded executor, or None if it doesn't get one.
+        """
+        bounded_executor: Optional[BoundedExecutor] = None
+        with log_critical_errors(InvalidExecutionModeError):
+            if run_in is not None:
+                validate_execution_mode(run_in)
+            if executor is not None:
+                bounded_executor = self.__executors.create_bounded_executor(
+                    executor, plan, run_in=run_in
+                )
+            elif run_in == RUN_IN_PROCESS:
+                self.__executors.register_process_function(plan)
+        return bounded_executor
+
+    def __create_limiter(
+        self,
+        max_concurrency: Union[int, AdaptiveLimitConfig, None],
+        max_queue: int = 0,
+    ) -> Optional[ConcurrencyLimiter]:
+        """
+        Validates the concurrency limit and returns the limiter of the
+        endpoint, or None if its concurrency is not limited.
+        """
+        with log_critical_errors(InvalidConcurrencyLimitError):
+            validate_concurrency_limit(max_concurrency, max_queue=max_queue)
+        if max_concurrency is None:
+            return None
+        if isinstance(max_concurrency, AdaptiveLimitConfig):
+            return AdaptiveConcurrencyLimiter(max_concurrency, max_queue=max_queue)
+        return ConcurrencyLimiter(max_concurrency, max_queue=max_queue)
+
 
 asymmetric_object = _Asymmetric()
@@ -0,0 +1,112 @@
+"""
+A module for containing the deadline propagation logic of asymmetric.
+Clients can say when they stop waiting for a response (as an absolute
+deadline or as the remaining milliseconds), so the requests whose
+deadline passed get skipped instead of computing answers nobody waits
+for. The remaining budget of the request being handled is available to
+its function (and bounds its call).
+"""
+
+import asyncio
+import math
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional
+
+from asymmetric.constants import DEADLINE_HEADER, DEADLINE_TIMEOUT_HEADER
+from asymmetric.errors import DeadlineExceededError, InvalidDeadlineError
+
+# The deadline (on the monotonic clock) of the request being handled (if any)
+current_deadline: ContextVar[Optional[float]] = ContextVar(
+    "current_deadline", default=None
+)
+
+
+def parse_number(headers: Mapping[str, str], name: str) -> Optional[float]:
+    """Returns the finite number of the :name header, or None if missing."""
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        number = math.nan
+    if not math.isfinite(number):
+        raise InvalidDeadlineError(f"Invalid '{name}' header '{value}'.")
+    return number
+
+
+def parse_deadline(headers: Mapping[str, str]) -> Optional[float]:
+    """
+    Returns the deadline of a request with :headers on the monotonic clock
+    (the earliest one, if both headers are present), or None if it has no
+    deadline. The deadline header holds a UNIX timestamp in seconds and
+    the timeout header holds the remaining milliseconds.
+    """
+    now = time.monotonic()
+    deadlines: List[float] = []
+    deadline = parse_number(headers, DEADLINE_HEADER)
+    if deadline is not None:
+        deadlines.append(now + deadline - time.time())
+    timeout = parse_number(headers, DEADLINE_TIMEOUT_HEADER)
+    if timeout is not None:
+        deadlines.append(now + timeout / 1000)
+    return min(deadlines, default=None)
+
+
+def remaining_time() -> Optional[float]:
+    """
+    Returns the amount of seconds left until the deadline of the request
+    being handled, or None if it has no deadline.
+    """
+    deadline = current_deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def check_deadline() -> None:
+    """Raises an error if the deadline of the request being handled passed."""
+    if remaining_time() == 0:
+        raise DeadlineExceededError(
+            "The deadline of the request passed before it got handled."
+        )
+
+
+def get_call_timeout(timeout: Optional[float]) -> Optional[float]:
+    """
+    Returns the timeout of a call (the smallest one between :timeout and
+    the remaining time of the request), or None if it has neither.
+    """
+    remaining = remaining_time()
+    if remaining is None:
+        return timeout
+    if timeout is None:
+        return remaining
+    return min(timeout, remaining)
+
+
+def run_before_deadline(function: Callable[..., Any], params: Dict[str, Any]) -> Any:
+    """
+    Calls :function with :params, unless the deadline of the request
+    passed (for example, while the call waited for a worker).
+    """
+    check_deadline()
+    return function(**params)
+
+
+async def wait_before_deadline(awaitable: Awaitable[Any]) -> Any:
+    """
+    Returns the result of :awaitable, raising an error if the deadline of
+    the request being handled passes first. Meant for waiting for shared
+    work, so :awaitable must protect that work from getting cancelled.
+    """
+    remaining = remaining_time()
+    if remaining is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, remaining)
+    except asyncio.TimeoutError as error:
+        raise DeadlineExceededError(
+            "The deadline of the request passed while waiting for the result."
+        ) from error
@@ -0,0 +1,125 @@
+"""
+A module for containing the request decompression logic of asymmetric.
+Request bodies with a gzip or deflate Content-Encoding get decompressed
+as they arrive, so the rest of asymmetric only ever sees plain bodies.
+The decompressed size gets limited, to survive decompression bombs.
+"""
+
+import zlib
+from typing import Any, Callable, Dict, Optional
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from asymmetric.constants import DECOMPRESSION_WBITS
+from asymmetric.errors import (
+    InvalidCompressedBodyError,
+    RequestBodyTooLargeError,
+    UnsupportedContentEncodingError,
+)
+from asymmetric.utils import handle_error
+
+
+def validate_max_decompressed_size(max_size: Optional[int]) -> None:
+    """Raises an error if :max_size is not a positive integer (or None)."""
+    if max_size is not None and (not isinstance(max_size, int) or max_size <= 0):
+        raise ValueError(
+            f"Invalid maximum decompressed size '{max_size}'. It must be a "
+            "positive integer (or None)."
+        )
+
+
+class Decompressor:
+
+    """
+    Class to decompress a compressed body incrementally, raising an error
+    as soon as the decompressed body gets bigger than :max_size bytes.
+    """
+
+    def __init__(self, encoding: str, max_size: Optional[int] = None) -> None:
+        if encoding not in DECOMPRESSION_WBITS:
+            raise UnsupportedContentEncodingError(
+                f"Unsupported request Content-Encoding '{encoding}'. Supported "
+                "encodings are "
+                + ", ".join(f"'{supported}'" for supported in DECOMPRESSION_WBITS)
+                + "."
+            )
+        self.__decompressor: Any = zlib.decompressobj(DECOMPRESSION_WBITS[encoding])
+        self.__max_size: Optional[int] = max_size
+        self.__size: int = 0
+
+    @property
+    def size(self) -> int:
+        """Returns the amount of bytes decompressed so far."""
+        return self.__size
+
+    def decompress(self, data: bytes) -> bytes:
+        """Decompresses the next :data of the body."""
+        try:
+            if self.__max_size is None:
+                decompressed = self.__decompressor.decompress(data)
+            else:
+                # Never inflate more than one byte past the limit
+                limit = self.__max_size - self.__size + 1
+                decompressed = self.__decompressor.decompress(data, limit)
+        except zlib.error as error:
+            raise InvalidCompressedBodyError(
+                f"Invalid compressed request body: {error}"
+            ) from error
+        self.__size += len(decompressed)
+        if self.__max_size is not None and self.__size > self.__max_size:
+            raise RequestBodyTooLargeError(
+                "The decompressed request body is bigger than "
+                f"{self.__max_size} bytes."
+            )
+        return decompressed
+
+    def finish(self) -> None:
+        """Raises an error if the compressed body ended prematurely."""
+        if not self.__decompressor.eof:
+            raise InvalidCompressedBodyError(
+                "Invalid compressed request body: it ended prematurely."
+            )
+
+
+class DecompressionMiddleware:  # pylint: disable=R0903
+
+    """
+    ASGI middleware to decompress the request bodies of the app. Removes
+    the Content-Encoding and Content-Length headers of the compressed
+    requests, as they no longer describe the body the app receives.
+    """
+
+    def __init__(self, app: ASGIApp, get_max_size: Callable[[], Optional[int]]) -> None:
+        self.__app: ASGIApp = app
+        self.__get_max_size: Callable[[], Optional[int]] = get_max_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        encoding = (
+            Headers(scope=scope).get("content-encoding", "identity").strip().lower()
+            if scope["type"] == "http"
+            else "identity"
+        )
+        if encoding == "identity":
+            await self.__app(scope, receive, send)
+            return
+        try:
+            decompressor = Decompressor(encoding, max_size=self.__get_max_size())
+        except UnsupportedContentEncodingError as error:
+            await handle_error(error)(scope, receive, send)
+            return
+        scope["headers"] = [
+            (key, value)
+            for key, value in scope["headers"]
+            if key not in (b"content-encoding", b"content-length")
+        ]
+
+        async def decompressed_receive() -> Message:
+            message: Dict[str, Any] = dict(await receive())
+            if message["type"] == "http.request":
+                message["body"] = decompressor.decompress(message.get("body", b""))
+                if not message.get("more_body", False):
+                    decompressor.finish()
+            return message
+
+        await self.__app(scope, decompressed_receive, send)
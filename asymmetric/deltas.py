@@ -0,0 +1,185 @@
+"""
+A module for containing the delta encoding logic of asymmetric (RFC 3229
+with JSON Patch, RFC 6902). The recent versions of the response of every
+call get kept, so a client presenting the ETag of one of them gets back
+only the changes made since that version.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from asymmetric.codecs import JSONCodec
+from asymmetric.configs import DeltaConfig
+from asymmetric.constants import (
+    CONDITIONAL_METHODS,
+    DELTA_STATUS_CODE,
+    JSON_PATCH_IM,
+    JSON_PATCH_MEDIA_TYPE,
+)
+from asymmetric.errors import InvalidDeltaError
+from asymmetric.plans import CallPlan
+
+
+def validate_deltas(
+    config: DeltaConfig,
+    plan: CallPlan,
+    etag: bool = True,
+    callback: Any = False,
+    stream_body: bool = False,
+    chunk_size: Optional[int] = None,
+) -> None:
+    """
+    Raises an error if :config is invalid or if the responses of the
+    function of :plan can't be delta encoded.
+    """
+    name = plan.function.__qualname__
+    for field, value in config._asdict().items():
+        if value is not None and value <= 0:
+            raise InvalidDeltaError(
+                f"Invalid delta {field} '{value}'. It must be positive."
+            )
+    if not etag:
+        raise InvalidDeltaError(f"Function '{name}' has its ETags disabled.")
+    if plan.is_generator or plan.is_async_generator:
+        raise InvalidDeltaError(f"Function '{name}' is a generator.")
+    if callback:
+        raise InvalidDeltaError(f"Function '{name}' is a callback.")
+    if stream_body:
+        raise InvalidDeltaError(f"Function '{name}' receives a streamed body.")
+    if chunk_size is not None:
+        raise InvalidDeltaError(
+            f"Function '{name}' sends its results in chunks, so they can't be "
+            "diffed as a whole."
+        )
+
+
+def escape_pointer_token(token: Any) -> str:
+    """Escapes :token to be used as a JSON Pointer (RFC 6901) token."""
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def make_json_patch(old: Any, new: Any, path: str = "") -> List[Dict[str, Any]]:
+    """
+    Returns the JSON Patch operations that turn the :old document into
+    the :new document (the document at :path, if it is part of a bigger
+    document).
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        operations: List[Dict[str, Any]] = []
+        for key in old:
+            if key not in new:
+                pointer = f"{path}/{escape_pointer_token(key)}"
+                operations.append({"op": "remove", "path": pointer})
+        for key, value in new.items():
+            pointer = f"{path}/{escape_pointer_token(key)}"
+            if key not in old:
+                operations.append({"op": "add", "path": pointer, "value": value})
+            else:
+                operations.extend(make_json_patch(old[key], value, pointer))
+        return operations
+    if isinstance(old, list) and isinstance(new, list):
+        operations = []
+        common = min(len(old), len(new))
+        for index in range(common):
+            operations.extend(
+                make_json_patch(old[index], new[index], f"{path}/{index}")
+            )
+        # Remove from the end, so the indexes of the operations stay valid
+        for index in reversed(range(common, len(old))):
+            operations.append({"op": "remove", "path": f"{path}/{index}"})
+        for value in new[common:]:
+            operations.append({"op": "add", "path": f"{path}/-", "value": value})
+        return operations
+    if type(old) is not type(new) or old != new:  # pylint: disable=C0123
+        return [{"op": "replace", "path": path, "value": new}]
+    return []
+
+
+def diff_bodies(old: bytes, new: bytes, codec: JSONCodec) -> bytes:
+    """Returns the encoded JSON Patch from the :old body to the :new body."""
+    return codec.dumps(make_json_patch(codec.loads(old), codec.loads(new)))
+
+
+def accepts_json_patch(request: Request) -> bool:
+    """
+    Returns True if :request accepts JSON Patch delta responses (if its
+    A-IM header includes them).
+    """
+    if request.method not in CONDITIONAL_METHODS:
+        return False
+    header = request.headers.get("a-im", "")
+    return JSON_PATCH_IM in [im.split(";")[0].strip() for im in header.split(",")]
+
+
+def patch_response(patch: bytes, etag: str, base: str) -> Response:
+    """
+    Returns the 226 (IM Used) response containing the encoded :patch from
+    the :base version to the :etag version.
+    """
+    return Response(
+        patch,
+        status_code=DELTA_STATUS_CODE,
+        media_type=JSON_PATCH_MEDIA_TYPE,
+        headers={"etag": etag, "im": JSON_PATCH_IM, "delta-base": base},
+    )
+
+
+class DeltaHistory:
+
+    """
+    Class to keep the encoded recent versions of the response of every
+    call, keyed by the hash of its params and by their ETags. Up to
+    :max_versions versions of each call get kept, for up to :max_keys calls
+    (the least recently used calls get forgotten first).
+    """
+
+    def __init__(self, config: DeltaConfig) -> None:
+        self.__config: DeltaConfig = config
+        self.__versions: "OrderedDict[str, OrderedDict[str, bytes]]" = OrderedDict()
+        self.__delta_count: int = 0
+
+    @property
+    def config(self) -> DeltaConfig:
+        """Returns the delta configuration."""
+        return self.__config
+
+    @property
+    def delta_count(self) -> int:
+        """Returns the amount of delta responses sent."""
+        return self.__delta_count
+
+    def __len__(self) -> int:
+        return len(self.__versions)
+
+    def get(self, key: str, etag: str) -> Optional[bytes]:
+        """
+        Returns the version tagged with :etag of the response of :key, or
+        None if it is not kept.
+        """
+        versions = self.__versions.get(key)
+        if versions is None:
+            return None
+        return versions.get(etag)
+
+    def record(self, key: str, etag: str, body: bytes) -> None:
+        """
+        Keeps the :body of the version tagged with :etag of the response
+        of :key, forgetting the oldest versions (and calls) if needed.
+        """
+        versions = self.__versions.setdefault(key, OrderedDict())
+        self.__versions.move_to_end(key)
+        versions[etag] = body
+        versions.move_to_end(etag)
+        while len(versions) > self.__config.max_versions:
+            versions.popitem(last=False)
+        max_keys = self.__config.max_keys
+        while max_keys is not None and len(self.__versions) > max_keys:
+            self.__versions.popitem(last=False)
+
+    def delta(self, patch: bytes, etag: str, base: str) -> Response:
+        """Returns the delta response of :patch (and counts it)."""
+        self.__delta_count += 1
+        return patch_response(patch, etag, base)
@@ -0,0 +1,112 @@
+"""
+A module for containing the disconnection logic of asymmetric. While an
+endpoint computes its response, the connection of the client gets
+watched, so that the work gets cancelled as soon as the client goes
+away (async functions get cancelled, and sync functions can check the
+cancellation token of their request to stop early).
+"""
+
+import asyncio
+import threading
+from contextvars import ContextVar
+from typing import Any, Awaitable, Optional
+
+from starlette.types import Receive
+
+from asymmetric.errors import ClientDisconnectedError, InvalidCancellationError
+from asymmetric.plans import CallPlan
+
+
+def validate_cancel_on_disconnect(
+    plan: CallPlan, callback: Any = False, stream_body: bool = False
+) -> None:
+    """Raises an error if the calls of the function of :plan can't be cancelled."""
+    name = plan.function.__qualname__
+    if plan.is_generator or plan.is_async_generator:
+        raise InvalidCancellationError(
+            f"Function '{name}' is a generator, so its results get streamed "
+            "after the call."
+        )
+    if callback:
+        raise InvalidCancellationError(
+            f"Function '{name}' is a callback, so its client doesn't wait for it."
+        )
+    if stream_body:
+        raise InvalidCancellationError(
+            f"Function '{name}' receives a streamed body, so the connection "
+            "can't be watched while it runs."
+        )
+
+
+class CancellationToken:
+
+    """
+    Class to let a sync function know that its call got cancelled (as it
+    can't be interrupted like an async function), so it can stop early.
+    """
+
+    def __init__(self) -> None:
+        self.__event: threading.Event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        """Returns True if the call got cancelled."""
+        return self.__event.is_set()
+
+    def cancel(self) -> None:
+        """Cancels the call."""
+        self.__event.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits until the call gets cancelled (for up to :timeout seconds, if
+        given) and returns True if it got cancelled.
+        """
+        return self.__event.wait(timeout)
+
+
+# The cancellation token of the request being handled (if any)
+current_token: ContextVar[Optional[CancellationToken]] = ContextVar(
+    "current_token", default=None
+)
+
+
+def cancellation_token() -> CancellationToken:
+    """
+    Returns the cancellation token of the request being handled (a token
+    that never gets cancelled, if its endpoint doesn't watch its client).
+    """
+    token = current_token.get()
+    return token if token is not None else CancellationToken()
+
+
+async def wait_for_disconnect(receive: Receive) -> None:
+    """Waits until the client of the already read request disconnects."""
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def run_until_disconnect(
+    awaitable: Awaitable[Any], receive: Receive, token: CancellationToken
+) -> Any:
+    """
+    Returns the result of :awaitable, unless the client disconnects first.
+    In that case, :awaitable gets cancelled, :token gets cancelled and an
+    error gets raised.
+    """
+    task = asyncio.ensure_future(awaitable)
+    watcher = asyncio.ensure_future(wait_for_disconnect(receive))
+    try:
+        done, _ = await asyncio.wait(
+            {task, watcher}, return_when=asyncio.FIRST_COMPLETED
+        )
+    finally:
+        watcher.cancel()
+        if not task.done():
+            token.cancel()
+            task.cancel()
+    if task not in done:
+        raise ClientDisconnectedError("The client disconnected before the response.")
+    return task.result()
@@ -5,16 +5,23 @@ A module for containing the endpoint logic of asymmetric.
 from inspect import getdoc
 from typing import Any, Callable, Dict, List, Optional, Union
 
+from asymmetric.batching import Batcher
+from asymmetric.caching import ResultCache, RevalidatingCache
+from asymmetric.deltas import DeltaHistory
 from asymmetric.errors import DuplicatedEndpointError
+from asymmetric.executors import BoundedExecutor
+from asymmetric.flights import SingleFlight
+from asymmetric.limiting import ConcurrencyLimiter
+from asymmetric.precomputing import PrecomputedTable
 
 
-class Endpoint:
+class Endpoint:  # pylint: disable=R0902
 
     """
     Class to encapsulate an endpoint.
     """
 
-    def __init__(
+    def __init__(  # pylint: disable=R0914
         self,
         route: str,
         method: str,
@@ -22,6 +29,15 @@ class Endpoint:
         decorated_function: Callable[..., Any],
         callback: Union[Dict[str, Any], bool] = False,
         response_code: int = 200,
+        run_in: Optional[str] = None,
+        executor: Optional[BoundedExecutor] = None,
+        batcher: Optional[Batcher] = None,
+        cache: Optional[Union[ResultCache, RevalidatingCache]] = None,
+        flights: Optional[SingleFlight] = None,
+        precomputed: Optional[PrecomputedTable] = None,
+        deltas: Optional[DeltaHistory] = None,
+        limiter: Optional[ConcurrencyLimiter] = None,
+        timeout: Optional[float] = None,
     ) -> None:
         self.__route: str = route
         self.__method: str = method
@@ -29,6 +45,15 @@ class Endpoint:
         self.__decorated_function: Callable[..., Any] = decorated_function
         self.__callback = callback
         self.__response_code: int = response_code
+        self.__run_in: Optional[str] = run_in
+        self.__executor: Optional[BoundedExecutor] = executor
+        self.__batcher: Optional[Batcher] = batcher
+        self.__cache: Optional[Union[ResultCache, RevalidatingCache]] = cache
+        self.__flights: Optional[SingleFlight] = flights
+        self.__precomputed: Optional[PrecomputedTable] = precomputed
+        self.__deltas: Optional[DeltaHistory] = deltas
+        self.__limiter: Optional[ConcurrencyLimiter] = limiter
+        self.__timeout: Optional[float] = timeout
 
     @property
     def route(self) -> str:
@@ -50,6 +75,78 @@ class Endpoint:
         """Returns the response code of the endpoint on a request."""
         return self.__callback
 
+    @property
+    def run_in(self) -> Optional[str]:
+        """
+        Returns the execution mode of the endpoint. None means that
+        the default execution mode gets used.
+        """
+        return self.__run_in
+
+    @property
+    def executor(self) -> Optional[BoundedExecutor]:
+        """
+        Returns the own executor of the endpoint (exposing its active
+        count and queue depth), or None if it uses a shared one.
+        """
+        return self.__executor
+
+    @property
+    def batcher(self) -> Optional[Batcher]:
+        """
+        Returns the batcher of the endpoint (exposing its pending calls
+        and batch count), or None if its calls don't get batched.
+        """
+        return self.__batcher
+
+    @property
+    def cache(self) -> Optional[Union[ResultCache, RevalidatingCache]]:
+        """
+        Returns the result cache of the endpoint (exposing its hit and miss
+        counters and its invalidation), or None if its results don't get cached.
+        """
+        return self.__cache
+
+    @property
+    def flights(self) -> Optional[SingleFlight]:
+        """
+        Returns the single-flight deduplicator of the endpoint (exposing its
+        running and shared calls), or None if its calls don't get shared.
+        """
+        return self.__flights
+
+    @property
+    def precomputed(self) -> Optional[PrecomputedTable]:
+        """
+        Returns the precomputed results of the endpoint (exposing their
+        hit and error counters), or None if its results don't get precomputed.
+        """
+        return self.__precomputed
+
+    @property
+    def deltas(self) -> Optional[DeltaHistory]:
+        """
+        Returns the recent versions of the responses of the endpoint (exposing
+        the delta count), or None if its responses don't get delta encoded.
+        """
+        return self.__deltas
+
+    @property
+    def limiter(self) -> Optional[ConcurrencyLimiter]:
+        """
+        Returns the concurrency limiter of the endpoint (exposing its active
+        count, queue depth and rejected count), or None if it has no limit.
+        """
+        return self.__limiter
+
+    @property
+    def timeout(self) -> Optional[float]:
+        """
+        Returns the maximum amount of seconds a call to the endpoint can
+        take, or None if its calls are not timed out.
+        """
+        return self.__timeout
+
     @property
     def function(self) -> Callable[..., Any]:
         """Returns the raw function of the endpoint."""
@@ -76,7 +173,7 @@ class Endpoints:  # pylint: disable=R0903
         """Returns the endpoints dict."""
         return self.__endpoints
 
-    def add_endpoints(
+    def add_endpoints(  # pylint: disable=R0914
         self,
         route: str,
         methods: List[str],
@@ -84,6 +181,15 @@ class Endpoints:  # pylint: disable=R0903
         decorated_function: Callable[..., Any],
         callback: Union[Dict[str, Any], bool] = False,
         response_code: int = 200,
+        run_in: Optional[str] = None,
+        executor: Optional[BoundedExecutor] = None,
+        batcher: Optional[Batcher] = None,
+        cache: Optional[Union[ResultCache, RevalidatingCache]] = None,
+        flights: Optional[SingleFlight] = None,
+        precomputed: Optional[PrecomputedTable] = None,
+        deltas: Optional[DeltaHistory] = None,
+        limiter: Optional[ConcurrencyLimiter] = None,
+        timeout: Optional[float] = None,
     ) -> None:
         """
         Adds an endpoint for every method specified.
@@ -96,9 +202,18 @@ class Endpoints:  # pylint: disable=R0903
                 decorated_function,
                 callback=callback,
                 response_code=response_code,
+                run_in=run_in,
+                executor=executor,
+                batcher=batcher,
+                cache=cache,
+                flights=flights,
+                precomputed=precomputed,
+                deltas=deltas,
+                limiter=limiter,
+                timeout=timeout,
             )
 
-    def __add_endpoint(
+    def __add_endpoint(  # pylint: disable=R0914
         self,
         route: str,
         method: str,
@@ -106,6 +221,15 @@ class Endpoints:  # pylint: disable=R0903
         decorated_function: Callable[..., Any],
         callback: Union[Dict[str, Any], bool] = False,
         response_code: int = 200,
+        run_in: Optional[str] = None,
+        executor: Optional[BoundedExecutor] = None,
+        batcher: Optional[Batcher] = None,
+        cache: Optional[Union[ResultCache, RevalidatingCache]] = None,
+        flights: Optional[SingleFlight] = None,
+        precomputed: Optional[PrecomputedTable] = None,
+        deltas: Optional[DeltaHistory] = None,
+        limiter: Optional[ConcurrencyLimiter] = None,
+        timeout: Optional[float] = None,
     ) -> None:
         """
         Checks if the desired endpoint does not exist. If it exists,
@@ -124,6 +248,15 @@ class Endpoints:  # pylint: disable=R0903
             decorated_function,
             callback=callback,
             response_code=response_code,
+            run_in=run_in,
+            executor=executor,
+            batcher=batcher,
+            cache=cache,
+            flights=flights,
+            precomputed=precomputed,
+            deltas=deltas,
+            limiter=limiter,
+            timeout=timeout,
         )
 
         route_dictionary = self.__get_route(route)
@@ -2,6 +2,8 @@
 Module to hold every custom exception.
 """
 
+from typing import Dict, Optional
+
 
 class DuplicatedEndpointError(Exception):
     """
@@ -21,6 +23,190 @@ class InvalidCallbackHeadersError(Exception):
     """
 
 
+class InvalidExecutionModeError(Exception):
+    """
+    Exception for when an execution mode does not exist or can't be
+    used with the decorated function.
+    """
+
+
+class InvalidStreamingFormatError(Exception):
+    """
+    Exception for when a streaming format does not exist.
+    """
+
+
+class InvalidChunkSizeError(Exception):
+    """
+    Exception for when the chunk size of a chunked response is not a
+    positive integer.
+    """
+
+
+class InvalidBatchingError(Exception):
+    """
+    Exception for when a batch configuration is invalid or can't be used
+    with the decorated function.
+    """
+
+
+class InvalidBatchResultError(Exception):
+    """
+    Exception for when a batched function does not return one result for
+    every call of the batch.
+    """
+
+
+class InvalidCachingError(Exception):
+    """
+    Exception for when a cache configuration is invalid or can't be used
+    with the decorated function.
+    """
+
+
+class InvalidSingleFlightError(Exception):
+    """
+    Exception for when the calls of the decorated function can't be
+    deduplicated.
+    """
+
+
+class InvalidCompressionError(Exception):
+    """
+    Exception for when a compression configuration is invalid.
+    """
+
+
+class InvalidConcurrencyLimitError(Exception):
+    """
+    Exception for when the concurrency limit of an endpoint is invalid.
+    """
+
+
+class InvalidTimeoutError(Exception):
+    """
+    Exception for when the timeout of an endpoint is invalid or can't be
+    used with the decorated function.
+    """
+
+
+class InvalidCancellationError(Exception):
+    """
+    Exception for when the calls of the decorated function can't be
+    cancelled when their client disconnects.
+    """
+
+
+class InvalidDeltaError(Exception):
+    """
+    Exception for when a delta configuration is invalid or can't be used
+    with the decorated function.
+    """
+
+
+class InvalidETagError(Exception):
+    """
+    Exception for when the ETags of the decorated function can't be
+    versioned.
+    """
+
+
+class InvalidPrecomputingError(Exception):
+    """
+    Exception for when a precompute configuration is invalid or can't be
+    used with the decorated function.
+    """
+
+
+class InvalidStreamingParameterError(Exception):
+    """
+    Exception for when the decorated function can't receive the request
+    body as a stream.
+    """
+
+
+class InvalidStreamedBodyError(Exception):
+    """
+    Exception for when a streamed request body is malformed.
+    """
+
+    status_code = 400
+
+
+class UnsupportedContentEncodingError(Exception):
+    """
+    Exception for when the Content-Encoding of a request body is not
+    supported.
+    """
+
+    status_code = 415
+
+
+class InvalidCompressedBodyError(Exception):
+    """
+    Exception for when a compressed request body can't be decompressed.
+    """
+
+    status_code = 400
+
+
+class RequestBodyTooLargeError(Exception):
+    """
+    Exception for when a decompressed request body is too large.
+    """
+
+    status_code = 413
+
+
+class EndpointOverloadedError(Exception):
+    """
+    Exception for when an endpoint has no capacity left to accept a call.
+    If given, :retry_after says in how many seconds it may have capacity.
+    """
+
+    status_code = 503
+
+    def __init__(self, message: str, retry_after: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.headers: Dict[str, str] = (
+            {"retry-after": str(retry_after)} if retry_after is not None else {}
+        )
+
+
+class CallTimeoutError(Exception):
+    """
+    Exception for when a call takes longer than the timeout of its endpoint.
+    """
+
+    status_code = 504
+
+
+class InvalidDeadlineError(Exception):
+    """
+    Exception for when the deadline header of a request is malformed.
+    """
+
+    status_code = 400
+
+
+class DeadlineExceededError(Exception):
+    """
+    Exception for when the deadline of a request passes before it gets
+    handled.
+    """
+
+    status_code = 504
+
+
+class ClientDisconnectedError(Exception):
+    """
+    Exception for when the client of a request disconnects before getting
+    its response.
+    """
+
+    status_code = 499
+
+
 class AppImportError(Exception):
     """
     Exception for when there's an error finding the asymmetric object inside
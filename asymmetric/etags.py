@@ -0,0 +1,147 @@
+"""
+A module for containing the conditional request logic of asymmetric.
+Responses get tagged with a strong ETag and the requests whose
+If-None-Match header matches it get a 304 response without a body. The
+compressed responses get tagged with the ETag of the uncompressed one
+followed by the name of their encoding (like "abc-gzip").
+"""
+
+import hashlib
+import inspect
+from typing import Any, Callable, Dict, List, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+
+from asymmetric.caching import get_cache_key
+from asymmetric.constants import CONDITIONAL_METHODS, ETAG_CONTENT_CODINGS
+from asymmetric.errors import InvalidETagError
+from asymmetric.plans import CallPlan
+from asymmetric.utils import filter_params
+
+
+def validate_etags(
+    plan: CallPlan,
+    etag: bool = True,
+    version: Optional[Callable[..., Any]] = None,
+    callback: Any = False,
+) -> None:
+    """
+    Raises an error if the :version key function is invalid or if it
+    can't be used with the function of :plan.
+    """
+    if version is None:
+        return
+    name = plan.function.__qualname__
+    if not callable(version):
+        raise InvalidETagError(f"Invalid version key '{version}'. It must be callable.")
+    if not etag:
+        raise InvalidETagError(
+            f"Function '{name}' has a version key, but its ETags are disabled."
+        )
+    if callback:
+        raise InvalidETagError(f"Function '{name}' is a callback.")
+
+
+def get_etag(body: bytes) -> str:
+    """Returns the strong ETag of the encoded :body."""
+    return f'"{hashlib.sha256(body).hexdigest()}"'
+
+
+def get_version_etag(params: Dict[str, Any], version: Any) -> str:
+    """Returns the strong ETag of the result of :version for :params."""
+    key = f"{get_cache_key(params)}:{version!r}".encode("utf-8")
+    return f'"v-{hashlib.sha256(key).hexdigest()}"'
+
+
+async def get_version(version: Callable[..., Any], params: Dict[str, Any]) -> Any:
+    """
+    Returns the version key of a call with :params, passing to the
+    :version function (that can be async) only the params it needs.
+    """
+    result = version(**filter_params(version, params))
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+def parse_if_none_match(header: str) -> List[str]:
+    """
+    Returns the ETags of an If-None-Match :header, without their weakness
+    indicators (as the comparison is weak for this header).
+    """
+    etags = [etag.strip() for etag in header.split(",")]
+    return [etag[2:] if etag.startswith("W/") else etag for etag in etags if etag]
+
+
+def get_encoded_etag(etag: str, encoding: str) -> str:
+    """Returns the ETag of the response tagged with :etag, compressed with :encoding."""
+    if not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def get_base_etag(etag: str) -> str:
+    """
+    Returns the ETag of the uncompressed response, given the :etag of a
+    maybe compressed one.
+    """
+    for encoding in ETAG_CONTENT_CODINGS:
+        suffix = f'-{encoding}"'
+        if etag.endswith(suffix):
+            return f'{etag[:-len(suffix)]}"'
+    return etag
+
+
+def get_matching_etag(request: Request, etag: str) -> Optional[str]:
+    """
+    Returns the ETag of the If-None-Match header of :request that matches
+    :etag (in any of its encodings), meaning that the client already has
+    the response. Returns None if there is no match. Only GET and HEAD
+    requests can be answered with a 304.
+    """
+    header = request.headers.get("if-none-match")
+    if header is None or request.method not in CONDITIONAL_METHODS:
+        return None
+    for client_etag in parse_if_none_match(header):
+        if client_etag == "*":
+            return etag
+        if get_base_etag(client_etag) == etag:
+            return client_etag
+    return None
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """
+    Returns True if the If-None-Match header of :request matches :etag
+    (in any of its encodings), meaning that the client already has the
+    response. Only GET and HEAD requests can be answered with a 304.
+    """
+    return get_matching_etag(request, etag) is not None
+
+
+def not_modified_response(etag: str) -> Response:
+    """Returns an empty 304 response for :etag."""
+    return Response(status_code=304, headers={"etag": etag})
+
+
+def conditional_response(
+    request: Request, response: Response, etag: Optional[str] = None
+) -> Response:
+    """
+    Tags :response with :etag (or with the ETag of its body) and returns
+    it, or returns a 304 response (tagged with the ETag the client has) if
+    the client already has it. Failed responses and streams without a
+    known ETag don't get tagged.
+    """
+    if not 200 <= response.status_code < 300:
+        return response
+    if etag is None:
+        if isinstance(response, StreamingResponse):
+            return response
+        etag = get_etag(response.body)
+    matching_etag = get_matching_etag(request, etag)
+    if matching_etag is not None:
+        return not_modified_response(matching_etag)
+    response.headers["etag"] = etag
+    return response
@@ -0,0 +1,371 @@
+"""
+A module for containing the executors logic of asymmetric.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from importlib import import_module
+from typing import Any, Callable, Iterable, List, Optional
+
+from asymmetric.configs import ExecutorConfig
+from asymmetric.constants import (
+    EXECUTION_MODES,
+    RUN_IN_LOOP,
+    RUN_IN_PROCESS,
+    RUN_IN_THREAD,
+)
+from asymmetric.errors import EndpointOverloadedError, InvalidExecutionModeError
+from asymmetric.plans import CallPlan
+
+
+def validate_execution_mode(run_in: str) -> None:
+    """Raises an error if :run_in is not a valid execution mode."""
+    if run_in not in EXECUTION_MODES:
+        raise InvalidExecutionModeError(
+            f"Invalid execution mode '{run_in}'. Valid execution modes are "
+            + ", ".join(f"'{mode}'" for mode in EXECUTION_MODES)
+            + "."
+        )
+
+
+def validate_process_function(plan: CallPlan) -> None:
+    """
+    Raises an error if the function of :plan can't be sent to a worker
+    process (the function must be sync, not a generator and importable
+    by name).
+    """
+    name = plan.function.__qualname__
+    if plan.is_async:
+        raise InvalidExecutionModeError(
+            f"Function '{name}' is async and can't be run in a process."
+        )
+    if plan.is_generator or plan.is_async_generator:
+        raise InvalidExecutionModeError(
+            f"Function '{name}' is a generator and can't be run in a process."
+        )
+    if "<locals>" in name or "<lambda>" in name:
+        raise InvalidExecutionModeError(
+            f"Function '{name}' is not importable and can't be run in a process."
+        )
+
+
+def import_modules(modules: Iterable[str]) -> None:
+    """
+    Imports every module of :modules. Gets used as the initializer of the
+    worker processes, so that the user modules get imported only once, when
+    the worker gets spawned.
+    """
+    for module in modules:
+        import_module(module)
+
+
+def create_process_pool(
+    max_workers: int, modules: Iterable[str] = ()
+) -> ProcessPoolExecutor:
+    """
+    Creates a process pool whose workers get spawned (not forked) and
+    import every module of :modules when they start.
+    """
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=import_modules,
+        initargs=(tuple(modules),),
+    )
+
+
+async def spawn_workers(pool: Executor, max_workers: int) -> None:
+    """Makes :pool spawn its worker processes by sending them a no-op each."""
+    loop = asyncio.get_event_loop()
+    await asyncio.gather(
+        *[loop.run_in_executor(pool, os.getpid) for _ in range(max_workers)]
+    )
+
+
+def runs_in_process(executor: Optional[Executor]) -> bool:
+    """Returns True if :executor runs its calls in other processes."""
+    return isinstance(executor, ProcessPoolExecutor) or (
+        isinstance(executor, BoundedExecutor) and executor.run_in == RUN_IN_PROCESS
+    )
+
+
+class BoundedExecutor(Executor):
+
+    """
+    Executor with its own pool (of threads or processes) and a bounded
+    queue. Gets used as the bulkhead of an endpoint, so that a slow
+    endpoint can only exhaust its own capacity.
+    """
+
+    def __init__(
+        self,
+        config: ExecutorConfig,
+        run_in: str = RUN_IN_THREAD,
+        modules: Iterable[str] = (),
+    ) -> None:
+        if config.max_workers < 1:
+            raise ValueError("The executor must have at least one worker.")
+        if config.max_queue < 0:
+            raise ValueError("The executor queue can't have a negative size.")
+        self.__config: ExecutorConfig = config
+        self.__run_in: str = run_in
+        self.__modules: List[str] = list(modules)
+        self.__pool: Optional[Executor] = None
+        self.__in_flight: int = 0
+        self.__lock: threading.Lock = threading.Lock()
+
+    @property
+    def config(self) -> ExecutorConfig:
+        """Returns the configuration of the executor."""
+        return self.__config
+
+    @property
+    def run_in(self) -> str:
+        """Returns the kind of workers of the executor ("thread" or "process")."""
+        return self.__run_in
+
+    @property
+    def active_count(self) -> int:
+        """Returns the amount of calls being run at the moment."""
+        return min(self.__in_flight, self.__config.max_workers)
+
+    @property
+    def queue_depth(self) -> int:
+        """Returns the amount of calls waiting for a free worker."""
+        return max(self.__in_flight - self.__config.max_workers, 0)
+
+    @property
+    def pool(self) -> Executor:
+        """Returns the underlying pool. If it does not exist, it creates it."""
+        if self.__pool is None:
+            if self.__run_in == RUN_IN_PROCESS:
+                self.__pool = create_process_pool(
+                    self.__config.max_workers, self.__modules
+                )
+            else:
+                self.__pool = ThreadPoolExecutor(
+                    max_workers=self.__config.max_workers,
+                    thread_name_prefix="asymmetric-bulkhead",
+                )
+        return self.__pool
+
+    def submit(  # type: ignore # pylint: disable=W0221
+        self, fn: Callable[..., Any], *args: Any, **kwargs: Any
+    ) -> "Future[Any]":
+        """
+        Schedules the call to be run by the pool. Raises an error if every
+        worker is busy and the queue is full.
+        """
+        capacity = self.__config.max_workers + self.__config.max_queue
+        with self.__lock:
+            if self.__in_flight >= capacity:
+                raise EndpointOverloadedError(
+                    "The endpoint is overloaded, please try again later."
+                )
+            self.__in_flight += 1
+        try:
+            future = self.pool.submit(fn, *args, **kwargs)
+        except BaseException:
+            self.__release()
+            raise
+        future.add_done_callback(lambda _: self.__release())
+        return future
+
+    async def start(self) -> None:
+        """Spawns every worker process of the pool (if it uses processes)."""
+        if self.__run_in == RUN_IN_PROCESS:
+            await spawn_workers(self.pool, self.__config.max_workers)
+
+    def shutdown(self, wait: bool = True, **kwargs: Any) -> None:
+        """Shuts down the underlying pool."""
+        if self.__pool is not None:
+            self.__pool.shutdown(wait=wait, **kwargs)
+            self.__pool = None
+
+    def __release(self) -> None:
+        """Frees the capacity used by a call."""
+        with self.__lock:
+            self.__in_flight -= 1
+
+
+class Executors:
+
+    """
+    Class to encapsulate the executors logic. The pools get created
+    lazily, so no thread gets spawned until a function needs one. The
+    process pool gets spawned on startup if any function needs it.
+    """
+
+    def __init__(self) -> None:
+        self.__run_in: str = RUN_IN_THREAD
+        self.__thread_pool_size: Optional[int] = None
+        self.__thread_pool: Optional[ThreadPoolExecutor] = None
+        self.__process_pool_size: Optional[int] = None
+        self.__process_pool: Optional[ProcessPoolExecutor] = None
+        self.__process_modules: List[str] = []
+        self.__bounded_executors: List[BoundedExecutor] = []
+
+    @property
+    def run_in(self) -> str:
+        """Returns the default execution mode for sync functions."""
+        return self.__run_in
+
+    @run_in.setter
+    def run_in(self, run_in: str) -> None:
+        """
+        Sets the default execution mode for sync functions. The process
+        mode can't be a default, as it must be validated per function.
+        """
+        validate_execution_mode(run_in)
+        if run_in == RUN_IN_PROCESS:
+            raise InvalidExecutionModeError(
+                "The process execution mode must be set for each endpoint."
+            )
+        self.__run_in = run_in
+
+    @property
+    def thread_pool_size(self) -> Optional[int]:
+        """
+        Returns the maximum amount of threads of the shared thread pool.
+        None means that the default of the standard library gets used.
+        """
+        return self.__thread_pool_size
+
+    @thread_pool_size.setter
+    def thread_pool_size(self, size: Optional[int]) -> None:
+        """
+        Sets the maximum amount of threads of the shared thread pool. If the
+        pool already exists, it gets replaced once its pending work finishes.
+        """
+        if size is not None and size < 1:
+            raise ValueError("The thread pool size must be greater than 0.")
+        self.__thread_pool_size = size
+        self.__shutdown_thread_pool()
+
+    @property
+    def thread_pool(self) -> ThreadPoolExecutor:
+        """Returns the shared thread pool. If it does not exist, it creates it."""
+        if self.__thread_pool is None:
+            self.__thread_pool = ThreadPoolExecutor(
+                max_workers=self.__thread_pool_size,
+                thread_name_prefix="asymmetric",
+            )
+        return self.__thread_pool
+
+    @property
+    def process_pool_size(self) -> int:
+        """
+        Returns the amount of worker processes of the shared process pool.
+        Defaults to the amount of CPUs of the machine.
+        """
+        return self.__process_pool_size or os.cpu_count() or 1
+
+    @process_pool_size.setter
+    def process_pool_size(self, size: Optional[int]) -> None:
+        """
+        Sets the amount of worker processes of the shared process pool. If the
+        pool already exists, it gets replaced once its pending work finishes.
+        """
+        if size is not None and size < 1:
+            raise ValueError("The process pool size must be greater than 0.")
+        self.__process_pool_size = size
+        self.__shutdown_process_pool()
+
+    @property
+    def process_pool(self) -> ProcessPoolExecutor:
+        """
+        Returns the shared process pool. If it does not exist, it creates it.
+        The workers get spawned (not forked) and import every registered
+        module when they start.
+        """
+        if self.__process_pool is None:
+            self.__process_pool = create_process_pool(
+                self.process_pool_size, self.__process_modules
+            )
+        return self.__process_pool
+
+    def register_process_function(self, plan: CallPlan) -> None:
+        """
+        Validates that the function of :plan can be run in a worker process
+        and registers its module to be imported when the workers spawn.
+        """
+        validate_process_function(plan)
+        module = plan.function.__module__
+        if module != "__main__" and module not in self.__process_modules:
+            self.__process_modules.append(module)
+
+    def create_bounded_executor(
+        self, config: ExecutorConfig, plan: CallPlan, run_in: Optional[str] = None
+    ) -> BoundedExecutor:
+        """
+        Creates the own executor of the function of :plan, validating that
+        the function can be run by it. The executor uses threads unless
+        :run_in asks for processes.
+        """
+        run_in = run_in or RUN_IN_THREAD
+        name = plan.function.__qualname__
+        if plan.is_async:
+            raise InvalidExecutionModeError(
+                f"Function '{name}' is async and can't have its own executor."
+            )
+        if run_in == RUN_IN_LOOP:
+            raise InvalidExecutionModeError(
+                f"Function '{name}' runs in the event loop and can't have "
+                "its own executor."
+            )
+        modules = []
+        if run_in == RUN_IN_PROCESS:
+            validate_process_function(plan)
+            modules.append(plan.function.__module__)
+        executor = BoundedExecutor(config, run_in=run_in, modules=modules)
+        self.__bounded_executors.append(executor)
+        return executor
+
+    def get_executor(self, run_in: Optional[str] = None) -> Optional[Executor]:
+        """
+        Returns the executor in which a sync function must be run given its
+        execution mode (or the default one). None means the event loop.
+        """
+        run_in = run_in or self.__run_in
+        if run_in == RUN_IN_LOOP:
+            return None
+        if run_in == RUN_IN_PROCESS:
+            return self.process_pool
+        return self.thread_pool
+
+    async def start(self) -> None:
+        """
+        Spawns every worker process of the process pools (if any function
+        needs them), so that no request has to wait for a worker to start.
+        """
+        if self.__process_modules:
+            await spawn_workers(self.process_pool, self.process_pool_size)
+        for executor in self.__bounded_executors:
+            await executor.start()
+
+    def shutdown(self) -> None:
+        """Shuts down every pool."""
+        self.__shutdown_thread_pool()
+        self.__shutdown_process_pool()
+        for executor in self.__bounded_executors:
+            executor.shutdown(wait=False)
+
+    def __shutdown_thread_pool(self) -> None:
+        """Shuts down the shared thread pool without waiting for it."""
+        if self.__thread_pool is not None:
+            self.__thread_pool.shutdown(wait=False)
+            self.__thread_pool = None
+
+    def __shutdown_process_pool(self) -> None:
+        """Shuts down the shared process pool without waiting for it."""
+        if self.__process_pool is not None:
+            self.__process_pool.shutdown(wait=False)
+            self.__process_pool = None
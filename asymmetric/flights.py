@@ -0,0 +1,67 @@
+"""
+A module for containing the single-flight logic of asymmetric. While a
+call is running, identical calls don't run the function again: they
+wait for the running call and share its result.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+from asymmetric.errors import InvalidSingleFlightError
+from asymmetric.plans import CallPlan
+from asymmetric.utils import start_detached
+
+
+def validate_single_flight(
+    plan: CallPlan, callback: Any = False, stream_body: bool = False
+) -> None:
+    """Raises an error if the calls of the function of :plan can't be shared."""
+    name = plan.function.__qualname__
+    if plan.is_generator or plan.is_async_generator:
+        raise InvalidSingleFlightError(
+            f"Function '{name}' is a generator, so its results can't be shared."
+        )
+    if callback:
+        raise InvalidSingleFlightError(f"Function '{name}' is a callback.")
+    if stream_body:
+        raise InvalidSingleFlightError(f"Function '{name}' receives a streamed body.")
+
+
+class SingleFlight:
+
+    """
+    Class to deduplicate the identical calls running at the same time.
+    The first call of a key runs, and every call of that key arriving
+    before it finishes waits for its result.
+    """
+
+    def __init__(self) -> None:
+        self.__flights: Dict[str, "asyncio.Future[Any]"] = {}
+        self.__shared_count: int = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Returns the amount of distinct calls running."""
+        return len(self.__flights)
+
+    @property
+    def shared_count(self) -> int:
+        """Returns the amount of calls that got the result of another call."""
+        return self.__shared_count
+
+    async def run(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Returns the result of :call, unless a call with the same :key is
+        already running, in which case its result gets returned instead. The
+        call runs detached from the request that started it, as it serves
+        every caller.
+        """
+        flight = self.__flights.get(key)
+        if flight is None:
+            flight = start_detached(call())
+            self.__flights[key] = flight
+            flight.add_done_callback(lambda _: self.__flights.pop(key, None))
+        else:
+            self.__shared_count += 1
+        # A cancelled caller must not cancel the call for everyone else
+        return await asyncio.shield(flight)
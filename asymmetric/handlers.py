@@ -0,0 +1,530 @@
+"""
+A module for containing the request handling logic of asymmetric. Each
+endpoint gets a handler, holding everything that got prepared for it
+at decoration time, that turns its requests into responses.
+"""
+
+import asyncio
+import time
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Optional, Union
+
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+
+from asymmetric.batching import Batcher
+from asymmetric.caching import ResultCache, RevalidatingCache, get_cache_key
+from asymmetric.callbacks.core import CallbackClient
+from asymmetric.codecs import JSONCodec
+from asymmetric.configs import CompressionConfig
+from asymmetric.constants import (
+    COMPRESSION_SCOPE_KEY,
+    JSON_MEDIA_TYPE,
+    OFFLOAD_SIZE,
+    STREAM_NDJSON,
+)
+from asymmetric.deadlines import (
+    check_deadline,
+    current_deadline,
+    get_call_timeout,
+    parse_deadline,
+    wait_before_deadline,
+)
+from asymmetric.deltas import DeltaHistory, accepts_json_patch, diff_bodies
+from asymmetric.disconnects import (
+    CancellationToken,
+    current_token,
+    run_until_disconnect,
+)
+from asymmetric.errors import (
+    CallTimeoutError,
+    DeadlineExceededError,
+    EndpointOverloadedError,
+    InvalidDeadlineError,
+)
+from asymmetric.etags import (
+    conditional_response,
+    get_base_etag,
+    get_matching_etag,
+    get_version,
+    get_version_etag,
+    not_modified_response,
+    parse_if_none_match,
+)
+from asymmetric.executors import BoundedExecutor, Executors
+from asymmetric.flights import SingleFlight
+from asymmetric.ingestion import BlockingIterator, iterate_records
+from asymmetric.limiting import ConcurrencyLimiter
+from asymmetric.loggers import log_enabled, log_request
+from asymmetric.offloading import LoopTimer, current_timer, record_timing, run_sized
+from asymmetric.plans import CallPlan
+from asymmetric.precomputing import PrecomputedTable
+from asymmetric.streaming import chunked_response, streaming_response
+from asymmetric.timeouts import with_timeout
+from asymmetric.utils import decode_body, filter_params, generic_call, handle_error
+
+
+class EndpointHandler:  # pylint: disable=R0902
+
+    """
+    Class to handle the requests of an endpoint. Reads the params of each
+    request, calls the function (or serves a cached result) and encodes
+    the result into a response.
+    """
+
+    def __init__(  # pylint: disable=R0914
+        self,
+        route: str,
+        plan: CallPlan,
+        get_codec: Callable[[], JSONCodec],
+        executors: Executors,
+        get_offload_size: Callable[[], Optional[int]] = lambda: OFFLOAD_SIZE,
+        response_code: int = 200,
+        callback_client: Optional[CallbackClient] = None,
+        run_in: Optional[str] = None,
+        executor: Optional[BoundedExecutor] = None,
+        stream: str = STREAM_NDJSON,
+        streaming_parameter: Optional[str] = None,
+        chunk_size: Optional[int] = None,
+        batcher: Optional[Batcher] = None,
+        cache: Optional[Union[ResultCache, RevalidatingCache]] = None,
+        flights: Optional[SingleFlight] = None,
+        precomputed: Optional[PrecomputedTable] = None,
+        etag: bool = True,
+        version: Optional[Callable[..., Any]] = None,
+        deltas: Optional[DeltaHistory] = None,
+        compression: Union[bool, CompressionConfig] = True,
+        limiter: Optional[ConcurrencyLimiter] = None,
+        timeout: Optional[float] = None,
+        cancel_on_disconnect: bool = False,
+    ) -> None:
+        self.__route: str = route
+        self.__plan: CallPlan = plan
+        self.__get_codec: Callable[[], JSONCodec] = get_codec
+        self.__executors: Executors = executors
+        self.__get_offload_size: Callable[[], Optional[int]] = get_offload_size
+        self.__encoded_size: int = 0
+        self.__response_code: int = response_code
+        self.__callback_client: Optional[CallbackClient] = callback_client
+        self.__run_in: Optional[str] = run_in
+        self.__executor: Optional[BoundedExecutor] = executor
+        self.__stream: str = stream
+        self.__streaming_parameter: Optional[str] = streaming_parameter
+        self.__chunk_size: Optional[int] = chunk_size
+        self.__batcher: Optional[Batcher] = batcher
+        self.__cache: Optional[Union[ResultCache, RevalidatingCache]] = cache
+        self.__flights: Optional[SingleFlight] = flights
+        self.__precomputed: Optional[PrecomputedTable] = precomputed
+        self.__etag: bool = etag
+        self.__version: Optional[Callable[..., Any]] = version
+        self.__deltas: Optional[DeltaHistory] = deltas
+        self.__compression: Union[bool, CompressionConfig] = compression
+        self.__limiter: Optional[ConcurrencyLimiter] = limiter
+        self.__timeout: Optional[float] = timeout
+        self.__cancel_on_disconnect: bool = cancel_on_disconnect
+
+    async def handle(self, request: Request) -> Response:
+        """
+        Handles a request to the endpoint and returns its response, with
+        the time spent on each step (and the time the event loop was
+        blocked) in its Server-Timing header.
+        """
+        timer = LoopTimer()
+        token = current_timer.set(timer)
+        try:
+            response = await self.process_in_time(request)
+        finally:
+            current_timer.reset(token)
+        response.headers["server-timing"] = timer.header()
+        return response
+
+    async def process_in_time(self, request: Request) -> Response:
+        """
+        Turns a request to the endpoint into its response, making its
+        deadline (if it has one) the deadline of the current context. If
+        the deadline already passed, the request gets skipped.
+        """
+        try:
+            deadline = parse_deadline(request.headers)
+        except InvalidDeadlineError as error:
+            return handle_error(error)
+        token = current_deadline.set(deadline)
+        try:
+            check_deadline()
+            if self.__limiter is None:
+                return await self.process(request)
+            return await self.process_limited(request, self.__limiter)
+        except DeadlineExceededError as error:
+            return handle_error(error)
+        finally:
+            current_deadline.reset(token)
+
+    async def process_limited(
+        self, request: Request, limiter: ConcurrencyLimiter
+    ) -> Response:
+        """
+        Turns a request to the endpoint into its response once :limiter
+        gives it its turn. If there's no room for the request, it gets
+        rejected before reading its body (and it gets skipped if its
+        deadline passes while it waits for its turn).
+        """
+        try:
+            started_at = await limiter.acquire()
+        except EndpointOverloadedError as error:
+            return handle_error(error)
+        try:
+            check_deadline()  # The deadline could have passed while queued
+            return await self.process(request)
+        finally:
+            limiter.release(started_at)
+
+    async def process(self, request: Request) -> Response:
+        """Turns a request to the endpoint into its response."""
+        codec = self.__get_codec()
+        # Let the compression middleware know how to compress the response
+        request.scope[COMPRESSION_SCOPE_KEY] = self.__compression
+        try:
+            params = await self.read_params(request, codec)
+            pool = self.get_pool()
+            if self.__streaming_parameter is not None:
+                pool = self.stream_body(
+                    self.__streaming_parameter, request, params, pool, codec
+                )
+            if self.__callback_client is not None:
+                return self.__callback_client.handle_callback(
+                    request.headers, params, executor=pool, codec=codec
+                )
+            if self.__cancel_on_disconnect:
+                return await self.respond_until_disconnect(request, params, pool, codec)
+            return await self.respond_conditionally(request, params, pool, codec)
+        except Exception as error:
+            return handle_error(error)
+
+    async def respond_until_disconnect(
+        self,
+        request: Request,
+        params: Dict[str, Any],
+        pool: Optional[Executor],
+        codec: JSONCodec,
+    ) -> Response:
+        """
+        Returns the response to a call with :params, cancelling the call
+        (and its cancellation token) if the client of :request disconnects
+        before getting it.
+        """
+        token = CancellationToken()
+        reset_token = current_token.set(token)
+        try:
+            return await run_until_disconnect(
+                self.respond_conditionally(request, params, pool, codec),
+                request.receive,
+                token,
+            )
+        finally:
+            current_token.reset(reset_token)
+
+    async def precompute(self) -> None:
+        """
+        Computes the results of the declared argument sets of the endpoint
+        (if any). Gets run when the server starts.
+        """
+        if self.__precomputed is None:
+            return
+        codec = self.__get_codec()
+        pool = self.get_pool()
+
+        async def compute(params: Dict[str, Any]) -> bytes:
+            return await self.encode(await self.call(params, pool), codec)
+
+        await self.__precomputed.warm(compute)
+
+    async def read_params(self, request: Request, codec: JSONCodec) -> Dict[str, Any]:
+        """
+        Reads the params of :request (from the query string if the body
+        gets streamed to the function) and logs the request.
+        """
+        raw_body: Optional[bytes] = None
+        if self.__streaming_parameter is not None:
+            body = dict(request.query_params)
+        else:
+            raw_body = await request.body()
+            body = await run_sized(
+                "decode",
+                decode_body,
+                raw_body,
+                codec,
+                size=len(raw_body),
+                offload_size=self.__get_offload_size(),
+                executor=self.__executors.thread_pool,
+            )
+
+        # Log the request only if someone will see it
+        if log_enabled():
+            await log_request(
+                request,
+                self.__route,
+                self.__plan.function,
+                body=body,
+                codec=codec,
+                raw_body=raw_body,
+            )
+        return filter_params(self.__plan.function, body, plan=self.__plan)
+
+    def get_pool(self) -> Optional[Executor]:
+        """
+        Returns the executor in which the function must be run, or None if
+        it must be run inside the event loop.
+        """
+        if self.__executor is not None:
+            return self.__executor
+        return self.__executors.get_executor(self.__run_in)
+
+    def stream_body(
+        self,
+        name: str,
+        request: Request,
+        params: Dict[str, Any],
+        pool: Optional[Executor],
+        codec: JSONCodec,
+    ) -> Optional[Executor]:
+        """
+        Adds the records of the body of :request to :params (as the :name
+        param). Returns the executor in which the function must be run, as
+        sync functions must pull the records from a thread.
+        """
+        records = iterate_records(
+            request.stream(), codec, request.headers.get("content-type", "")
+        )
+        if self.__plan.iterators[name]:
+            params[name] = records
+            return pool
+        params[name] = BlockingIterator(records, asyncio.get_event_loop())
+        return pool if pool is not None else self.__executors.thread_pool
+
+    async def call(self, params: Dict[str, Any], pool: Optional[Executor]) -> Any:
+        """
+        Calls the function (as part of a batch, if batched), cancelling the
+        call if it takes longer than the timeout of the endpoint or than
+        the time left until the deadline of the request.
+        """
+        check_deadline()
+        timeout = get_call_timeout(self.__timeout)
+        try:
+            return await self.timed_call(params, pool, timeout)
+        except CallTimeoutError as error:
+            # The time left until the deadline was the binding limit
+            if timeout != self.__timeout:
+                raise DeadlineExceededError(
+                    "The deadline of the request passed during the call, so it "
+                    "was cancelled."
+                ) from error
+            raise
+
+    async def timed_call(
+        self, params: Dict[str, Any], pool: Optional[Executor], timeout: Optional[float]
+    ) -> Any:
+        """
+        Calls the function (as part of a batch, if batched), cancelling the
+        call if it takes more than :timeout seconds, and records its timing.
+        """
+        start = time.perf_counter()
+        if self.__batcher is not None:
+            result = await with_timeout(
+                self.__batcher.submit(params, executor=pool), timeout
+            )
+            record_timing("call", time.perf_counter() - start, blocking=False)
+            return result
+        result = await generic_call(
+            self.__plan.function,
+            params,
+            plan=self.__plan,
+            executor=pool,
+            timeout=timeout,
+        )
+        # Sync functions run inside the event loop block it
+        blocking = pool is None and not (
+            self.__plan.is_async
+            or self.__plan.is_generator
+            or self.__plan.is_async_generator
+        )
+        record_timing("call", time.perf_counter() - start, blocking=blocking)
+        return result
+
+    async def encode(self, result: Any, codec: JSONCodec) -> bytes:
+        """
+        Encodes :result, in a thread if the last result of the endpoint was
+        big enough to block the event loop for a while.
+        """
+        encoded = await run_sized(
+            "encode",
+            codec.dumps,
+            result,
+            size=self.__encoded_size,
+            offload_size=self.__get_offload_size(),
+            executor=self.__executors.thread_pool,
+        )
+        self.__encoded_size = len(encoded)
+        return encoded
+
+    async def respond_conditionally(
+        self,
+        request: Request,
+        params: Dict[str, Any],
+        pool: Optional[Executor],
+        codec: JSONCodec,
+    ) -> Response:
+        """
+        Returns the response to a call with :params, tagged with its ETag.
+        If the client already has the response, returns a 304 response
+        instead (without calling the function, if it has a version key).
+        """
+        if not self.__etag:
+            return await self.respond(request, params, pool, codec)
+        etag: Optional[str] = None
+        if self.__version is not None:
+            etag = get_version_etag(params, await get_version(self.__version, params))
+            matching_etag = get_matching_etag(request, etag)
+            if matching_etag is not None:
+                return not_modified_response(matching_etag)
+        response = await self.respond(request, params, pool, codec)
+        response = conditional_response(request, response, etag=etag)
+        if self.__deltas is not None:
+            return await self.delta_response(request, params, response, codec)
+        return response
+
+    async def delta_response(
+        self,
+        request: Request,
+        params: Dict[str, Any],
+        response: Response,
+        codec: JSONCodec,
+    ) -> Response:
+        """
+        Keeps the version of :response and returns the JSON Patch to it from
+        the version the client already has (if it is kept and if the patch
+        is smaller than the whole response). Otherwise, returns :response.
+        """
+        etag = response.headers.get("etag")
+        if (
+            self.__deltas is None
+            or etag is None
+            or response.status_code != 200
+            or isinstance(response, StreamingResponse)
+        ):
+            return response
+        key = get_cache_key(params)
+        self.__deltas.record(key, etag, response.body)
+        if not accepts_json_patch(request):
+            return response
+        for base in parse_if_none_match(request.headers.get("if-none-match", "")):
+            previous = self.__deltas.get(key, get_base_etag(base))
+            if previous is None:
+                continue
+            # Diffing big documents takes a while, so keep it off the loop
+            patch = await asyncio.get_event_loop().run_in_executor(
+                self.__executors.thread_pool,
+                diff_bodies,
+                previous,
+                response.body,
+                codec,
+            )
+            if len(patch) < len(response.body):
+                return self.__deltas.delta(patch, etag, base)
+            return response
+        return response
+
+    async def respond(
+        self,
+        request: Request,
+        params: Dict[str, Any],
+        pool: Optional[Executor],
+        codec: JSONCodec,
+    ) -> Response:
+        """
+        Returns the response to a call with :params, serving the precomputed
+        (or cached) result if there is one.
+        """
+        if self.__precomputed is not None:
+            precomputed = self.__precomputed.get(self.__precomputed.key(params))
+            if precomputed is not None:
+                return self.encoded_response(precomputed)
+
+        # Serve the (maybe stale) cached result, refreshing it in the
+        # background if needed
+        if isinstance(self.__cache, RevalidatingCache):
+
+            async def refresh() -> bytes:
+                return await self.encode(await self.call(params, pool), codec)
+
+            encoded = await wait_before_deadline(
+                self.__cache.get(self.__cache.key(params), refresh)
+            )
+            return self.encoded_response(encoded)
+
+        # Return the cached result if there is one
+        if self.__cache is not None:
+            key = self.__cache.key(params)
+            thread_pool = self.__executors.thread_pool
+            cached = await self.__cache.fetch(key, thread_pool)
+            if cached is None:
+                result = await self.compute(request, params, pool)
+                cached = await self.encode(result, codec)
+                await self.__cache.store(key, cached, thread_pool)
+            return self.encoded_response(cached)
+
+        result = await self.compute(request, params, pool)
+        return await self.result_response(result, pool, codec)
+
+    async def compute(
+        self, request: Request, params: Dict[str, Any], pool: Optional[Executor]
+    ) -> Any:
+        """
+        Calls the function, sharing the result with the identical calls
+        running at the same time if needed.
+        """
+        if self.__flights is None:
+            return await self.call(params, pool)
+        key = f"{request.method} {get_cache_key(params)}"
+        return await wait_before_deadline(
+            self.__flights.run(key, lambda: self.call(params, pool))
+        )
+
+    async def result_response(
+        self, result: Any, pool: Optional[Executor], codec: JSONCodec
+    ) -> Response:
+        """
+        Returns the response containing :result, streaming it if it is a
+        generator (or sending it in chunks, if needed).
+        """
+        if self.__plan.is_generator or self.__plan.is_async_generator:
+            return streaming_response(
+                result,
+                codec,
+                stream=self.__stream,
+                status_code=self.__response_code,
+                executor=self.get_pull_pool(pool),
+            )
+        if self.__chunk_size is not None and isinstance(result, (list, tuple, dict)):
+            return await chunked_response(
+                result,
+                codec,
+                self.__chunk_size,
+                status_code=self.__response_code,
+                executor=self.get_pull_pool(pool),
+            )
+        return self.encoded_response(await self.encode(result, codec))
+
+    def get_pull_pool(self, pool: Optional[Executor]) -> Optional[Executor]:
+        """
+        Returns the executor in which the chunks of a response must be
+        pulled given the :pool of the function. The chunks never leave the
+        server process nor take the slots of the pool of the function, so
+        they get pulled in the thread pool (or in the event loop).
+        """
+        return None if pool is None else self.__executors.thread_pool
+
+    def encoded_response(self, encoded: bytes) -> Response:
+        """Returns the response containing the already :encoded result."""
+        return Response(
+            encoded, status_code=self.__response_code, media_type=JSON_MEDIA_TYPE
+        )
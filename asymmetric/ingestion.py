@@ -0,0 +1,254 @@
+"""
+A module for containing the logic to receive streamed request bodies.
+Instead of buffering the whole body, the records get decoded as the
+chunks of the body arrive, so the memory usage stays bounded.
+"""
+
+import asyncio
+import re
+from typing import Any, AsyncIterator, Iterator, List, Optional, Union
+
+from asymmetric.codecs import JSONCodec
+from asymmetric.constants import RUN_IN_LOOP, RUN_IN_PROCESS
+from asymmetric.errors import InvalidStreamedBodyError, InvalidStreamingParameterError
+from asymmetric.plans import CallPlan
+
+ARRAY_TOKENS = re.compile(rb'[\[\]{}",]')
+STRING_TOKENS = re.compile(rb'["\\]')
+
+
+class JSONArraySplitter:
+
+    """
+    Class to split a top-level JSON array, fed chunk by chunk, into the
+    raw JSON of its elements. Only the structural characters get looked
+    at, the elements get decoded afterwards by a codec.
+    """
+
+    def __init__(self) -> None:
+        self.__buffer: bytearray = bytearray()
+        self.__position: int = 0  # Next byte to be scanned
+        self.__element_start: int = 0
+        self.__depth: int = 0
+        self.__in_string: bool = False
+        self.__finished: bool = False
+
+    @property
+    def finished(self) -> bool:
+        """Returns a boolean indicating if the array was closed."""
+        return self.__finished
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        """
+        Adds :chunk to the scanned data and returns the raw JSON of every
+        element completed by it.
+        """
+        if self.__finished:
+            if chunk.strip():
+                raise InvalidStreamedBodyError("Unexpected data after the array.")
+            return []
+        self.__buffer += chunk
+        elements = self.__scan()
+        if self.__finished and self.__buffer[self.__position :].strip():
+            raise InvalidStreamedBodyError("Unexpected data after the array.")
+        # Forget about the already split elements
+        del self.__buffer[: self.__element_start]
+        self.__position -= self.__element_start
+        self.__element_start = 0
+        return elements
+
+    def close(self) -> None:
+        """Raises an error if the array was not completely received."""
+        if not self.__finished:
+            raise InvalidStreamedBodyError("The array was not closed.")
+
+    def __scan(self) -> List[bytes]:  # pylint: disable=R0912
+        """Scans the buffer from the last position and returns the elements."""
+        elements: List[bytes] = []
+        buffer = self.__buffer
+        while not self.__finished:
+            if self.__in_string:
+                match = STRING_TOKENS.search(buffer, self.__position)
+                if match is None:
+                    self.__position = len(buffer)
+                    break
+                if match.group() == b"\\":
+                    if match.end() >= len(buffer):
+                        # The escaped character has not arrived yet
+                        self.__position = match.start()
+                        break
+                    self.__position = match.end() + 1
+                    continue
+                self.__in_string = False
+                self.__position = match.end()
+                continue
+            match = ARRAY_TOKENS.search(buffer, self.__position)
+            if match is None:
+                self.__position = len(buffer)
+                break
+            token = match.group()
+            self.__position = match.end()
+            if self.__depth == 0 and (token != b"[" or buffer[: match.start()].strip()):
+                raise InvalidStreamedBodyError("The body is not a JSON array.")
+            if token == b'"':
+                self.__in_string = True
+            elif token in b"[{":
+                self.__depth += 1
+                if self.__depth == 1:
+                    self.__element_start = self.__position
+            elif token in b"]}":
+                self.__depth -= 1
+                if self.__depth == 0:
+                    element = bytes(buffer[self.__element_start : match.start()])
+                    if element.strip():
+                        elements.append(element)
+                    self.__element_start = self.__position
+                    self.__finished = True
+            elif self.__depth == 1:  # A comma between elements
+                elements.append(bytes(buffer[self.__element_start : match.start()]))
+                self.__element_start = self.__position
+        return elements
+
+
+async def iterate_ndjson(
+    chunks: AsyncIterator[bytes], codec: JSONCodec
+) -> AsyncIterator[Any]:
+    """Decodes the newline delimited JSON of :chunks record by record."""
+    pending = b""
+    async for chunk in chunks:
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            if line.strip():
+                yield decode_record(line, codec)
+    if pending.strip():
+        yield decode_record(pending, codec)
+
+
+async def iterate_json_array(
+    chunks: AsyncIterator[bytes], codec: JSONCodec
+) -> AsyncIterator[Any]:
+    """Decodes the top-level JSON array of :chunks element by element."""
+    splitter = JSONArraySplitter()
+    async for chunk in chunks:
+        for element in splitter.feed(chunk):
+            yield decode_record(element, codec)
+    splitter.close()
+
+
+async def iterate_records(
+    chunks: AsyncIterator[bytes], codec: JSONCodec, content_type: str = ""
+) -> AsyncIterator[Any]:
+    """
+    Decodes the records of a streamed body. The body gets read as newline
+    delimited JSON if the content type says so, otherwise the format gets
+    sniffed: bodies starting with "[" are JSON arrays.
+    """
+    first_chunk = b""
+    async for chunk in chunks:
+        first_chunk = chunk
+        if chunk.strip():
+            break
+
+    async def rewound() -> AsyncIterator[bytes]:
+        yield first_chunk
+        async for chunk in chunks:
+            yield chunk
+
+    is_ndjson = "ndjson" in content_type or "jsonlines" in content_type
+    if not is_ndjson and first_chunk.lstrip().startswith(b"["):
+        records = iterate_json_array(rewound(), codec)
+    else:
+        records = iterate_ndjson(rewound(), codec)
+    async for record in records:
+        yield record
+
+
+def decode_record(raw: bytes, codec: JSONCodec) -> Any:
+    """Decodes a single record, raising a client error if it is invalid."""
+    try:
+        return codec.loads(raw)
+    except ValueError as error:
+        raise InvalidStreamedBodyError(f"Invalid record: {error}") from error
+
+
+class BlockingIterator:
+
+    """
+    Sync iterator over an async iterator. Meant to be iterated from a
+    worker thread while the event loop keeps receiving the body.
+    """
+
+    def __init__(
+        self, records: AsyncIterator[Any], loop: asyncio.AbstractEventLoop
+    ) -> None:
+        self.__records = records
+        self.__loop = loop
+
+    def __iter__(self) -> Iterator[Any]:
+        return self
+
+    def __next__(self) -> Any:
+        future = asyncio.run_coroutine_threadsafe(self.__pull(), self.__loop)
+        try:
+            return future.result()
+        except StopAsyncIteration:
+            raise StopIteration  # pylint: disable=W0707
+
+    async def __pull(self) -> Any:
+        """Pulls the next record inside the event loop."""
+        return await self.__records.__anext__()
+
+
+def get_streaming_parameter(plan: CallPlan) -> str:
+    """
+    Returns the name of the parameter of the function of :plan that will
+    receive the streamed body. Raises an error if there is not exactly one
+    iterator parameter.
+    """
+    name = plan.function.__qualname__
+    if len(plan.iterators) != 1:
+        raise InvalidStreamingParameterError(
+            f"Function '{name}' must have exactly one parameter annotated as an "
+            "iterator (or async iterator) to receive the streamed body."
+        )
+    return next(iter(plan.iterators))
+
+
+def validate_body_streaming(
+    plan: CallPlan,
+    run_in: Optional[str] = None,
+    callback: Union[bool, Any] = False,
+) -> None:
+    """
+    Raises an error if the function of :plan can't receive the request
+    body as a stream. Async iterators can only be iterated by async
+    functions, while sync iterators must be iterated from a thread.
+    """
+    name = plan.function.__qualname__
+    parameter = get_streaming_parameter(plan)
+    if callback:
+        raise InvalidStreamingParameterError(
+            f"Function '{name}' is a callback and can't receive a streamed body."
+        )
+    if plan.is_generator or plan.is_async_generator:
+        # The response would get streamed while the body is still arriving
+        raise InvalidStreamingParameterError(
+            f"Function '{name}' is a generator and can't receive a streamed body."
+        )
+    is_async_function = plan.is_async
+    if plan.iterators[parameter] and not is_async_function:
+        raise InvalidStreamingParameterError(
+            f"Function '{name}' is sync and can't iterate the async iterator "
+            f"'{parameter}'."
+        )
+    if not plan.iterators[parameter]:
+        if is_async_function:
+            raise InvalidStreamingParameterError(
+                f"Function '{name}' is async, so '{parameter}' must be annotated "
+                "as an async iterator."
+            )
+        if run_in in (RUN_IN_LOOP, RUN_IN_PROCESS):
+            raise InvalidStreamingParameterError(
+                f"Function '{name}' must run in a thread to iterate '{parameter}'."
+            )
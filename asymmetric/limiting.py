@@ -0,0 +1,267 @@
+"""
+A module for containing the concurrency limiting logic of asymmetric.
+Each limited endpoint handles up to a maximum amount of requests at the
+same time, queues up to a maximum amount of requests and sheds the rest
+with a 503 response telling the client when to retry. The maximum can
+also adapt itself (AIMD style) to the latency of the requests and to the
+lag of the event loop.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Deque, Optional, Union
+
+from asymmetric.configs import AdaptiveLimitConfig
+from asymmetric.constants import LIMITER_BASELINE_DRIFT, LIMITER_SMOOTHING
+from asymmetric.errors import EndpointOverloadedError, InvalidConcurrencyLimitError
+
+
+def validate_concurrency_limit(
+    max_concurrency: Union[int, AdaptiveLimitConfig, None], max_queue: int = 0
+) -> None:
+    """Raises an error if :max_concurrency or :max_queue are invalid."""
+    if max_concurrency is None:
+        if max_queue:
+            raise InvalidConcurrencyLimitError(
+                "The max_queue can only be used along with a max_concurrency."
+            )
+        return
+    if isinstance(max_concurrency, AdaptiveLimitConfig):
+        validate_adaptive_limit(max_concurrency)
+    elif not isinstance(max_concurrency, int) or max_concurrency < 1:
+        raise InvalidConcurrencyLimitError(
+            f"Invalid max_concurrency '{max_concurrency}'. It must be a "
+            "positive integer."
+        )
+    if not isinstance(max_queue, int) or max_queue < 0:
+        raise InvalidConcurrencyLimitError(
+            f"Invalid max_queue '{max_queue}'. It can't be negative."
+        )
+
+
+def validate_adaptive_limit(config: AdaptiveLimitConfig) -> None:
+    """Raises an error if :config is invalid."""
+    if not 1 <= config.min_limit <= config.initial_limit <= config.max_limit:
+        raise InvalidConcurrencyLimitError(
+            f"Invalid adaptive limits ({config.min_limit}, {config.initial_limit}"
+            f", {config.max_limit}). They must satisfy 1 <= min_limit <= "
+            "initial_limit <= max_limit."
+        )
+    if config.latency_tolerance <= 1:
+        raise InvalidConcurrencyLimitError(
+            f"Invalid latency tolerance '{config.latency_tolerance}'. It must "
+            "be bigger than 1."
+        )
+    if config.max_loop_lag_ms <= 0:
+        raise InvalidConcurrencyLimitError(
+            f"Invalid maximum loop lag '{config.max_loop_lag_ms}'. It must be "
+            "positive."
+        )
+    if not 0 < config.backoff < 1:
+        raise InvalidConcurrencyLimitError(
+            f"Invalid backoff '{config.backoff}'. It must be between 0 and 1."
+        )
+
+
+class ConcurrencyLimiter:
+
+    """
+    Class to limit the amount of requests of an endpoint being handled at
+    the same time. Up to :max_concurrency requests get handled and up to
+    :max_queue requests wait for their turn (first come, first served).
+    Any request exceeding that gets rejected, with an estimation of how
+    long it would have waited.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int = 0) -> None:
+        self.__max_concurrency: int = max_concurrency
+        self.__max_queue: int = max_queue
+        self.__active: int = 0
+        self.__waiters: "Deque[asyncio.Future[None]]" = deque()
+        self.__rejected_count: int = 0
+        self.__average_duration: Optional[float] = None
+
+    @property
+    def max_concurrency(self) -> int:
+        """Returns the maximum amount of requests handled at the same time."""
+        return self.__max_concurrency
+
+    @property
+    def max_queue(self) -> int:
+        """Returns the maximum amount of requests waiting for their turn."""
+        return self.__max_queue
+
+    @property
+    def active_count(self) -> int:
+        """Returns the amount of requests being handled."""
+        return self.__active
+
+    @property
+    def queue_depth(self) -> int:
+        """Returns the amount of requests waiting for their turn."""
+        return len(self.__waiters)
+
+    @property
+    def rejected_count(self) -> int:
+        """Returns the amount of requests rejected."""
+        return self.__rejected_count
+
+    @property
+    def average_duration(self) -> Optional[float]:
+        """
+        Returns the (exponentially weighted) average time in seconds it
+        takes to handle a request, or None if no request got handled yet.
+        """
+        return self.__average_duration
+
+    def retry_after(self) -> int:
+        """
+        Returns the estimated amount of seconds until the limiter has room
+        for another request (at least one second).
+        """
+        if self.__average_duration is None:
+            return 1
+        pending = self.queue_depth + 1
+        wait = pending * self.__average_duration / self.max_concurrency
+        return max(1, math.ceil(wait))
+
+    async def acquire(self) -> float:
+        """
+        Waits for the turn of a request and returns the moment it started.
+        Raises an error if the queue is full.
+        """
+        if self.__active < self.max_concurrency and not self.__waiters:
+            self.__active += 1
+            return time.monotonic()
+        if len(self.__waiters) >= self.__max_queue:
+            self.__rejected_count += 1
+            raise EndpointOverloadedError(
+                "The endpoint is overloaded, please try again later.",
+                retry_after=self.retry_after(),
+            )
+        waiter: "asyncio.Future[None]" = asyncio.get_event_loop().create_future()
+        self.__waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # The turn arrived along with the cancellation
+            elif waiter in self.__waiters:
+                self.__waiters.remove(waiter)
+            raise
+        return time.monotonic()
+
+    def release(self, started_at: Optional[float] = None) -> None:
+        """
+        Ends the turn of a request (that started at :started_at, to keep
+        track of how long requests take) and gives it to the next ones.
+        """
+        if started_at is not None:
+            self.observe(time.monotonic() - started_at)
+        self.__active -= 1
+        while self.__waiters and self.__active < self.max_concurrency:
+            waiter = self.__waiters.popleft()
+            if not waiter.done():
+                self.__active += 1
+                waiter.set_result(None)  # The turn goes to the waiter
+
+    def observe(self, duration: float) -> None:
+        """Takes into account that a request took :duration seconds."""
+        self.__average_duration = (
+            duration
+            if self.__average_duration is None
+            else LIMITER_SMOOTHING * duration
+            + (1 - LIMITER_SMOOTHING) * self.__average_duration
+        )
+
+
+class AdaptiveConcurrencyLimiter(ConcurrencyLimiter):
+
+    """
+    Concurrency limiter whose maximum adapts to the requests (AIMD style).
+    The maximum grows by one after every fast request that used most of
+    it, and gets multiplied by the backoff of :config after every request
+    taking way more than usual or finding the event loop lagging, so that
+    an overloaded endpoint rejects requests instead of slowing down.
+    """
+
+    def __init__(self, config: AdaptiveLimitConfig, max_queue: int = 0) -> None:
+        self.__config: AdaptiveLimitConfig = config
+        self.__limit: float = float(config.initial_limit)
+        self.__baseline: Optional[float] = None
+        self.__loop_lag: float = 0.0
+        self.__increase_count: int = 0
+        self.__decrease_count: int = 0
+        super().__init__(config.initial_limit, max_queue=max_queue)
+
+    @property
+    def config(self) -> AdaptiveLimitConfig:
+        """Returns the adaptive limit configuration."""
+        return self.__config
+
+    @property
+    def max_concurrency(self) -> int:
+        """Returns the current maximum of requests handled at the same time."""
+        return int(self.__limit)
+
+    @property
+    def baseline(self) -> Optional[float]:
+        """
+        Returns the usual time in seconds it takes to handle a request, or
+        None if no request got handled yet.
+        """
+        return self.__baseline
+
+    @property
+    def loop_lag(self) -> float:
+        """Returns the last lag (in seconds) measured on the event loop."""
+        return self.__loop_lag
+
+    @property
+    def increase_count(self) -> int:
+        """Returns the amount of times the maximum got increased."""
+        return self.__increase_count
+
+    @property
+    def decrease_count(self) -> int:
+        """Returns the amount of times the maximum got decreased."""
+        return self.__decrease_count
+
+    async def acquire(self) -> float:
+        """
+        Measures the lag of the event loop (the time it takes to get the
+        control back after yielding it), then waits for the turn of a
+        request and returns the moment it started.
+        """
+        start = time.perf_counter()
+        await asyncio.sleep(0)
+        self.__loop_lag = time.perf_counter() - start
+        return await super().acquire()
+
+    def observe(self, duration: float) -> None:
+        """
+        Takes into account that a request took :duration seconds, adapting
+        the maximum of requests handled at the same time.
+        """
+        super().observe(duration)
+        baseline = self.__baseline
+        if baseline is None or duration < baseline:
+            self.__baseline = duration
+        else:
+            # Follow slower requests slowly, so they still look slow
+            self.__baseline = baseline + LIMITER_BASELINE_DRIFT * (duration - baseline)
+        if baseline is None:
+            return
+        if (
+            duration > self.__config.latency_tolerance * baseline
+            or self.__loop_lag * 1000 > self.__config.max_loop_lag_ms
+        ):
+            self.__limit = max(
+                float(self.__config.min_limit), self.__limit * self.__config.backoff
+            )
+            self.__decrease_count += 1
+        elif 2 * self.active_count >= self.__limit:
+            self.__limit = min(float(self.__config.max_limit), self.__limit + 1)
+            self.__increase_count += 1
@@ -2,16 +2,20 @@
 A module for containing the loggers of asymmetric.
 """
 
-import json
 import logging
 import logging.config
 import os
-from typing import Any, Callable, Dict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Type
 
 from starlette.requests import Request
 
+from asymmetric.codecs import JSONCodec
 from asymmetric.utils import get_body
 
+# Settings parsed from the environment by configure_loggers
+LOG_SETTINGS: Dict[str, Any] = {"body_limit": None}
+
 
 def configure_loggers() -> None:
     """Configures the loggers."""
@@ -51,6 +55,28 @@ def configure_loggers() -> None:
         configuration["root"]["handlers"].append("file")
 
     logging.config.dictConfig(configuration)
+    LOG_SETTINGS["body_limit"] = parse_body_limit(os.getenv("LOG_BODY_LIMIT"))
+
+
+def parse_body_limit(limit: Optional[str]) -> Optional[int]:
+    """
+    Parses the LOG_BODY_LIMIT environmental variable value, :limit. If it
+    is not a non-negative integer, logs a warning and ignores it.
+    """
+    if limit is None:
+        return None
+    try:
+        parsed = int(limit)
+    except ValueError:
+        parsed = -1
+    if parsed < 0:
+        log(
+            f"Ignoring the invalid LOG_BODY_LIMIT value '{limit}' "
+            "(it must be a non-negative integer).",
+            level="warning",
+        )
+        return None
+    return parsed
 
 
 def log(message: str, level: str = "info") -> None:
@@ -61,29 +87,80 @@ def log(message: str, level: str = "info") -> None:
     logger(f"[[asymmetric]] {message}")
 
 
+@contextmanager
+def log_critical_errors(*errors: Type[Exception]) -> Iterator[None]:
+    """
+    Logs the {errors} raised inside the context with critical level and
+    raises them again. Meant for the errors that must stop the server.
+    """
+    try:
+        yield
+    except errors as error:
+        log(str(error), level="critical")
+        raise type(error)(error) from error
+
+
+def log_enabled(level: str = "info") -> bool:
+    """
+    Returns a boolean indicating if a message with {level} level would
+    actually get logged. Useful to avoid building messages nobody will see.
+    """
+    return logging.getLogger().isEnabledFor(getattr(logging, level.upper()))
+
+
 async def log_request(
-    request: Request, route: str, function: Callable[..., Any]
+    request: Request,
+    route: str,
+    function: Callable[..., Any],
+    body: Optional[Dict[str, Any]] = None,
+    codec: Optional[JSONCodec] = None,
+    raw_body: Optional[bytes] = None,
 ) -> None:
     """
     Logs a request, including the method used for the request, the
     route and the name of the python function being called. Then,
-    logs the request body.
+    logs the request body (reading it only if it was not given, and
+    truncating its :raw_body if needed). If the info level is disabled,
+    it does nothing.
     """
+    if not log_enabled():
+        return
     log(
         f"{request.method} request to '{route}' endpoint "
         f"('{function.__name__}' function)."
     )
-    log_request_body(await get_body(request))
+    if body is None:
+        raw_body = await request.body()
+        body = await get_body(request, codec=codec)
+    log_request_body(body, codec=codec, raw_body=raw_body)
 
 
-def log_request_body(body: Dict[str, Any]) -> None:
+def log_request_body(
+    body: Dict[str, Any],
+    codec: Optional[JSONCodec] = None,
+    raw_body: Optional[bytes] = None,
+) -> None:
     """
-    Logs a request body formatted as a json.
+    Logs a request body formatted as a json (by :codec, if given). If the
+    LOG_BODY_LIMIT environmental variable is set and the body is bigger
+    than that amount of bytes, its :raw_body (or its compact encoding, if
+    not given) gets truncated and logged as it is, so huge bodies never
+    get formatted. Bodies within the limit get logged pretty-printed.
     """
-    log(
-        "Request Body:\n"
-        + json.dumps(body, indent=2, sort_keys=False, ensure_ascii=False)
-    )
+    codec = codec or JSONCodec()
+    limit: Optional[int] = LOG_SETTINGS["body_limit"]
+    if limit is not None and raw_body is None:
+        try:
+            raw_body = codec.dumps(body)
+        except ValueError:  # Non-standard values, only allowed when pretty
+            raw_body = None
+    if limit is not None and raw_body is not None and len(raw_body) > limit:
+        truncated = raw_body[:limit].decode("utf-8", errors="replace")
+        omitted = len(raw_body) - limit
+        log(f"Request Body:\n{truncated}... ({omitted} bytes omitted)")
+        return
+    formatted = codec.dumps(body, pretty=True).decode("utf-8")
+    log(f"Request Body:\n{formatted}")
 
 
 configure_loggers()
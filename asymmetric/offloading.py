@@ -0,0 +1,103 @@
+"""
+A module for containing the payload offloading logic of asymmetric. Big
+payloads get decoded and encoded in a thread, so they don't block the
+event loop, while small ones stay in the loop (where they are cheaper
+than the hop to the thread). The time each request blocks the event loop
+gets measured, to be reported in its Server-Timing header.
+"""
+
+import asyncio
+import functools
+import time
+from concurrent.futures import Executor
+from contextvars import ContextVar
+from typing import Any, Callable, List, Optional, Tuple
+
+from asymmetric.constants import LOOP_TIMING_NAME
+
+
+def validate_offload_size(offload_size: Optional[int]) -> None:
+    """Raises an error if :offload_size is not a positive integer (or None)."""
+    if offload_size is not None and (
+        not isinstance(offload_size, int) or offload_size <= 0
+    ):
+        raise ValueError(
+            f"Invalid offload size '{offload_size}'. It must be a positive "
+            "integer (or None)."
+        )
+
+
+class LoopTimer:
+
+    """
+    Class to measure the time spent by a request on each of its steps,
+    and how much of that time the event loop was blocked.
+    """
+
+    def __init__(self) -> None:
+        self.__timings: List[Tuple[str, float]] = []
+        self.__blocked: float = 0.0
+
+    @property
+    def timings(self) -> List[Tuple[str, float]]:
+        """Returns the name and the duration (in seconds) of each step."""
+        return list(self.__timings)
+
+    @property
+    def blocked(self) -> float:
+        """Returns the time (in seconds) the event loop was blocked."""
+        return self.__blocked
+
+    def record(self, name: str, duration: float, blocking: bool) -> None:
+        """
+        Records that the :name step took :duration seconds, blocking the
+        event loop if :blocking is True.
+        """
+        self.__timings.append((name, duration))
+        if blocking:
+            self.__blocked += duration
+
+    def header(self) -> str:
+        """Returns the Server-Timing header value of the timings."""
+        timings = self.__timings + [(LOOP_TIMING_NAME, self.__blocked)]
+        return ", ".join(
+            f"{name};dur={duration * 1000:.3f}" for name, duration in timings
+        )
+
+
+# The timer of the request being handled (if any)
+current_timer: ContextVar[Optional[LoopTimer]] = ContextVar(
+    "current_timer", default=None
+)
+
+
+def record_timing(name: str, duration: float, blocking: bool) -> None:
+    """Records a step in the timer of the current request (if any)."""
+    timer = current_timer.get()
+    if timer is not None:
+        timer.record(name, duration, blocking)
+
+
+async def run_sized(
+    name: str,
+    function: Callable[..., Any],
+    *args: Any,
+    size: int,
+    offload_size: Optional[int],
+    executor: Executor,
+) -> Any:
+    """
+    Returns the result of calling :function with :args, inside :executor
+    if the payload :size (in bytes) is at least :offload_size. Otherwise,
+    it gets called inside the event loop. The call gets recorded as the
+    :name step of the current request.
+    """
+    start = time.perf_counter()
+    if offload_size is None or size < offload_size:
+        result = function(*args)
+        record_timing(name, time.perf_counter() - start, blocking=True)
+        return result
+    loop = asyncio.get_event_loop()
+    result = await loop.run_in_executor(executor, functools.partial(function, *args))
+    record_timing(name, time.perf_counter() - start, blocking=False)
+    return result
@@ -0,0 +1,76 @@
+"""
+A module for containing the call plans of asymmetric.
+"""
+
+import inspect
+from types import MappingProxyType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from asymmetric.constants import ASYNC_ITERATOR_TYPES, SYNC_ITERATOR_TYPES
+
+
+class CallPlan(NamedTuple):
+
+    """
+    Immutable description of how a function must be called. It gets
+    computed once (at decoration time) so that no introspection is
+    needed while handling a request.
+    """
+
+    function: Callable[..., Any]
+    args: Tuple[str, ...]
+    accepted: FrozenSet[str]
+    accepts_kwargs: bool
+    is_async: bool
+    is_generator: bool
+    is_async_generator: bool
+    defaults: Mapping[str, Any]
+    annotations: Mapping[str, Any]
+    iterators: Mapping[str, bool]
+
+
+def is_async_iterator_type(annotation: Any) -> Optional[bool]:
+    """
+    Returns a boolean indicating if :annotation is an async iterator type
+    (like AsyncIterator[int]) or a sync one (like Iterator[int]). Returns
+    None if it is not an iterator type at all.
+    """
+    origin = getattr(annotation, "__origin__", annotation)
+    if origin in ASYNC_ITERATOR_TYPES:
+        return True
+    if origin in SYNC_ITERATOR_TYPES:
+        return False
+    return None
+
+
+def get_call_plan(function: Callable[..., Any]) -> CallPlan:
+    """Introspects :function and returns its call plan."""
+    params = inspect.getfullargspec(function)
+    defaults = params.defaults or ()
+    first_default = len(params.args) - len(defaults)
+    iterators: Dict[str, bool] = {}
+    for arg in params.args:
+        is_async_iterator = is_async_iterator_type(params.annotations.get(arg))
+        if is_async_iterator is not None:
+            iterators[arg] = is_async_iterator
+    return CallPlan(
+        function=function,
+        args=tuple(params.args),
+        accepted=frozenset(params.args),
+        accepts_kwargs=params.varkw is not None,
+        is_async=inspect.iscoroutinefunction(function),
+        is_generator=inspect.isgeneratorfunction(function),
+        is_async_generator=inspect.isasyncgenfunction(function),
+        defaults=MappingProxyType(dict(zip(params.args[first_default:], defaults))),
+        annotations=MappingProxyType(dict(params.annotations)),
+        iterators=MappingProxyType(iterators),
+    )
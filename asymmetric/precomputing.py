@@ -0,0 +1,126 @@
+"""
+A module for containing the precomputing logic of asymmetric. The results
+of the declared argument sets of an endpoint get computed when the server
+starts (before it accepts any request), so the first requests after a
+deploy don't have to wait for them.
+"""
+
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from asymmetric.caching import get_cache_key
+from asymmetric.configs import PrecomputeConfig
+from asymmetric.errors import InvalidPrecomputingError
+from asymmetric.loggers import log
+from asymmetric.plans import CallPlan
+from asymmetric.utils import filter_params
+
+
+def validate_precomputing(
+    config: PrecomputeConfig,
+    plan: CallPlan,
+    callback: Any = False,
+    stream_body: bool = False,
+    chunk_size: Optional[int] = None,
+) -> None:
+    """
+    Raises an error if :config is invalid or if the results of the
+    function of :plan can't be precomputed.
+    """
+    name = plan.function.__qualname__
+    if config.ttl is not None and config.ttl <= 0:
+        raise InvalidPrecomputingError(
+            f"Invalid precompute ttl '{config.ttl}'. It must be positive (or None)."
+        )
+    if not callable(config.params) and not isinstance(config.params, Iterable):
+        raise InvalidPrecomputingError(
+            f"Invalid precompute params '{config.params}'. They must be an "
+            "iterable of dicts (or a callable returning one)."
+        )
+    if plan.is_generator or plan.is_async_generator:
+        raise InvalidPrecomputingError(f"Function '{name}' is a generator.")
+    if callback:
+        raise InvalidPrecomputingError(f"Function '{name}' is a callback.")
+    if stream_body:
+        raise InvalidPrecomputingError(f"Function '{name}' receives a streamed body.")
+    if chunk_size is not None:
+        raise InvalidPrecomputingError(
+            f"Function '{name}' sends its results in chunks, so they can't be "
+            "precomputed as a whole."
+        )
+
+
+class PrecomputedTable:
+
+    """
+    Class to hold the encoded results of the declared argument sets of a
+    function, keyed by the hash of their (filtered) params.
+    """
+
+    def __init__(self, config: PrecomputeConfig, plan: CallPlan) -> None:
+        self.__config: PrecomputeConfig = config
+        self.__plan: CallPlan = plan
+        self.__entries: Dict[str, Tuple[bytes, float]] = {}
+        self.__hits: int = 0
+        self.__errors: int = 0
+
+    @property
+    def config(self) -> PrecomputeConfig:
+        """Returns the precompute configuration."""
+        return self.__config
+
+    @property
+    def hits(self) -> int:
+        """Returns the amount of calls served from the table."""
+        return self.__hits
+
+    @property
+    def errors(self) -> int:
+        """Returns the amount of argument sets that failed to get computed."""
+        return self.__errors
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def key(self, params: Dict[str, Any]) -> str:
+        """Returns the table key of the (already filtered) :params."""
+        return get_cache_key(params)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Returns the result precomputed for :key, or None if there is no
+        result or if it expired.
+        """
+        entry = self.__entries.get(key)
+        if entry is None:
+            return None
+        if self.__config.ttl is not None and (
+            time.monotonic() - entry[1] >= self.__config.ttl
+        ):
+            del self.__entries[key]
+            return None
+        self.__hits += 1
+        return entry[0]
+
+    async def warm(self, compute: Callable[[Dict[str, Any]], Awaitable[bytes]]) -> None:
+        """
+        Computes the encoded result of every declared argument set using
+        :compute. The argument sets that fail get logged and skipped.
+        """
+        params_sets = self.__config.params
+        if callable(params_sets):
+            params_sets = params_sets()
+        name = self.__plan.function.__qualname__
+        for params_set in params_sets:
+            params = filter_params(self.__plan.function, params_set, plan=self.__plan)
+            try:
+                body = await compute(params)
+            except Exception as error:
+                self.__errors += 1
+                log(
+                    f"Error while precomputing '{name}' with {params_set}: {error}",
+                    level="error",
+                )
+                continue
+            self.__entries[self.key(params)] = (body, time.monotonic())
+        log(f"Precomputed {len(self.__entries)} results of '{name}'")
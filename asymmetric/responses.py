@@ -0,0 +1,59 @@
+"""
+A module for containing the responses of asymmetric.
+"""
+
+import asyncio
+from typing import Any, Dict, Optional
+
+from starlette.responses import Response, StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from asymmetric.codecs import JSONCodec
+
+
+class CodecJSONResponse(Response):
+
+    """
+    JSON response rendered by a JSON codec instead of the standard
+    library json module.
+    """
+
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        content: Any = None,
+        status_code: int = 200,
+        headers: Optional[Dict[str, str]] = None,
+        codec: Optional[JSONCodec] = None,
+    ) -> None:
+        self.codec: JSONCodec = codec or JSONCodec()
+        super().__init__(content, status_code, headers or {})
+
+    def render(self, content: Any) -> bytes:
+        """Renders the content using the codec."""
+        return self.codec.dumps(content)
+
+
+class EncodedStreamingResponse(StreamingResponse):
+
+    """
+    Streaming response for already encoded chunks. Stops streaming as
+    soon as the client disconnects.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Wrap the coroutines in tasks explicitly, as newer versions of
+        # asyncio refuse to wait for bare coroutines
+        tasks = [
+            asyncio.ensure_future(self.stream_response(send)),
+            asyncio.ensure_future(self.listen_for_disconnect(receive)),
+        ]
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        for task in done:
+            task.result()
+
+        if self.background is not None:
+            await self.background()
@@ -0,0 +1,295 @@
+"""
+A module for containing the streaming logic of asymmetric.
+"""
+
+import asyncio
+import inspect
+import itertools
+from concurrent.futures import Executor
+from typing import Any, AsyncIterator, Iterator, List, Optional, Union
+
+from starlette.responses import Response
+
+from asymmetric.codecs import JSONCodec
+from asymmetric.constants import (
+    ENCODING_INLINE_ITEMS,
+    JSON_MEDIA_TYPE,
+    NDJSON_MEDIA_TYPE,
+    STREAM_CHUNK_ITEMS,
+    STREAM_NDJSON,
+    STREAMING_FORMATS,
+)
+from asymmetric.errors import InvalidChunkSizeError, InvalidStreamingFormatError
+from asymmetric.loggers import log
+from asymmetric.responses import EncodedStreamingResponse
+
+
+def validate_streaming_format(stream: str) -> None:
+    """Raises an error if :stream is not a valid streaming format."""
+    if stream not in STREAMING_FORMATS:
+        raise InvalidStreamingFormatError(
+            f"Invalid streaming format '{stream}'. Valid streaming formats are "
+            + ", ".join(f"'{format_}'" for format_ in STREAMING_FORMATS)
+            + "."
+        )
+
+
+def validate_chunk_size(chunk_size: Optional[int]) -> None:
+    """Raises an error if :chunk_size is not a positive integer (or None)."""
+    if chunk_size is not None and (not isinstance(chunk_size, int) or chunk_size <= 0):
+        raise InvalidChunkSizeError(
+            f"Invalid chunk size '{chunk_size}'. The chunk size must be a "
+            "positive integer."
+        )
+
+
+def pull_chunk(items: Iterator[Any], size: int = STREAM_CHUNK_ITEMS) -> List[Any]:
+    """Pulls up to :size items from :items."""
+    return list(itertools.islice(items, size))
+
+
+async def iterate_async_chunks(items: AsyncIterator[Any]) -> AsyncIterator[List[Any]]:
+    """
+    Iterates the async :items chunk by chunk. The items that are already
+    available get grouped (up to STREAM_CHUNK_ITEMS of them), and the
+    chunk gets sent as soon as the next item is not ready yet.
+    """
+    chunk: List[Any] = []
+    pending = asyncio.ensure_future(items.__anext__())
+    try:
+        while True:
+            if chunk and (len(chunk) >= STREAM_CHUNK_ITEMS or not pending.done()):
+                yield chunk
+                chunk = []
+            try:
+                chunk.append(await pending)
+            except StopAsyncIteration:
+                break
+            pending = asyncio.ensure_future(items.__anext__())
+            # Let the next item get produced if it doesn't have to wait
+            await asyncio.sleep(0)
+    finally:
+        pending.cancel()
+    if chunk:
+        yield chunk
+
+
+async def iterate_chunks(
+    items: Union[Iterator[Any], AsyncIterator[Any]],
+    executor: Optional[Executor] = None,
+) -> AsyncIterator[List[Any]]:
+    """
+    Iterates :items chunk by chunk. Sync iterators get pulled inside
+    :executor (if given) several items at a time, so that the hops to
+    the executor stay cheap. Items only get pulled when the previous
+    chunk was consumed (async iterators get one item ahead).
+    """
+    if isinstance(items, AsyncIterator):
+        async for chunk in iterate_async_chunks(items):
+            yield chunk
+        return
+    loop = asyncio.get_event_loop()
+    while True:
+        if executor is None:
+            chunk = pull_chunk(items)
+        else:
+            chunk = await loop.run_in_executor(executor, pull_chunk, items)
+        if not chunk:
+            return
+        yield chunk
+
+
+async def encode_chunks(
+    chunks: AsyncIterator[List[Any]], codec: JSONCodec, stream: str
+) -> AsyncIterator[bytes]:
+    """
+    Encodes every chunk of :chunks using :codec, framing the items as
+    newline delimited JSON or as the elements of a JSON array.
+    """
+    if stream == STREAM_NDJSON:
+        async for chunk in chunks:
+            yield b"".join(codec.dumps(item) + b"\n" for item in chunk)
+        return
+    opening = b"["
+    async for chunk in chunks:
+        yield opening + b",".join(codec.dumps(item) for item in chunk)
+        opening = b","
+    yield b"[]" if opening == b"[" else b"]"
+
+
+async def stream_items(
+    items: Union[Iterator[Any], AsyncIterator[Any]],
+    codec: JSONCodec,
+    stream: str,
+    executor: Optional[Executor] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Streams the encoded :items. As the status code was already sent, an
+    error ends the stream early (and gets logged).
+    """
+    try:
+        async for encoded in encode_chunks(
+            iterate_chunks(items, executor), codec, stream
+        ):
+            yield encoded
+    except Exception as error:
+        log(f"Error while streaming the response: {error}", level="error")
+    finally:
+        await close_items(items)
+
+
+async def close_items(items: Union[Iterator[Any], AsyncIterator[Any]]) -> None:
+    """
+    Closes :items (if it is a generator), so that its cleanup code runs
+    even if the stream ended early. A generator still being pulled by a
+    worker can't be closed, so it gets left to the garbage collector.
+    """
+    try:
+        if inspect.isasyncgen(items):
+            await items.aclose()  # type: ignore
+        elif inspect.isgenerator(items):
+            items.close()  # type: ignore
+    except (RuntimeError, ValueError):
+        pass
+
+
+def streaming_response(
+    items: Union[Iterator[Any], AsyncIterator[Any]],
+    codec: JSONCodec,
+    stream: str = STREAM_NDJSON,
+    status_code: int = 200,
+    executor: Optional[Executor] = None,
+) -> EncodedStreamingResponse:
+    """
+    Returns a response that streams :items as they get produced. The
+    response sends each chunk only after the previous one was sent, so
+    slow clients slow down the production of the items.
+    """
+    media_type = NDJSON_MEDIA_TYPE if stream == STREAM_NDJSON else JSON_MEDIA_TYPE
+    return EncodedStreamingResponse(
+        stream_items(items, codec, stream, executor=executor),
+        status_code=status_code,
+        media_type=media_type,
+    )
+
+
+def is_inline(data: Any) -> bool:
+    """
+    Returns a boolean indicating if :data is small enough to be encoded
+    at once (it is not a container, or it is a small flat container).
+    """
+    if isinstance(data, dict):
+        values: Any = data.values()
+    elif isinstance(data, (list, tuple)):
+        values = data
+    else:
+        return True
+    return len(data) <= ENCODING_INLINE_ITEMS and not any(
+        isinstance(value, (dict, list, tuple)) for value in values
+    )
+
+
+def encode_key(key: Any, codec: JSONCodec) -> bytes:
+    """Encodes :key as a JSON object key."""
+    if isinstance(key, str):
+        return codec.dumps(key)
+    # Let the codec decide how to convert the key ({key: null} -> key)
+    return codec.dumps({key: None})[1:-6]
+
+
+def encode_incrementally(data: Any, codec: JSONCodec) -> Iterator[bytes]:
+    """
+    Encodes :data piece by piece, walking into the big (or nested)
+    lists and dicts, so that no piece holds the whole document.
+    """
+    if is_inline(data):
+        yield codec.dumps(data)
+    elif isinstance(data, dict):
+        separator = b"{"
+        for key, value in data.items():
+            yield separator + encode_key(key, codec) + b":"
+            yield from encode_incrementally(value, codec)
+            separator = b","
+        yield b"}"
+    else:
+        separator = b"["
+        for item in data:
+            yield separator
+            yield from encode_incrementally(item, codec)
+            separator = b","
+        yield b"]"
+
+
+def split_chunks(pieces: Iterator[bytes], chunk_size: int) -> Iterator[bytes]:
+    """Regroups :pieces into chunks of exactly :chunk_size bytes (but the last)."""
+    buffer = bytearray()
+    for piece in pieces:
+        buffer += piece
+        while len(buffer) >= chunk_size:
+            yield bytes(buffer[:chunk_size])
+            del buffer[:chunk_size]
+    if buffer:
+        yield bytes(buffer)
+
+
+async def pull_encoded(
+    chunks: Iterator[bytes], executor: Optional[Executor] = None
+) -> Optional[bytes]:
+    """
+    Pulls the next chunk of :chunks (inside :executor if given). Returns
+    None if there are no chunks left.
+    """
+    if executor is None:
+        return next(chunks, None)
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(executor, next, chunks, None)
+
+
+async def stream_encoded(
+    chunks: Iterator[bytes],
+    pulled: List[bytes],
+    executor: Optional[Executor] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Streams the already :pulled chunks followed by the rest of :chunks.
+    As the status code was already sent, an error ends the stream early.
+    """
+    try:
+        for pulled_chunk in pulled:
+            yield pulled_chunk
+        pulled.clear()
+        while True:
+            chunk = await pull_encoded(chunks, executor)
+            if chunk is None:
+                return
+            yield chunk
+    except Exception as error:
+        log(f"Error while streaming the response: {error}", level="error")
+    finally:
+        await close_items(chunks)
+
+
+async def chunked_response(
+    data: Any,
+    codec: JSONCodec,
+    chunk_size: int,
+    status_code: int = 200,
+    executor: Optional[Executor] = None,
+) -> Response:
+    """
+    Returns a response that encodes :data incrementally and sends it in
+    chunks of :chunk_size bytes, so the whole document never sits in
+    memory. Documents that fit in a single chunk get sent at once.
+    """
+    chunks = split_chunks(encode_incrementally(data, codec), chunk_size)
+    first_chunk = await pull_encoded(chunks, executor)
+    second_chunk = await pull_encoded(chunks, executor)
+    if second_chunk is None:
+        return Response(
+            first_chunk, status_code=status_code, media_type=JSON_MEDIA_TYPE
+        )
+    return EncodedStreamingResponse(
+        stream_encoded(chunks, [first_chunk or b"", second_chunk], executor),
+        status_code=status_code,
+        media_type=JSON_MEDIA_TYPE,
+    )
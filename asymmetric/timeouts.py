@@ -0,0 +1,55 @@
+"""
+A module for containing the execution timeout logic of asymmetric. Calls
+taking longer than the timeout of their endpoint get cancelled (async
+functions) or abandoned (functions running in an executor, as a running
+thread or process can't be interrupted safely) and get answered with a
+504 response.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Optional
+
+from asymmetric.constants import RUN_IN_LOOP
+from asymmetric.errors import CallTimeoutError, InvalidTimeoutError
+from asymmetric.plans import CallPlan
+
+
+def validate_timeout(
+    timeout: Optional[float], plan: CallPlan, run_in: Optional[str] = None
+) -> None:
+    """
+    Raises an error if :timeout is not a positive number (or None) or if
+    the calls of the function of :plan can't be timed out.
+    """
+    if timeout is None:
+        return
+    name = plan.function.__qualname__
+    if isinstance(timeout, bool) or not isinstance(timeout, (int, float)):
+        raise InvalidTimeoutError(f"Invalid timeout '{timeout}'. It must be a number.")
+    if timeout <= 0:
+        raise InvalidTimeoutError(f"Invalid timeout '{timeout}'. It must be positive.")
+    if plan.is_generator or plan.is_async_generator:
+        raise InvalidTimeoutError(
+            f"Function '{name}' is a generator, so its results get streamed "
+            "after the call."
+        )
+    if run_in == RUN_IN_LOOP and not plan.is_async:
+        raise InvalidTimeoutError(
+            f"Function '{name}' is sync and runs inside the event loop, so it "
+            "can't be interrupted."
+        )
+
+
+async def with_timeout(awaitable: Awaitable[Any], timeout: Optional[float]) -> Any:
+    """
+    Returns the result of :awaitable, cancelling it (and raising an error)
+    if it takes more than :timeout seconds (never, if None).
+    """
+    if timeout is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, timeout)
+    except asyncio.TimeoutError as error:
+        raise CallTimeoutError(
+            f"The call took more than {timeout:g} seconds and was cancelled."
+        ) from error
@@ -2,52 +2,137 @@
 A module for every utility of asymmetric.
 """
 
+import asyncio
+import contextvars
+import functools
 import inspect
-import json
-from typing import Any, Callable, Dict
+from concurrent.futures import Executor
+from typing import Any, Awaitable, Callable, Dict, Optional
 
 from starlette.requests import Request
 from starlette.responses import JSONResponse
 
-
-async def generic_call(function: Callable[..., Any], params: Dict[str, Any]) -> Any:
+from asymmetric.codecs import JSONCodec
+from asymmetric.deadlines import current_deadline, run_before_deadline
+from asymmetric.disconnects import current_token
+from asymmetric.executors import runs_in_process
+from asymmetric.plans import CallPlan, get_call_plan
+from asymmetric.timeouts import with_timeout
+
+
+async def generic_call(
+    function: Callable[..., Any],
+    params: Dict[str, Any],
+    plan: Optional[CallPlan] = None,
+    executor: Optional[Executor] = None,
+    timeout: Optional[float] = None,
+) -> Any:
     """
     Executes a function with its params, checking if said function
-    is async or not
+    is async or not. If the call plan of the function is given, it
+    gets used instead of introspecting the function. Sync functions
+    get run inside :executor if one is given, otherwise they get run
+    inside the event loop. Generator functions get called directly, as
+    calling them only creates the generator. If :timeout is given, async
+    functions and functions run inside :executor get cancelled after
+    :timeout seconds.
     """
-    if inspect.iscoroutinefunction(function):  # Await async functions
-        return await function(**params)
+    is_async = (
+        plan.is_async if plan is not None else inspect.iscoroutinefunction(function)
+    )
+    if is_async:  # Await async functions
+        return await with_timeout(function(**params), timeout)
+    if plan is not None and (plan.is_generator or plan.is_async_generator):
+        return function(**params)
+    if executor is not None:  # Offload sync functions
+        call = functools.partial(function, **params)
+        if not runs_in_process(executor):  # Contexts can't be pickled
+            # Keep the context of the request (and its deadline) in the thread
+            call = functools.partial(
+                contextvars.copy_context().run, run_before_deadline, function, params
+            )
+        loop = asyncio.get_event_loop()
+        return await with_timeout(loop.run_in_executor(executor, call), timeout)
     return function(**params)
 
 
-def handle_error(error: Exception) -> JSONResponse:
-    """Handles errors from the router."""
-    return JSONResponse({"message": str(error)}, status_code=500)
+def get_detached_context() -> contextvars.Context:
+    """
+    Returns a copy of the current context, detached from the request being
+    handled (without its deadline nor its cancellation token).
+    """
+    context = contextvars.copy_context()
+    context.run(current_deadline.set, None)
+    context.run(current_token.set, None)
+    return context
 
 
-def filter_params(function: Callable[..., Any], data: Dict[str, Any]) -> Dict[str, Any]:
-    """Filters parameters so that the function recieves only what it needs."""
+def start_detached(awaitable: Awaitable[Any]) -> "asyncio.Future[Any]":
+    """
+    Starts running :awaitable in the background, detached from the request
+    being handled (so that it doesn't inherit its deadline nor its
+    cancellation token). Meant for the work shared by several requests,
+    where every request waits for it as long as its own deadline allows,
+    and a disconnected client must not stop it for the others.
+    """
+    return get_detached_context().run(asyncio.ensure_future, awaitable)
+
+
+def handle_error(error: Exception) -> JSONResponse:
+    """
+    Handles errors from the router. Errors declaring a status code get
+    answered with it (and with their headers, if they declare them), every
+    other error is an internal error.
+    """
+    status_code = getattr(error, "status_code", 500)
+    headers: Dict[str, str] = getattr(error, "headers", None) or {}
+    return JSONResponse(
+        {"message": str(error)}, status_code=status_code, headers=headers
+    )
+
+
+def filter_params(
+    function: Callable[..., Any],
+    data: Dict[str, Any],
+    plan: Optional[CallPlan] = None,
+) -> Dict[str, Any]:
+    """
+    Filters parameters so that the function recieves only what it needs.
+    If the call plan of the function is given, it gets used instead of
+    introspecting the function.
+    """
     # Get the parameters
-    params = inspect.getfullargspec(function)
-    if params.varkw is not None:
+    if plan is None:
+        plan = get_call_plan(function)
+    if plan.accepts_kwargs:
         # The function recieves kwargs, return the full dictionary
         return data
-    if not params.args:
+    if not plan.accepted:
         # The function does not recieve args, return an empty dict
         return {}
     # Filter every param whose key is not in the params dictionary
-    return {k: v for k, v in data.items() if k in params.args}
+    return {k: v for k, v in data.items() if k in plan.accepted}
+
+
+async def get_body(
+    request: Request, codec: Optional[JSONCodec] = None
+) -> Dict[str, Any]:
+    """
+    Gets the body of the request (decoded by :codec, if given) and returns
+    an empty dict if the request has no body.
+    """
+    return decode_body(await request.body(), codec=codec)
 
 
-async def get_body(request: Request) -> Dict[str, Any]:
+def decode_body(body: bytes, codec: Optional[JSONCodec] = None) -> Dict[str, Any]:
     """
-    Gets the body of the request and returns an empty dict if the request
-    has no body.
+    Decodes the raw request :body (using :codec, if given) and returns an
+    empty dict if it is not valid JSON.
     """
+    codec = codec or JSONCodec()
     try:
-        body = await request.json()
-        return body
-    except json.decoder.JSONDecodeError:
+        return codec.loads(body)
+    except ValueError:
         return {}
 
 
@@ -0,0 +1,156 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import pytest
+
+from asymmetric.backends import CacheEntry, MemoryCacheBackend, SQLiteCacheBackend
+from asymmetric.caching import ResultCache
+from asymmetric.configs import CacheConfig
+from asymmetric.plans import get_call_plan
+
+
+class BackendTests:
+    def create_backend(self):
+        raise NotImplementedError
+
+    def setup_method(self):
+        self.backend = self.create_backend()
+
+    def test_get_and_set(self):
+        assert self.backend.get("namespace", "key") is None
+        self.backend.set("namespace", "key", CacheEntry(b"value", None))
+        self.backend.set("namespace", "other", CacheEntry(b"other", 12.5))
+        assert self.backend.get("namespace", "key") == CacheEntry(b"value", None)
+        assert self.backend.get("namespace", "other") == CacheEntry(b"other", 12.5)
+        assert self.backend.get("other namespace", "key") is None
+
+    def test_count_and_size(self):
+        self.backend.set("namespace", "a", CacheEntry(b"12", None))
+        self.backend.set("namespace", "b", CacheEntry(b"123", None))
+        self.backend.set("namespace", "b", CacheEntry(b"1234", None))
+        self.backend.set("other namespace", "a", CacheEntry(b"123456", None))
+        assert self.backend.count("namespace") == 2
+        assert self.backend.size("namespace") == 6
+        assert self.backend.count("empty namespace") == 0
+        assert self.backend.size("empty namespace") == 0
+
+    def test_delete_and_clear(self):
+        self.backend.set("namespace", "a", CacheEntry(b"1", None))
+        self.backend.set("namespace", "b", CacheEntry(b"2", None))
+        self.backend.set("other namespace", "a", CacheEntry(b"3", None))
+        self.backend.delete("namespace", "a")
+        self.backend.delete("namespace", "missing")
+        assert self.backend.get("namespace", "a") is None
+        self.backend.clear("namespace")
+        assert self.backend.count("namespace") == 0
+        assert self.backend.size("namespace") == 0
+        assert self.backend.count("other namespace") == 1
+
+    def test_evict(self):
+        for key in "abcd":
+            self.backend.set("namespace", key, CacheEntry(b"12345", None))
+            time.sleep(0.001)
+        self.backend.get("namespace", "a")
+        self.backend.evict("namespace", max_entries=3)
+        assert self.backend.get("namespace", "b") is None
+        self.backend.evict("namespace", max_bytes=10)
+        assert self.backend.count("namespace") == 2
+        assert self.backend.get("namespace", "a") is not None
+
+
+class TestMemoryCacheBackend(BackendTests):
+    def create_backend(self):
+        return MemoryCacheBackend()
+
+
+class TestSQLiteCacheBackend(BackendTests):
+    def create_backend(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "cache.db")
+        return SQLiteCacheBackend(self.path)
+
+    def teardown_method(self):
+        self.backend.close()
+        shutil.rmtree(self.directory)
+
+    def test_evict_same_usage(self):
+        for key in "abcd":
+            self.backend.set("namespace", key, CacheEntry(b"12345", None))
+        self.backend.connection.execute("UPDATE entries SET used_at = 1")
+        self.backend.evict("namespace", max_entries=3)
+        assert self.backend.count("namespace") == 3
+        assert self.backend.get("namespace", "a") is None
+        self.backend.evict("namespace", max_entries=3, max_bytes=12)
+        assert self.backend.count("namespace") == 2
+        assert self.backend.get("namespace", "d") is not None
+
+    def test_wal_mode(self):
+        journal_mode = self.backend.connection.execute("PRAGMA journal_mode")
+        assert journal_mode.fetchone()[0] == "wal"
+        assert self.backend.path == self.path
+
+    def test_shared_results(self):
+        def function(x):
+            return x
+
+        config = CacheConfig(ttl=60, backend=self.backend)
+        other_backend = SQLiteCacheBackend(self.path)
+        other_config = CacheConfig(ttl=60, backend=other_backend)
+        cache = ResultCache(config, get_call_plan(function), namespace="/route")
+        other_cache = ResultCache(
+            other_config, get_call_plan(function), namespace="/route"
+        )
+        cache.set(cache.key({"x": 1}), b"1")
+        assert other_cache.get(other_cache.key({"x": 1})) == b"1"
+        other_cache.invalidate({"x": 1})
+        assert cache.get(cache.key({"x": 1})) is None
+        other_backend.close()
+
+    def test_batched_usage_marks(self):
+        self.backend.set("namespace", "a", CacheEntry(b"1", None))
+        (used_at,) = self.backend.connection.execute(
+            "SELECT used_at FROM entries WHERE key = 'a'"
+        ).fetchone()
+        time.sleep(0.001)
+        self.backend.get("namespace", "a")
+        assert self.backend.connection.execute(
+            "SELECT used_at FROM entries WHERE key = 'a'"
+        ).fetchone() == (used_at,)
+        self.backend.evict("namespace", max_entries=1)
+        (touched_at,) = self.backend.connection.execute(
+            "SELECT used_at FROM entries WHERE key = 'a'"
+        ).fetchone()
+        assert touched_at > used_at
+
+    def test_backend_errors_as_misses(self, caplog):
+        def function(x):
+            return x
+
+        backend = SQLiteCacheBackend(self.directory)
+        cache = ResultCache(CacheConfig(backend=backend), get_call_plan(function))
+        cache.set(cache.key({"x": 1}), b"1")
+        assert cache.get(cache.key({"x": 1})) is None
+        assert cache.misses == 1
+        assert "Error while reading the cache" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_off_loop_calls(self):
+        threads = []
+
+        def function(x):
+            return x
+
+        cache = ResultCache(CacheConfig(backend=self.backend), get_call_plan(function))
+        original_get = cache.get
+
+        def get(key):
+            threads.append(threading.current_thread())
+            return original_get(key)
+
+        cache.get = get
+        await cache.store(cache.key({"x": 1}), b"1")
+        assert await cache.fetch(cache.key({"x": 1})) == b"1"
+        assert threads and threads[0] is not threading.current_thread()
@@ -0,0 +1,105 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from asymmetric.batching import Batcher, validate_batching
+from asymmetric.configs import BatchConfig
+from asymmetric.errors import InvalidBatchingError, InvalidBatchResultError
+from asymmetric.plans import get_call_plan
+
+
+class TestValidateBatching:
+    def setup_method(self):
+        def function(x):
+            return x
+
+        def generator(x):
+            yield x
+
+        self.plan = get_call_plan(function)
+        self.generator_plan = get_call_plan(generator)
+
+    def test_valid_batching(self):
+        validate_batching(BatchConfig(max_size=8), self.plan)
+        validate_batching(BatchConfig(max_size=1, max_wait_ms=0), self.plan)
+
+    def test_invalid_batch_config(self):
+        for config in (BatchConfig(max_size=0), BatchConfig(8, max_wait_ms=-1)):
+            with pytest.raises(InvalidBatchingError):
+                validate_batching(config, self.plan)
+
+    def test_invalid_batched_function(self):
+        config = BatchConfig(max_size=8)
+        with pytest.raises(InvalidBatchingError):
+            validate_batching(config, self.generator_plan)
+        with pytest.raises(InvalidBatchingError):
+            validate_batching(config, self.plan, callback=True)
+        with pytest.raises(InvalidBatchingError):
+            validate_batching(config, self.plan, stream_body=True)
+
+
+class TestBatcher:
+    def setup_method(self):
+        self.calls = []
+
+        def function(x, y=10):
+            self.calls.append((list(x), list(y)))
+            return [a * b for a, b in zip(x, y)]
+
+        async def async_function(x):
+            return [a + 1 for a in x]
+
+        def wrong_function(x):
+            return x[:-1]
+
+        self.function = function
+        self.async_function = async_function
+        self.wrong_function = wrong_function
+
+    @pytest.mark.asyncio
+    async def test_batch_by_wait(self):
+        batcher = Batcher(
+            BatchConfig(max_size=100, max_wait_ms=5), get_call_plan(self.function)
+        )
+        results = await asyncio.gather(
+            batcher.submit({"x": 1}), batcher.submit({"x": 2, "y": 3})
+        )
+        assert results == [10, 6]
+        assert self.calls == [([1, 2], [10, 3])]
+        assert batcher.batch_count == 1
+        assert batcher.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_batch_by_size(self):
+        batcher = Batcher(
+            BatchConfig(max_size=2, max_wait_ms=60000), get_call_plan(self.function)
+        )
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            results = await asyncio.gather(
+                *[batcher.submit({"x": x}, executor=executor) for x in range(4)]
+            )
+        assert results == [0, 10, 20, 30]
+        assert batcher.batch_count == 2
+
+    @pytest.mark.asyncio
+    async def test_async_batch(self):
+        batcher = Batcher(BatchConfig(max_size=3), get_call_plan(self.async_function))
+        results = await asyncio.gather(*[batcher.submit({"x": x}) for x in range(3)])
+        assert results == [1, 2, 3]
+
+    @pytest.mark.asyncio
+    async def test_missing_params(self):
+        batcher = Batcher(BatchConfig(max_size=3), get_call_plan(self.function))
+        with pytest.raises(TypeError):
+            await batcher.submit({"y": 1})
+        assert batcher.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_invalid_batch_result(self):
+        batcher = Batcher(BatchConfig(max_size=2), get_call_plan(self.wrong_function))
+        results = await asyncio.gather(
+            batcher.submit({"x": 1}), batcher.submit({"x": 2}), return_exceptions=True
+        )
+        assert all(isinstance(result, InvalidBatchResultError) for result in results)
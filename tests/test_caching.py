@@ -0,0 +1,189 @@
+import asyncio
+import time
+
+import pytest
+
+from asymmetric.caching import (
+    ResultCache,
+    RevalidatingCache,
+    get_cache_key,
+    validate_caching,
+)
+from asymmetric.configs import CacheConfig, RevalidateConfig
+from asymmetric.errors import InvalidCachingError
+from asymmetric.plans import get_call_plan
+
+
+class TestValidateCaching:
+    def setup_method(self):
+        def function(x):
+            return x
+
+        def generator(x):
+            yield x
+
+        self.plan = get_call_plan(function)
+        self.generator_plan = get_call_plan(generator)
+
+    def test_valid_caching(self):
+        validate_caching(CacheConfig(), self.plan)
+        validate_caching(CacheConfig(ttl=1, max_entries=None, max_bytes=10), self.plan)
+
+    def test_invalid_cache_config(self):
+        for config in (
+            CacheConfig(ttl=0),
+            CacheConfig(max_entries=-1),
+            CacheConfig(max_bytes=0),
+        ):
+            with pytest.raises(InvalidCachingError):
+                validate_caching(config, self.plan)
+
+    def test_invalid_cached_function(self):
+        with pytest.raises(InvalidCachingError):
+            validate_caching(CacheConfig(), self.generator_plan)
+        with pytest.raises(InvalidCachingError):
+            validate_caching(CacheConfig(), self.plan, callback=True)
+        with pytest.raises(InvalidCachingError):
+            validate_caching(CacheConfig(), self.plan, stream_body=True)
+        with pytest.raises(InvalidCachingError):
+            validate_caching(CacheConfig(), self.plan, chunk_size=1024)
+
+
+class TestGetCacheKey:
+    def test_canonical_cache_key(self):
+        key = get_cache_key({"a": 1, "b": {"c": [1, 2], "d": None}})
+        assert key == get_cache_key({"b": {"d": None, "c": [1, 2]}, "a": 1})
+        assert key != get_cache_key({"a": 2, "b": {"c": [1, 2], "d": None}})
+
+
+class TestResultCache:
+    def setup_method(self):
+        def function(x, y=1):
+            return x + y
+
+        self.plan = get_call_plan(function)
+
+    def test_hits_and_misses(self):
+        cache = ResultCache(CacheConfig(), self.plan)
+        key = cache.key({"x": 1})
+        assert cache.get(key) is None
+        cache.set(key, b"2")
+        assert cache.get(key) == b"2"
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert len(cache) == 1
+        assert cache.size == 1
+
+    def test_ttl_expiration(self):
+        cache = ResultCache(CacheConfig(ttl=0.01), self.plan)
+        cache.set("key", b"value")
+        time.sleep(0.02)
+        assert cache.get("key") is None
+        assert len(cache) == 0
+        assert cache.size == 0
+
+    def test_lru_eviction_by_entries(self):
+        cache = ResultCache(CacheConfig(max_entries=2), self.plan)
+        cache.set("a", b"1")
+        cache.set("b", b"2")
+        cache.get("a")
+        cache.set("c", b"3")
+        assert cache.get("b") is None
+        assert cache.get("a") == b"1"
+        assert cache.get("c") == b"3"
+
+    def test_lru_eviction_by_bytes(self):
+        cache = ResultCache(CacheConfig(max_entries=None, max_bytes=10), self.plan)
+        cache.set("a", b"12345")
+        cache.set("b", b"12345")
+        cache.set("c", b"123")
+        cache.set("huge", b"12345678901")
+        assert cache.get("a") is None
+        assert cache.get("huge") is None
+        assert cache.size == 8
+
+    def test_invalidation(self):
+        cache = ResultCache(CacheConfig(), self.plan)
+        cache.set(cache.key({"x": 1}), b"2")
+        cache.set(cache.key({"x": 2}), b"3")
+        cache.invalidate({"x": 1, "unrelated": True})
+        assert cache.get(cache.key({"x": 1})) is None
+        assert cache.get(cache.key({"x": 2})) == b"3"
+        cache.invalidate()
+        assert len(cache) == 0
+        assert cache.size == 0
+
+
+class TestRevalidatingCache:
+    def setup_method(self):
+        def function(x):
+            return x
+
+        self.plan = get_call_plan(function)
+        self.computed = 0
+
+    async def compute(self):
+        self.computed += 1
+        await asyncio.sleep(0.01)
+        return str(self.computed).encode()
+
+    async def fail(self):
+        raise ValueError("Failed!")
+
+    def test_invalid_revalidate_config(self):
+        with pytest.raises(InvalidCachingError):
+            validate_caching(RevalidateConfig(soft_ttl=2, hard_ttl=1), self.plan)
+        with pytest.raises(InvalidCachingError):
+            validate_caching(RevalidateConfig(soft_ttl=0, hard_ttl=1), self.plan)
+
+    @pytest.mark.asyncio
+    async def test_fresh_results(self):
+        cache = RevalidatingCache(RevalidateConfig(60, 120), self.plan)
+        results = await asyncio.gather(
+            *[cache.get("key", self.compute) for _ in range(3)]
+        )
+        assert results == [b"1"] * 3
+        assert await cache.get("key", self.compute) == b"1"
+        assert (cache.hits, cache.stale_hits, cache.misses) == (1, 0, 3)
+        assert self.computed == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_results(self):
+        cache = RevalidatingCache(RevalidateConfig(0.05, 60), self.plan)
+        await cache.get("key", self.compute)
+        await asyncio.sleep(0.06)
+        assert await cache.get("key", self.compute) == b"1"
+        assert await cache.get("key", self.compute) == b"1"
+        assert cache.refreshing == 1
+        await asyncio.sleep(0.02)
+        assert cache.refreshing == 0
+        assert await cache.get("key", self.compute) == b"2"
+        assert cache.stale_hits == 2
+        assert self.computed == 2
+
+    @pytest.mark.asyncio
+    async def test_expired_results(self):
+        cache = RevalidatingCache(RevalidateConfig(0.01, 0.02), self.plan)
+        await cache.get("key", self.compute)
+        await asyncio.sleep(0.03)
+        assert await cache.get("key", self.compute) == b"2"
+        assert cache.misses == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_refreshes(self):
+        cache = RevalidatingCache(RevalidateConfig(0.01, 60), self.plan)
+        with pytest.raises(ValueError):
+            await cache.get("key", self.fail)
+        await cache.get("key", self.compute)
+        await asyncio.sleep(0.02)
+        assert await cache.get("key", self.fail) == b"1"
+        await asyncio.sleep(0)
+        assert await cache.get("key", self.compute) == b"1"
+
+    @pytest.mark.asyncio
+    async def test_invalidation_and_eviction(self):
+        cache = RevalidatingCache(RevalidateConfig(60, 60, max_entries=1), self.plan)
+        await cache.get(cache.key({"x": 1}), self.compute)
+        await cache.get(cache.key({"x": 2}), self.compute)
+        assert len(cache) == 1
+        cache.invalidate({"x": 2})
+        assert len(cache) == 0
@@ -0,0 +1,79 @@
+import importlib.util
+import json
+
+import pytest
+
+from asymmetric.codecs import (
+    CODECS_BY_NAME,
+    JSONCodec,
+    OrjsonCodec,
+    RapidjsonCodec,
+    UjsonCodec,
+    get_codec,
+)
+
+
+def installed(module):
+    return importlib.util.find_spec(module) is not None
+
+
+class CodecTests:
+    codec_class = JSONCodec
+
+    def setup_method(self):
+        self.codec = self.codec_class()
+        self.data = {"name": "Dani", "age": 22, "langs": ["Python", "ñandú"]}
+
+    def test_dumps(self):
+        encoded = self.codec.dumps(self.data)
+        assert isinstance(encoded, bytes)
+        assert json.loads(encoded) == self.data
+
+    def test_pretty_dumps(self):
+        encoded = self.codec.dumps(self.data, pretty=True)
+        assert b"\n" in encoded
+        assert json.loads(encoded) == self.data
+
+    def test_loads(self):
+        assert self.codec.loads(json.dumps(self.data).encode()) == self.data
+
+    def test_invalid_loads(self):
+        with pytest.raises(ValueError):
+            self.codec.loads(b"{invalid")
+        with pytest.raises(ValueError):
+            self.codec.loads(b"")
+
+
+class TestJSONCodec(CodecTests):
+    codec_class = JSONCodec
+
+
+@pytest.mark.skipif(not installed("orjson"), reason="orjson is not installed")
+class TestOrjsonCodec(CodecTests):
+    codec_class = OrjsonCodec
+
+
+@pytest.mark.skipif(not installed("ujson"), reason="ujson is not installed")
+class TestUjsonCodec(CodecTests):
+    codec_class = UjsonCodec
+
+
+@pytest.mark.skipif(not installed("rapidjson"), reason="rapidjson is not installed")
+class TestRapidjsonCodec(CodecTests):
+    codec_class = RapidjsonCodec
+
+
+class TestGetCodec:
+    def test_named_codec(self):
+        assert isinstance(get_codec("json"), JSONCodec)
+        assert get_codec("json").name == "json"
+
+    def test_invalid_named_codec(self):
+        with pytest.raises(ValueError):
+            get_codec("yaml")
+
+    def test_default_codec(self):
+        expected = next(
+            name for name in CODECS_BY_NAME if name == "json" or installed(name)
+        )
+        assert get_codec().name == expected
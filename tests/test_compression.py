@@ -0,0 +1,151 @@
+import gzip
+import zlib
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response
+
+from asymmetric.compression import (
+    CompressionMiddleware,
+    Compressor,
+    DeflateCompressor,
+    choose_encoding,
+    is_compressible,
+    validate_compression,
+)
+from asymmetric.configs import CompressionConfig
+from asymmetric.constants import COMPRESSION_SCOPE_KEY
+from asymmetric.errors import InvalidCompressionError
+from asymmetric.executors import Executors
+from asymmetric.responses import EncodedStreamingResponse
+
+
+class TestValidateCompression:
+    def test_valid_compression(self):
+        validate_compression(CompressionConfig(minimum_size=0, level=9))
+
+    def test_invalid_compression(self):
+        with pytest.raises(InvalidCompressionError):
+            validate_compression(CompressionConfig(level=0))
+        with pytest.raises(InvalidCompressionError):
+            validate_compression(CompressionConfig(brotli_quality=12))
+        with pytest.raises(InvalidCompressionError):
+            validate_compression(CompressionConfig(minimum_size=-1))
+
+
+class TestChooseEncoding:
+    def test_preferred_encoding(self):
+        assert choose_encoding("gzip, deflate") == "gzip"
+        assert choose_encoding("deflate, gzip") == "gzip"
+        assert choose_encoding("deflate;q=1.0, gzip;q=0.5") == "deflate"
+        assert choose_encoding("*") == "gzip"
+
+    def test_no_encoding(self):
+        assert choose_encoding("") is None
+        assert choose_encoding("identity") is None
+        assert choose_encoding("gzip;q=0, deflate;q=0") is None
+        assert choose_encoding("compress") is None
+
+
+class TestIsCompressible:
+    def test_compressible(self):
+        assert is_compressible("application/json")
+        assert is_compressible("application/x-ndjson")
+        assert is_compressible("application/json-patch+json")
+        assert is_compressible("text/html; charset=utf-8")
+
+    def test_not_compressible(self):
+        assert not is_compressible("image/png")
+        assert not is_compressible("")
+
+
+class TestCompressors:
+    def setup_method(self):
+        self.config = CompressionConfig()
+        self.data = b'{"key": "value"}' * 100
+
+    def test_gzip(self):
+        compressor = Compressor(self.config)
+        assert gzip.decompress(compressor.finish(self.data)) == self.data
+
+    def test_deflate(self):
+        compressor = DeflateCompressor(self.config)
+        assert zlib.decompress(compressor.finish(self.data)) == self.data
+
+    def test_flushed_chunks(self):
+        compressor = Compressor(self.config)
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        # Every chunk can be decompressed as soon as it arrives
+        assert decompressor.decompress(compressor.compress(self.data)) == self.data
+        assert decompressor.decompress(compressor.finish(b"end")) == b"end"
+
+
+class TestCompressionMiddleware:
+    def setup_method(self):
+        self.data = {"items": ["item"] * 1000}
+        self.app = Starlette()
+        self.executors = Executors()
+        self.app.add_middleware(
+            CompressionMiddleware,
+            get_config=lambda: CompressionConfig(offload_size=1024),
+            executors=self.executors,
+        )
+
+        @self.app.route("/large")
+        def large(request):
+            return JSONResponse(self.data)
+
+        @self.app.route("/small")
+        def small(request):
+            return JSONResponse({"small": True})
+
+        @self.app.route("/image")
+        def image(request):
+            return Response(b"0" * 4096, media_type="image/png")
+
+        @self.app.route("/disabled")
+        def disabled(request):
+            request.scope[COMPRESSION_SCOPE_KEY] = False
+            return JSONResponse(self.data)
+
+        @self.app.route("/stream")
+        def stream(request):
+            chunks = (b'{"line": %d}\n' % x for x in range(1000))
+            return EncodedStreamingResponse(chunks, media_type="application/x-ndjson")
+
+    def teardown_method(self):
+        self.executors.shutdown()
+
+    async def get(self, route, encoding="gzip, deflate"):
+        async with httpx.AsyncClient(app=self.app, base_url="http://test") as client:
+            return await client.get(route, headers={"accept-encoding": encoding})
+
+    @pytest.mark.asyncio
+    async def test_compressed_response(self):
+        response = await self.get("/large")
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert int(response.headers["content-length"]) < len(response.content)
+        assert response.json() == self.data
+
+    @pytest.mark.asyncio
+    async def test_negotiated_encoding(self):
+        response = await self.get("/large", encoding="deflate")
+        assert response.headers["content-encoding"] == "deflate"
+        assert response.json() == self.data
+        response = await self.get("/large", encoding="identity")
+        assert "content-encoding" not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_uncompressed_responses(self):
+        for route in ["/small", "/image", "/disabled"]:
+            response = await self.get(route)
+            assert "content-encoding" not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_compressed_stream(self):
+        response = await self.get("/stream")
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert response.text.splitlines()[-1] == '{"line": 999}'
@@ -0,0 +1,1066 @@
+import asyncio
+import gzip
+import json
+import threading
+import time
+from typing import AsyncIterator, Iterator
+
+import httpx
+import pytest
+
+from asymmetric import (
+    AdaptiveLimitConfig,
+    BatchConfig,
+    CacheConfig,
+    CompressionConfig,
+    DeltaConfig,
+    ExecutorConfig,
+    PrecomputeConfig,
+    RevalidateConfig,
+    asymmetric,
+    cancellation_token,
+    remaining_time,
+)
+from asymmetric.codecs import get_codec
+from asymmetric.errors import (
+    InvalidCachingError,
+    InvalidCancellationError,
+    InvalidChunkSizeError,
+    InvalidCompressionError,
+    InvalidConcurrencyLimitError,
+    InvalidETagError,
+    InvalidExecutionModeError,
+    InvalidPrecomputingError,
+    InvalidStreamingFormatError,
+    InvalidStreamingParameterError,
+    InvalidTimeoutError,
+)
+from asymmetric.etags import get_base_etag
+from asymmetric.executors import Executors
+from asymmetric.limiting import AdaptiveConcurrencyLimiter
+
+
+def client():
+    return httpx.AsyncClient(app=asymmetric, base_url="http://asymmetric.test")
+
+
+def process_items(amount):
+    return {"items": list(range(amount))}
+
+
+async def startup():
+    """Runs the startup handlers of the app through the ASGI lifespan."""
+    messages = asyncio.Queue()
+    messages.put_nowait({"type": "lifespan.startup"})
+    started = asyncio.Event()
+
+    async def send(message):
+        if message["type"] == "lifespan.startup.complete":
+            started.set()
+
+    lifespan = asyncio.ensure_future(
+        asymmetric({"type": "lifespan"}, messages.get, send)
+    )
+    await started.wait()
+    lifespan.cancel()
+
+
+class TestRouterExecution:
+    @pytest.mark.asyncio
+    async def test_sync_function_in_thread(self):
+        @asymmetric.router("/v1/test/core/thread")
+        def function(a, b=1):
+            return {"sum": a + b, "thread": threading.current_thread().name}
+
+        async with client() as test_client:
+            response = await test_client.post("/v1/test/core/thread", json={"a": 2})
+        assert response.status_code == 200
+        assert response.json()["sum"] == 3
+        assert response.json()["thread"] != threading.current_thread().name
+
+    @pytest.mark.asyncio
+    async def test_sync_function_in_loop(self):
+        @asymmetric.router("/v1/test/core/loop", run_in="loop")
+        def function():
+            return threading.current_thread().name
+
+        async with client() as test_client:
+            response = await test_client.post("/v1/test/core/loop")
+        assert response.status_code == 200
+        assert response.json() == threading.current_thread().name
+
+    def test_executors_object(self):
+        assert isinstance(asymmetric.executors, Executors)
+        assert asymmetric.executors.run_in == "thread"
+
+    def test_invalid_execution_mode(self):
+        with pytest.raises(InvalidExecutionModeError):
+
+            @asymmetric.router("/v1/test/core/invalid", run_in="somewhere")
+            def function():
+                pass
+
+
+class TestRouterBulkhead:
+    @pytest.mark.asyncio
+    async def test_bulkhead_overload(self):
+        event = threading.Event()
+
+        @asymmetric.router(
+            "/v1/test/core/bulkhead", executor=ExecutorConfig(max_workers=1)
+        )
+        def function():
+            event.wait(5)
+            return "done"
+
+        endpoint = asymmetric.endpoints.endpoints["/v1/test/core/bulkhead"]["post"]
+        async with client() as test_client:
+            running = asyncio.ensure_future(test_client.post("/v1/test/core/bulkhead"))
+            while endpoint.executor.active_count == 0:
+                await asyncio.sleep(0.01)
+            rejected = await test_client.post("/v1/test/core/bulkhead")
+            event.set()
+            accepted = await running
+        assert rejected.status_code == 503
+        assert accepted.status_code == 200
+        assert endpoint.executor.active_count == 0
+
+
+class TestCodec:
+    def setup_method(self):
+        self.codec = asymmetric.codec
+
+    def teardown_method(self):
+        asymmetric.codec = self.codec
+
+    @pytest.mark.asyncio
+    async def test_codec_usage(self):
+        @asymmetric.router("/v1/test/core/codec")
+        async def function(values):
+            return {"values": values}
+
+        asymmetric.codec = get_codec("json")
+        async with client() as test_client:
+            response = await test_client.post(
+                "/v1/test/core/codec", json={"values": [1, 2, 3]}
+            )
+            openapi = await test_client.get("/openapi.json")
+        assert response.json() == {"values": [1, 2, 3]}
+        assert response.headers["content-type"] == "application/json"
+        assert openapi.status_code == 200
+        assert openapi.headers["content-type"] == "application/json"
+
+
+class TestRouterStreaming:
+    @pytest.mark.asyncio
+    async def test_generator_streaming(self):
+        @asymmetric.router("/v1/test/core/stream/ndjson")
+        def function(amount):
+            for index in range(amount):
+                yield {"index": index}
+
+        async with client() as test_client:
+            response = await test_client.post(
+                "/v1/test/core/stream/ndjson", json={"amount": 100}
+            )
+        lines = response.text.splitlines()
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert [json.loads(line)["index"] for line in lines] == list(range(100))
+
+    @pytest.mark.asyncio
+    async def test_async_generator_streaming(self):
+        @asymmetric.router("/v1/test/core/stream/array", stream="array")
+        async def function(amount):
+            for index in range(amount):
+                await asyncio.sleep(0)
+                yield index
+
+        async with client() as test_client:
+            response = await test_client.post(
+                "/v1/test/core/stream/array", json={"amount": 10}
+            )
+        assert response.json() == list(range(10))
+
+    def test_invalid_streaming_format(self):
+        with pytest.raises(InvalidStreamingFormatError):
+
+            @asymmetric.router("/v1/test/core/stream/invalid", stream="xml")
+            def function():
+                yield 1
+
+
+class TestRouterBodyStreaming:
+    @pytest.mark.asyncio
+    async def test_sync_body_streaming(self):
+        @asymmetric.router("/v1/test/core/ingest/sync", stream_body=True)
+        def function(records: Iterator[dict], key):
+            return {
+                "total": sum(record[key] for record in records),
+                "thread": threading.current_thread().name,
+            }
+
+        async with client() as test_client:
+            response = await test_client.post(
+                "/v1/test/core/ingest/sync?key=a",
+                content=b"".join(b'{"a": %d}\n' % index for index in range(100)),
+                headers={"content-type": "application/x-ndjson"},
+            )
+        assert response.status_code == 200
+        assert response.json()["total"] == sum(range(100))
+        assert response.json()["thread"] != threading.current_thread().name
+
+    @pytest.mark.asyncio
+    async def test_async_body_streaming(self):
+        @asymmetric.router("/v1/test/core/ingest/async", stream_body=True)
+        async def function(records: AsyncIterator[int]):
+            return [record async for record in records]
+
+        async with client() as test_client:
+            response = await test_client.post(
+                "/v1/test/core/ingest/async", content=b"[1, 2, 3]"
+            )
+        assert response.json() == [1, 2, 3]
+
+    @pytest.mark.asyncio
+    async def test_malformed_streamed_body(self):
+        @asymmetric.router("/v1/test/core/ingest/malformed", stream_body=True)
+        async def function(records: AsyncIterator[int]):
+            return [record async for record in records]
+
+        async with client() as test_client:
+            response = await test_client.post(
+                "/v1/test/core/ingest/malformed", content=b"[1, 2"
+            )
+        assert response.status_code == 400
+
+    def test_invalid_body_streaming(self):
+        with pytest.raises(InvalidStreamingParameterError):
+
+            @asymmetric.router("/v1/test/core/ingest/invalid", stream_body=True)
+            def function(records):
+                pass
+
+
+class TestRouterChunkedResponse:
+    @pytest.mark.asyncio
+    async def test_chunked_response(self):
+        @asymmetric.router("/v1/test/core/chunked", chunk_size=128)
+        def function(amount):
+            return {"items": [{"index": index} for index in range(amount)]}
+
+        async with client() as test_client:
+            response = await test_client.post(
+                "/v1/test/core/chunked", json={"amount": 500}
+            )
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert "content-length" not in response.headers
+        assert len(response.json()["items"]) == 500
+
+    @pytest.mark.asyncio
+    async def test_chunked_process_response(self):
+        asymmetric.router(
+            "/v1/test/core/chunked/process", run_in="process", chunk_size=16
+        )(process_items)
+
+        async with client() as test_client:
+            response = await test_client.post(
+                "/v1/test/core/chunked/process", json={"amount": 100}
+            )
+        assert response.status_code == 200
+        assert response.json()["items"] == list(range(100))
+
+    def test_invalid_chunk_size(self):
+        with pytest.raises(InvalidChunkSizeError):
+
+            @asymmetric.router("/v1/test/core/chunked/invalid", chunk_size=0)
+            def function():
+                pass
+
+
+class TestRouterBatching:
+    @pytest.mark.asyncio
+    async def test_batched_calls(self):
+        sizes = []
+
+        @asymmetric.router(
+            "/v1/test/core/batch", batch=BatchConfig(max_size=8, max_wait_ms=20)
+        )
+        def function(x):
+            sizes.append(len(x))
+            return [{"double": value * 2} for value in x]
+
+        async with client() as test_client:
+            responses = await asyncio.gather(
+                *[
+                    test_client.post("/v1/test/core/batch", json={"x": x})
+                    for x in range(8)
+                ]
+            )
+        assert [response.json()["double"] for response in responses] == [
+            x * 2 for x in range(8)
+        ]
+        assert sum(sizes) == 8
+        assert len(sizes) < 8
+        endpoint = asymmetric.endpoints.endpoints["/v1/test/core/batch"]["post"]
+        assert endpoint.batcher.batch_count == len(sizes)
+
+
+class TestRouterCaching:
+    @pytest.mark.asyncio
+    async def test_cached_results(self):
+        calls = []
+
+        @asymmetric.router("/v1/test/core/cache", cache=CacheConfig(ttl=60))
+        def function(x, y=1):
+            calls.append(x)
+            return {"sum": x + y}
+
+        async with client() as test_client:
+            first = await test_client.post("/v1/test/core/cache", json={"x": 1})
+            second = await test_client.post(
+                "/v1/test/core/cache", json={"x": 1, "other": "ignored"}
+            )
+            third = await test_client.post("/v1/test/core/cache", json={"x": 2})
+        assert first.json() == second.json() == {"sum": 2}
+        assert third.json() == {"sum": 3}
+        assert second.headers["content-type"] == "application/json"
+        assert calls == [1, 2]
+        endpoint = asymmetric.endpoints.endpoints["/v1/test/core/cache"]["post"]
+        assert (endpoint.cache.hits, endpoint.cache.misses) == (1, 2)
+
+        endpoint.cache.invalidate({"x": 1})
+        async with client() as test_client:
+            await test_client.post("/v1/test/core/cache", json={"x": 1})
+        assert calls == [1, 2, 1]
+
+
+class TestRouterSingleFlight:
+    @pytest.mark.asyncio
+    async def test_shared_calls(self):
+        calls = []
+
+        @asymmetric.router("/v1/test/core/flight", single_flight=True)
+        async def function(x):
+            calls.append(x)
+            await asyncio.sleep(0.05)
+            return {"x": x}
+
+        async with client() as test_client:
+            responses = await asyncio.gather(
+                *[
+                    test_client.post("/v1/test/core/flight", json={"x": x % 2})
+                    for x in range(6)
+                ]
+            )
+        assert [response.json()["x"] for response in responses] == [0, 1] * 3
+        assert sorted(calls) == [0, 1]
+        endpoint = asymmetric.endpoints.endpoints["/v1/test/core/flight"]["post"]
+        assert endpoint.flights.shared_count == 4
+
+
+class TestRouterRevalidation:
+    @pytest.mark.asyncio
+    async def test_stale_while_revalidate(self):
+        calls = []
+
+        @asymmetric.router(
+            "/v1/test/core/revalidate",
+            revalidate=RevalidateConfig(soft_ttl=0.05, hard_ttl=60),
+        )
+        def function(x):
+            calls.append(x)
+            return {"version": len(calls)}
+
+        async with client() as test_client:
+            first = await test_client.post("/v1/test/core/revalidate", json={"x": 1})
+            await asyncio.sleep(0.06)
+            stale = await test_client.post("/v1/test/core/revalidate", json={"x": 1})
+            await asyncio.sleep(0.01)
+            fresh = await test_client.post("/v1/test/core/revalidate", json={"x": 1})
+        assert first.json() == stale.json() == {"version": 1}
+        assert fresh.json() == {"version": 2}
+        endpoint = asymmetric.endpoints.endpoints["/v1/test/core/revalidate"]["post"]
+        assert endpoint.cache.stale_hits == 1
+
+    def test_cache_and_revalidate(self):
+        with pytest.raises(InvalidCachingError):
+
+            @asymmetric.router(
+                "/v1/test/core/revalidate/invalid",
+                cache=CacheConfig(),
+                revalidate=RevalidateConfig(soft_ttl=1, hard_ttl=2),
+            )
+            def function():
+                pass
+
+
+class TestRouterPrecomputing:
+    @pytest.mark.asyncio
+    async def test_precomputed_results(self):
+        calls = []
+
+        def params():
+            yield {"x": 1}
+            yield {"x": 2, "other": "ignored"}
+
+        @asymmetric.router(
+            "/v1/test/core/precompute", precompute=PrecomputeConfig(params)
+        )
+        def function(x):
+            calls.append(x)
+            return {"double": x * 2}
+
+        await startup()
+        assert calls == [1, 2]
+        async with client() as test_client:
+            precomputed = await test_client.post(
+                "/v1/test/core/precompute", json={"x": 2}
+            )
+            computed = await test_client.post("/v1/test/core/precompute", json={"x": 3})
+        assert precomputed.json() == {"double": 4}
+        assert computed.json() == {"double": 6}
+        assert calls == [1, 2, 3]
+        endpoint = asymmetric.endpoints.endpoints["/v1/test/core/precompute"]["post"]
+        assert endpoint.precomputed.hits == 1
+
+    def test_invalid_precompute(self):
+        with pytest.raises(InvalidPrecomputingError):
+
+            @asymmetric.router(
+                "/v1/test/core/precompute/invalid",
+                precompute=PrecomputeConfig([{}]),
+                callback=True,
+            )
+            def function():
+                pass
+
+
+class TestRouterETags:
+    @pytest.mark.asyncio
+    async def test_not_modified(self):
+        state = {"value": 1, "calls": 0}
+
+        @asymmetric.router("/v1/test/core/etag", methods=["get"])
+        def function():
+            state["calls"] += 1
+            return {"value": state["value"]}
+
+        async with client() as test_client:
+            first = await test_client.get("/v1/test/core/etag")
+            etag = first.headers["etag"]
+            headers = {"if-none-match": etag}
+            second = await test_client.get("/v1/test/core/etag", headers=headers)
+            state["value"] = 2
+            third = await test_client.get("/v1/test/core/etag", headers=headers)
+        assert first.json() == {"value": 1}
+        assert second.status_code == 304
+        assert second.content == b""
+        assert third.json() == {"value": 2}
+        assert third.headers["etag"] != etag
+        assert state["calls"] == 3
+
+    @pytest.mark.asyncio
+    async def test_versioned_not_modified(self):
+        state = {"version": 1, "calls": 0}
+
+        @asymmetric.router(
+            "/v1/test/core/etag/version",
+            methods=["get"],
+            version=lambda: state["version"],
+        )
+        def function():
+            state["calls"] += 1
+            return {"version": state["version"]}
+
+        async with client() as test_client:
+            first = await test_client.get("/v1/test/core/etag/version")
+            headers = {"if-none-match": first.headers["etag"]}
+            second = await test_client.get(
+                "/v1/test/core/etag/version", headers=headers
+            )
+            state["version"] = 2
+            third = await test_client.get("/v1/test/core/etag/version", headers=headers)
+        assert second.status_code == 304
+        assert third.json() == {"version": 2}
+        assert state["calls"] == 2
+
+    @pytest.mark.asyncio
+    async def test_openapi_not_modified(self):
+        async with client() as test_client:
+            first = await test_client.get("/openapi.json")
+            second = await test_client.get(
+                "/openapi.json", headers={"if-none-match": first.headers["etag"]}
+            )
+        assert second.status_code == 304
+
+    def test_invalid_version(self):
+        with pytest.raises(InvalidETagError):
+
+            @asymmetric.router(
+                "/v1/test/core/etag/invalid", etag=False, version=lambda: 1
+            )
+            def function():
+                pass
+
+
+class TestRouterDeltas:
+    @pytest.mark.asyncio
+    async def test_delta_response(self):
+        document = {"items": [{"id": x, "status": "ok"} for x in range(100)]}
+
+        @asymmetric.router("/v1/test/core/delta", methods=["get"], delta=DeltaConfig())
+        def function():
+            return document
+
+        async with client() as test_client:
+            first = await test_client.get("/v1/test/core/delta")
+            document["items"][42]["status"] = "down"
+            headers = {"if-none-match": first.headers["etag"], "a-im": "json-patch"}
+            delta = await test_client.get("/v1/test/core/delta", headers=headers)
+            full = await test_client.get(
+                "/v1/test/core/delta", headers={"if-none-match": '"unknown"'}
+            )
+        assert delta.status_code == 226
+        assert delta.headers["content-type"] == "application/json-patch+json"
+        assert delta.headers["etag"] == get_base_etag(full.headers["etag"])
+        assert delta.json() == [
+            {"op": "replace", "path": "/items/42/status", "value": "down"}
+        ]
+        assert full.status_code == 200
+        assert full.json() == document
+
+
+class TestRouterCompression:
+    @pytest.mark.asyncio
+    async def test_compressed_responses(self):
+        @asymmetric.router("/v1/test/core/compression")
+        def compressed():
+            return ["item"] * 1000
+
+        @asymmetric.router("/v1/test/core/compression/disabled", compression=False)
+        def uncompressed():
+            return ["item"] * 1000
+
+        async with client() as test_client:
+            first = await test_client.post("/v1/test/core/compression")
+            second = await test_client.post("/v1/test/core/compression/disabled")
+        assert first.headers["content-encoding"] == "gzip"
+        assert first.json() == second.json()
+        assert "content-encoding" not in second.headers
+
+    @pytest.mark.asyncio
+    async def test_compressed_etags(self):
+        @asymmetric.router("/v1/test/core/compression/etag", methods=["get"])
+        def function():
+            return ["item"] * 1000
+
+        async with client() as test_client:
+            compressed = await test_client.get("/v1/test/core/compression/etag")
+            identity = await test_client.get(
+                "/v1/test/core/compression/etag", headers={"accept-encoding": ""}
+            )
+            not_modified = await test_client.get(
+                "/v1/test/core/compression/etag",
+                headers={"if-none-match": compressed.headers["etag"]},
+            )
+        assert compressed.headers["etag"] == identity.headers["etag"][:-1] + '-gzip"'
+        assert not_modified.status_code == 304
+        assert not_modified.headers["etag"] == compressed.headers["etag"]
+        assert "content-encoding" not in not_modified.headers
+
+    def test_invalid_compression(self):
+        with pytest.raises(InvalidCompressionError):
+            asymmetric.compression = CompressionConfig(level=10)
+        with pytest.raises(InvalidCompressionError):
+
+            @asymmetric.router(
+                "/v1/test/core/compression/invalid",
+                compression=CompressionConfig(minimum_size=-1),
+            )
+            def function():
+                pass
+
+
+class TestRequestDecompression:
+    def setup_method(self):
+        self.max_size = asymmetric.max_decompressed_size
+
+    def teardown_method(self):
+        asymmetric.max_decompressed_size = self.max_size
+
+    @pytest.mark.asyncio
+    async def test_compressed_bodies(self):
+        @asymmetric.router("/v1/test/core/decompression")
+        def function(items):
+            return len(items)
+
+        body = gzip.compress(json.dumps({"items": list(range(1000))}).encode())
+        asymmetric.max_decompressed_size = 1024
+        async with client() as test_client:
+            valid = await test_client.post(
+                "/v1/test/core/decompression",
+                data=gzip.compress(b'{"items": [1, 2, 3]}'),
+                headers={"content-encoding": "gzip"},
+            )
+            too_large = await test_client.post(
+                "/v1/test/core/decompression",
+                data=body,
+                headers={"content-encoding": "gzip"},
+            )
+            unsupported = await test_client.post(
+                "/v1/test/core/decompression",
+                data=body,
+                headers={"content-encoding": "br"},
+            )
+        assert valid.json() == 3
+        assert too_large.status_code == 413
+        assert unsupported.status_code == 415
+
+
+class TestPayloadOffloading:
+    def setup_method(self):
+        self.offload_size = asymmetric.offload_size
+
+    def teardown_method(self):
+        asymmetric.offload_size = self.offload_size
+
+    @pytest.mark.asyncio
+    async def test_server_timing(self):
+        @asymmetric.router("/v1/test/core/offloading")
+        async def function(items):
+            return items
+
+        items = list(range(1000))
+        async with client() as test_client:
+            inline = await test_client.post(
+                "/v1/test/core/offloading", json={"items": items}
+            )
+            asymmetric.offload_size = 1024
+            await test_client.post("/v1/test/core/offloading", json={"items": items})
+            offloaded = await test_client.post(
+                "/v1/test/core/offloading", json={"items": items}
+            )
+        assert inline.json() == offloaded.json() == items
+
+        def timings(response):
+            return dict(
+                timing.strip().split(";dur=")
+                for timing in response.headers["server-timing"].split(",")
+            )
+
+        assert list(timings(inline)) == ["decode", "call", "encode", "loop"]
+        # Nothing blocks the event loop once both payloads get offloaded
+        assert float(timings(inline)["loop"]) > 0
+        assert float(timings(offloaded)["loop"]) == 0
+
+    def test_invalid_offload_size(self):
+        with pytest.raises(ValueError):
+            asymmetric.offload_size = -1
+
+
+class TestRouterConcurrencyLimit:
+    @pytest.mark.asyncio
+    async def test_load_shedding(self):
+        event = asyncio.Event()
+
+        @asymmetric.router("/v1/test/core/limit", max_concurrency=1, max_queue=1)
+        async def function():
+            await event.wait()
+            return "done"
+
+        async with client() as test_client:
+            requests = [
+                asyncio.ensure_future(test_client.post("/v1/test/core/limit"))
+                for _ in range(2)
+            ]
+            await asyncio.sleep(0.05)
+            rejected = await test_client.post("/v1/test/core/limit")
+            event.set()
+            responses = await asyncio.gather(*requests)
+        assert [response.json() for response in responses] == ["done", "done"]
+        assert rejected.status_code == 503
+        assert int(rejected.headers["retry-after"]) >= 1
+        endpoint = asymmetric.endpoints.endpoints["/v1/test/core/limit"]["post"]
+        assert endpoint.limiter.rejected_count == 1
+        assert endpoint.limiter.active_count == 0
+
+    @pytest.mark.asyncio
+    async def test_adaptive_limit(self):
+        @asymmetric.router(
+            "/v1/test/core/limit/adaptive",
+            max_concurrency=AdaptiveLimitConfig(initial_limit=4),
+        )
+        async def function():
+            return "done"
+
+        async with client() as test_client:
+            for _ in range(3):
+                response = await test_client.post("/v1/test/core/limit/adaptive")
+                assert response.json() == "done"
+        endpoint = asymmetric.endpoints.endpoints["/v1/test/core/limit/adaptive"]
+        assert isinstance(endpoint["post"].limiter, AdaptiveConcurrencyLimiter)
+        assert endpoint["post"].limiter.active_count == 0
+        assert endpoint["post"].limiter.baseline is not None
+
+    def test_invalid_adaptive_limit(self):
+        with pytest.raises(InvalidConcurrencyLimitError):
+
+            @asymmetric.router(
+                "/v1/test/core/limit/invalid",
+                max_concurrency=AdaptiveLimitConfig(backoff=2),
+            )
+            def function():
+                pass
+
+
+class TestRouterTimeouts:
+    @pytest.mark.asyncio
+    async def test_async_timeout(self):
+        @asymmetric.router("/v1/test/core/timeout/async", timeout=0.01)
+        async def function(seconds):
+            await asyncio.sleep(seconds)
+            return "done"
+
+        async with client() as test_client:
+            slow = await test_client.post(
+                "/v1/test/core/timeout/async", json={"seconds": 1}
+            )
+            fast = await test_client.post(
+                "/v1/test/core/timeout/async", json={"seconds": 0}
+            )
+        assert slow.status_code == 504
+        assert "0.01 seconds" in slow.json()["message"]
+        assert fast.json() == "done"
+        endpoint = asymmetric.endpoints.endpoints["/v1/test/core/timeout/async"]
+        assert endpoint["post"].timeout == 0.01
+
+    @pytest.mark.asyncio
+    async def test_thread_timeout(self):
+        @asymmetric.router(
+            "/v1/test/core/timeout/thread", run_in="thread", timeout=0.01
+        )
+        def function():
+            time.sleep(0.1)
+
+        async with client() as test_client:
+            response = await test_client.post("/v1/test/core/timeout/thread")
+        assert response.status_code == 504
+
+    def test_invalid_timeout(self):
+        with pytest.raises(InvalidTimeoutError):
+
+            @asymmetric.router(
+                "/v1/test/core/timeout/invalid", run_in="loop", timeout=1
+            )
+            def function():
+                pass
+
+
+class TestRouterDeadlines:
+    @pytest.mark.asyncio
+    async def test_passed_deadline(self):
+        calls = []
+
+        @asymmetric.router("/v1/test/core/deadline/passed")
+        def function():
+            calls.append(True)
+
+        async with client() as test_client:
+            response = await test_client.post(
+                "/v1/test/core/deadline/passed",
+                headers={"x-request-deadline": str(time.time() - 1)},
+            )
+        assert response.status_code == 504
+        assert calls == []
+
+    @pytest.mark.asyncio
+    async def test_remaining_time(self):
+        @asymmetric.router("/v1/test/core/deadline/async")
+        async def async_function():
+            return remaining_time()
+
+        @asymmetric.router("/v1/test/core/deadline/thread", run_in="thread")
+        def thread_function():
+            return remaining_time()
+
+        headers = {"x-request-timeout-ms": "2000"}
+        async with client() as test_client:
+            async_response = await test_client.post(
+                "/v1/test/core/deadline/async", headers=headers
+            )
+            thread_response = await test_client.post(
+                "/v1/test/core/deadline/thread", headers=headers
+            )
+            no_deadline = await test_client.post("/v1/test/core/deadline/async")
+        assert 1 < async_response.json() <= 2
+        assert 1 < thread_response.json() <= 2
+        assert no_deadline.json() is None
+
+    @pytest.mark.asyncio
+    async def test_budget_bounds_the_call(self):
+        @asymmetric.router("/v1/test/core/deadline/budget", timeout=10)
+        async def function():
+            await asyncio.sleep(1)
+
+        async with client() as test_client:
+            response = await test_client.post(
+                "/v1/test/core/deadline/budget",
+                headers={"x-request-timeout-ms": "10"},
+            )
+        assert response.status_code == 504
+        assert "deadline" in response.json()["message"]
+
+    @pytest.mark.asyncio
+    async def test_shared_flight_deadline(self):
+        @asymmetric.router("/v1/test/core/deadline/flight", single_flight=True)
+        async def function():
+            await asyncio.sleep(0.2)
+            return "done"
+
+        async with client() as test_client:
+            leader, follower = await asyncio.gather(
+                test_client.post(
+                    "/v1/test/core/deadline/flight",
+                    headers={"x-request-timeout-ms": "50"},
+                ),
+                test_client.post("/v1/test/core/deadline/flight"),
+            )
+        assert leader.status_code == 504
+        assert follower.status_code == 200
+        assert follower.json() == "done"
+
+    @pytest.mark.asyncio
+    async def test_shared_batch_deadline(self):
+        @asymmetric.router(
+            "/v1/test/core/deadline/batch",
+            batch=BatchConfig(max_size=10, max_wait_ms=100),
+        )
+        def function(x):
+            return [value * 2 for value in x]
+
+        async with client() as test_client:
+            # The request with a deadline starts the batch
+            first = asyncio.ensure_future(
+                test_client.post(
+                    "/v1/test/core/deadline/batch",
+                    json={"x": 1},
+                    headers={"x-request-timeout-ms": "20"},
+                )
+            )
+            await asyncio.sleep(0.005)
+            second = await test_client.post(
+                "/v1/test/core/deadline/batch", json={"x": 2}
+            )
+            first = await first
+        assert first.status_code == 504
+        assert second.status_code == 200
+        assert second.json() == 4
+
+    @pytest.mark.asyncio
+    async def test_refresh_without_deadline(self):
+        calls = []
+
+        @asymmetric.router(
+            "/v1/test/core/deadline/revalidate",
+            revalidate=RevalidateConfig(soft_ttl=0.01, hard_ttl=60),
+        )
+        async def function():
+            calls.append(True)
+            await asyncio.sleep(0.1)
+            return len(calls)
+
+        async with client() as test_client:
+            first = await test_client.post("/v1/test/core/deadline/revalidate")
+            await asyncio.sleep(0.02)
+            stale = await test_client.post(
+                "/v1/test/core/deadline/revalidate",
+                headers={"x-request-timeout-ms": "50"},
+            )
+            await asyncio.sleep(0.15)
+            fresh = await test_client.post("/v1/test/core/deadline/revalidate")
+        assert first.json() == stale.json() == 1
+        assert fresh.json() == 2
+
+    @pytest.mark.asyncio
+    async def test_expired_while_queued(self):
+        event = asyncio.Event()
+        calls = []
+
+        @asymmetric.router(
+            "/v1/test/core/deadline/queued", max_concurrency=1, max_queue=1
+        )
+        async def function():
+            calls.append(True)
+            await event.wait()
+
+        async with client() as test_client:
+            first = asyncio.ensure_future(
+                test_client.post("/v1/test/core/deadline/queued")
+            )
+            await asyncio.sleep(0.05)
+            queued = asyncio.ensure_future(
+                test_client.post(
+                    "/v1/test/core/deadline/queued",
+                    headers={"x-request-timeout-ms": "10"},
+                )
+            )
+            await asyncio.sleep(0.05)
+            event.set()
+            responses = await asyncio.gather(first, queued)
+        assert [response.status_code for response in responses] == [200, 504]
+        assert calls == [True]
+
+    @pytest.mark.asyncio
+    async def test_invalid_deadline(self):
+        @asymmetric.router("/v1/test/core/deadline/invalid")
+        def function():
+            pass
+
+        async with client() as test_client:
+            response = await test_client.post(
+                "/v1/test/core/deadline/invalid",
+                headers={"x-request-deadline": "tomorrow"},
+            )
+        assert response.status_code == 400
+
+
+async def disconnect(route, delay):
+    """
+    Sends a request to :route and disconnects after :delay seconds. Returns
+    the ASGI messages sent by the app.
+    """
+    messages = []
+    received = asyncio.Event()
+
+    async def receive():
+        if not received.is_set():
+            received.set()
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.sleep(delay)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": route,
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "server": ("asymmetric.test", 80),
+    }
+    await asymmetric(scope, receive, send)
+    return messages
+
+
+class TestRouterDisconnects:
+    @pytest.mark.asyncio
+    async def test_async_cancellation(self):
+        cancelled = asyncio.Event()
+
+        @asymmetric.router("/v1/test/core/disconnect/async", cancel_on_disconnect=True)
+        async def function():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        messages = await disconnect("/v1/test/core/disconnect/async", 0.01)
+        await asyncio.sleep(0)
+        assert cancelled.is_set()
+        assert messages[0]["status"] == 499
+
+    @pytest.mark.asyncio
+    async def test_sync_cancellation_token(self):
+        stopped = threading.Event()
+
+        @asymmetric.router(
+            "/v1/test/core/disconnect/thread",
+            run_in="thread",
+            cancel_on_disconnect=True,
+        )
+        def function():
+            if cancellation_token().wait(5):
+                stopped.set()
+
+        await disconnect("/v1/test/core/disconnect/thread", 0.01)
+        assert await asyncio.get_event_loop().run_in_executor(None, stopped.wait, 5)
+
+    @pytest.mark.asyncio
+    async def test_shared_flight_disconnect(self):
+        @asymmetric.router(
+            "/v1/test/core/disconnect/flight",
+            run_in="thread",
+            single_flight=True,
+            cancel_on_disconnect=True,
+        )
+        def function():
+            if cancellation_token().wait(0.1):
+                raise RuntimeError("Cancelled by another client")
+            return "done"
+
+        async def follow():
+            await asyncio.sleep(0.005)
+            async with client() as test_client:
+                return await test_client.post("/v1/test/core/disconnect/flight")
+
+        messages, follower = await asyncio.gather(
+            disconnect("/v1/test/core/disconnect/flight", 0.01), follow()
+        )
+        assert messages[0]["status"] == 499
+        assert follower.status_code == 200
+        assert follower.json() == "done"
+
+    @pytest.mark.asyncio
+    async def test_shared_batch_disconnect(self):
+        @asymmetric.router(
+            "/v1/test/core/disconnect/batch",
+            run_in="thread",
+            batch=BatchConfig(max_size=10, max_wait_ms=20),
+            cancel_on_disconnect=True,
+        )
+        def function():
+            if cancellation_token().wait(0.1):
+                raise RuntimeError("Cancelled by another client")
+            return ["done"] * 2
+
+        async def follow():
+            await asyncio.sleep(0.005)
+            async with client() as test_client:
+                return await test_client.post("/v1/test/core/disconnect/batch")
+
+        messages, follower = await asyncio.gather(
+            disconnect("/v1/test/core/disconnect/batch", 0.03), follow()
+        )
+        assert messages[0]["status"] == 499
+        assert follower.status_code == 200
+        assert follower.json() == "done"
+
+    @pytest.mark.asyncio
+    async def test_connected_client(self):
+        @asymmetric.router(
+            "/v1/test/core/disconnect/connected", cancel_on_disconnect=True
+        )
+        async def function():
+            return "done"
+
+        async with client() as test_client:
+            response = await test_client.post("/v1/test/core/disconnect/connected")
+        assert response.json() == "done"
+
+    def test_invalid_cancel_on_disconnect(self):
+        with pytest.raises(InvalidCancellationError):
+
+            @asymmetric.router(
+                "/v1/test/core/disconnect/invalid",
+                callback=True,
+                cancel_on_disconnect=True,
+            )
+            def function():
+                pass
@@ -0,0 +1,100 @@
+import asyncio
+import contextvars
+import time
+
+import pytest
+
+from asymmetric.deadlines import (
+    check_deadline,
+    current_deadline,
+    get_call_timeout,
+    parse_deadline,
+    remaining_time,
+    run_before_deadline,
+    wait_before_deadline,
+)
+from asymmetric.errors import DeadlineExceededError, InvalidDeadlineError
+from asymmetric.utils import start_detached
+
+
+def run_with_deadline(deadline, function, *args):
+    """Runs :function with :args in a context with :deadline."""
+    context = contextvars.copy_context()
+    context.run(current_deadline.set, deadline)
+    return context.run(function, *args)
+
+
+class TestParseDeadline:
+    def test_no_deadline(self):
+        assert parse_deadline({}) is None
+
+    def test_absolute_deadline(self):
+        deadline = parse_deadline({"x-request-deadline": str(time.time() + 2)})
+        assert deadline - time.monotonic() == pytest.approx(2, abs=0.1)
+
+    def test_remaining_milliseconds(self):
+        deadline = parse_deadline({"x-request-timeout-ms": "500"})
+        assert deadline - time.monotonic() == pytest.approx(0.5, abs=0.1)
+
+    def test_earliest_deadline(self):
+        deadline = parse_deadline(
+            {"x-request-deadline": str(time.time() + 5), "x-request-timeout-ms": "100"}
+        )
+        assert deadline - time.monotonic() == pytest.approx(0.1, abs=0.1)
+
+    @pytest.mark.parametrize("value", ["soon", "nan", "inf", ""])
+    def test_invalid_deadline(self, value):
+        with pytest.raises(InvalidDeadlineError):
+            parse_deadline({"x-request-timeout-ms": value})
+
+
+class TestRemainingTime:
+    def test_no_deadline(self):
+        assert remaining_time() is None
+        assert get_call_timeout(None) is None
+        assert get_call_timeout(3) == 3
+        check_deadline()
+
+    def test_remaining_time(self):
+        deadline = time.monotonic() + 2
+        assert run_with_deadline(deadline, remaining_time) == pytest.approx(2, abs=0.1)
+        assert run_with_deadline(deadline, get_call_timeout, 1) == 1
+        assert run_with_deadline(deadline, get_call_timeout, None) <= 2
+        run_with_deadline(deadline, check_deadline)
+
+    def test_passed_deadline(self):
+        deadline = time.monotonic() - 1
+        assert run_with_deadline(deadline, remaining_time) == 0
+        with pytest.raises(DeadlineExceededError):
+            run_with_deadline(deadline, check_deadline)
+        with pytest.raises(DeadlineExceededError):
+            run_with_deadline(deadline, run_before_deadline, print, {})
+
+    @pytest.mark.asyncio
+    async def test_deadline_in_tasks(self):
+        async def get_remaining_time():
+            await asyncio.sleep(0)
+            return remaining_time()
+
+        token = current_deadline.set(time.monotonic() + 2)
+        try:
+            task = asyncio.ensure_future(get_remaining_time())
+        finally:
+            current_deadline.reset(token)
+        assert await task == pytest.approx(2, abs=0.1)
+
+    @pytest.mark.asyncio
+    async def test_detached_tasks(self):
+        async def get_remaining_time():
+            await asyncio.sleep(0.05)
+            return remaining_time()
+
+        token = current_deadline.set(time.monotonic() + 0.01)
+        try:
+            task = start_detached(get_remaining_time())
+            with pytest.raises(DeadlineExceededError):
+                await wait_before_deadline(asyncio.shield(task))
+        finally:
+            current_deadline.reset(token)
+        assert await task is None
+        assert await wait_before_deadline(asyncio.sleep(0, result=3)) == 3
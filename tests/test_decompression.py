@@ -0,0 +1,73 @@
+import gzip
+import zlib
+
+import pytest
+
+from asymmetric.decompression import Decompressor, validate_max_decompressed_size
+from asymmetric.errors import (
+    InvalidCompressedBodyError,
+    RequestBodyTooLargeError,
+    UnsupportedContentEncodingError,
+)
+
+
+class TestValidateMaxDecompressedSize:
+    def test_valid_max_size(self):
+        validate_max_decompressed_size(1024)
+        validate_max_decompressed_size(None)
+
+    def test_invalid_max_size(self):
+        with pytest.raises(ValueError):
+            validate_max_decompressed_size(0)
+        with pytest.raises(ValueError):
+            validate_max_decompressed_size(1.5)
+
+
+class TestDecompressor:
+    def setup_method(self):
+        self.data = b'{"key": "value"}\n' * 1000
+
+    def decompress_in_chunks(self, decompressor, compressed, size=100):
+        chunks = [compressed[i : i + size] for i in range(0, len(compressed), size)]
+        decompressed = b"".join(decompressor.decompress(chunk) for chunk in chunks)
+        decompressor.finish()
+        return decompressed
+
+    def test_gzip(self):
+        decompressor = Decompressor("gzip")
+        compressed = gzip.compress(self.data)
+        assert self.decompress_in_chunks(decompressor, compressed) == self.data
+        assert decompressor.size == len(self.data)
+
+    def test_deflate(self):
+        decompressor = Decompressor("deflate")
+        compressed = zlib.compress(self.data)
+        assert self.decompress_in_chunks(decompressor, compressed) == self.data
+
+    def test_size_limit(self):
+        decompressor = Decompressor("gzip", max_size=len(self.data))
+        compressed = gzip.compress(self.data)
+        assert self.decompress_in_chunks(decompressor, compressed) == self.data
+
+        decompressor = Decompressor("gzip", max_size=len(self.data) - 1)
+        with pytest.raises(RequestBodyTooLargeError):
+            self.decompress_in_chunks(decompressor, compressed)
+
+    def test_decompression_bomb(self):
+        bomb = gzip.compress(b"0" * 10_000_000)
+        decompressor = Decompressor("gzip", max_size=1024)
+        with pytest.raises(RequestBodyTooLargeError):
+            decompressor.decompress(bomb)
+        assert decompressor.size <= 1025
+
+    def test_invalid_bodies(self):
+        with pytest.raises(InvalidCompressedBodyError):
+            Decompressor("gzip").decompress(b"not gzip at all")
+        decompressor = Decompressor("gzip")
+        decompressor.decompress(gzip.compress(self.data)[:-10])
+        with pytest.raises(InvalidCompressedBodyError):
+            decompressor.finish()
+
+    def test_unsupported_encoding(self):
+        with pytest.raises(UnsupportedContentEncodingError):
+            Decompressor("br")
@@ -0,0 +1,126 @@
+import copy
+
+import pytest
+from starlette.requests import Request
+
+from asymmetric.codecs import JSONCodec
+from asymmetric.configs import DeltaConfig
+from asymmetric.deltas import (
+    DeltaHistory,
+    accepts_json_patch,
+    diff_bodies,
+    make_json_patch,
+    validate_deltas,
+)
+from asymmetric.errors import InvalidDeltaError
+from asymmetric.plans import get_call_plan
+
+
+def apply_json_patch(document, patch):
+    document = copy.deepcopy(document)
+    for operation in patch:
+        tokens = [
+            token.replace("~1", "/").replace("~0", "~")
+            for token in operation["path"].split("/")[1:]
+        ]
+        if not tokens:
+            document = operation["value"]
+            continue
+        parent = document
+        for token in tokens[:-1]:
+            parent = parent[int(token) if isinstance(parent, list) else token]
+        last = tokens[-1]
+        if isinstance(parent, list):
+            if operation["op"] == "add" and last == "-":
+                parent.append(operation["value"])
+            elif operation["op"] == "remove":
+                parent.pop(int(last))
+            else:
+                parent[int(last)] = operation["value"]
+        elif operation["op"] == "remove":
+            del parent[last]
+        else:
+            parent[last] = operation["value"]
+    return document
+
+
+def request(method="GET", a_im=None):
+    headers = []
+    if a_im is not None:
+        headers.append((b"a-im", a_im.encode()))
+    return Request({"type": "http", "method": method, "headers": headers})
+
+
+class TestValidateDeltas:
+    def setup_method(self):
+        self.plan = get_call_plan(lambda: {})
+
+    def test_valid_deltas(self):
+        validate_deltas(DeltaConfig(), self.plan)
+
+    def test_invalid_deltas(self):
+        with pytest.raises(InvalidDeltaError):
+            validate_deltas(DeltaConfig(max_versions=0), self.plan)
+        with pytest.raises(InvalidDeltaError):
+            validate_deltas(DeltaConfig(), self.plan, etag=False)
+        with pytest.raises(InvalidDeltaError):
+            validate_deltas(DeltaConfig(), self.plan, chunk_size=1024)
+
+
+class TestMakeJSONPatch:
+    @pytest.mark.parametrize(
+        "old,new",
+        [
+            ({"a": 1, "b": 2}, {"a": 1, "b": 3}),
+            ({"a": 1, "b": 2}, {"a": 1, "c": [1, 2]}),
+            ({"a/b": {"~c": 1}}, {"a/b": {"~c": 2}}),
+            ([1, 2, 3, 4], [1, 5]),
+            ([1], [1, {"a": 1}, 3]),
+            ({"a": [1, {"b": True}]}, {"a": [1, {"b": 1}]}),
+            ({"a": 1}, [1, 2]),
+        ],
+    )
+    def test_patch_roundtrip(self, old, new):
+        assert apply_json_patch(old, make_json_patch(old, new)) == new
+
+    def test_equal_documents(self):
+        assert make_json_patch({"a": [1, 2]}, {"a": [1, 2]}) == []
+
+    def test_escaped_paths(self):
+        patch = make_json_patch({"a/b": 1}, {"a/b": 2})
+        assert patch == [{"op": "replace", "path": "/a~1b", "value": 2}]
+
+    def test_diff_bodies(self):
+        codec = JSONCodec()
+        patch = diff_bodies(b'{"a":1,"b":2}', b'{"a":1,"b":3}', codec)
+        assert codec.loads(patch) == [{"op": "replace", "path": "/b", "value": 3}]
+
+
+class TestAcceptsJSONPatch:
+    def test_accepts_json_patch(self):
+        assert accepts_json_patch(request(a_im="json-patch"))
+        assert accepts_json_patch(request(a_im="gzip, json-patch;q=0.5"))
+        assert not accepts_json_patch(request(a_im="gzip"))
+        assert not accepts_json_patch(request())
+        assert not accepts_json_patch(request("POST", a_im="json-patch"))
+
+
+class TestDeltaHistory:
+    def test_bounded_versions(self):
+        history = DeltaHistory(DeltaConfig(max_versions=2, max_keys=1))
+        history.record("key", '"1"', b"1")
+        history.record("key", '"2"', b"2")
+        history.record("key", '"3"', b"3")
+        assert history.get("key", '"1"') is None
+        assert history.get("key", '"2"') == b"2"
+        history.record("other", '"1"', b"1")
+        assert history.get("key", '"3"') is None
+        assert len(history) == 1
+
+    def test_delta(self):
+        history = DeltaHistory(DeltaConfig())
+        response = history.delta(b"[]", '"2"', '"1"')
+        assert response.status_code == 226
+        assert response.headers["im"] == "json-patch"
+        assert response.headers["delta-base"] == '"1"'
+        assert history.delta_count == 1
@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from asymmetric.disconnects import (
+    CancellationToken,
+    cancellation_token,
+    current_token,
+    run_until_disconnect,
+    validate_cancel_on_disconnect,
+)
+from asymmetric.errors import ClientDisconnectedError, InvalidCancellationError
+from asymmetric.plans import get_call_plan
+
+
+def disconnecting_receive(delay):
+    """Returns an ASGI receive whose client disconnects after :delay seconds."""
+
+    async def receive():
+        await asyncio.sleep(delay)
+        return {"type": "http.disconnect"}
+
+    return receive
+
+
+class TestValidateCancelOnDisconnect:
+    def test_valid_function(self):
+        validate_cancel_on_disconnect(get_call_plan(lambda: None))
+
+    def test_invalid_function(self):
+        def generator():
+            yield 1
+
+        with pytest.raises(InvalidCancellationError):
+            validate_cancel_on_disconnect(get_call_plan(generator))
+        with pytest.raises(InvalidCancellationError):
+            validate_cancel_on_disconnect(get_call_plan(lambda: None), callback=True)
+        with pytest.raises(InvalidCancellationError):
+            validate_cancel_on_disconnect(get_call_plan(lambda: None), stream_body=True)
+
+
+class TestCancellationToken:
+    def test_cancel(self):
+        token = CancellationToken()
+        assert not token.cancelled
+        assert not token.wait(0)
+        token.cancel()
+        assert token.cancelled
+        assert token.wait()
+
+    def test_current_token(self):
+        assert not cancellation_token().cancelled
+        token = CancellationToken()
+        reset = current_token.set(token)
+        try:
+            assert cancellation_token() is token
+        finally:
+            current_token.reset(reset)
+
+
+class TestRunUntilDisconnect:
+    @pytest.mark.asyncio
+    async def test_finished_in_time(self):
+        token = CancellationToken()
+        result = await run_until_disconnect(
+            asyncio.sleep(0, result=3), disconnecting_receive(1), token
+        )
+        assert result == 3
+        assert not token.cancelled
+
+    @pytest.mark.asyncio
+    async def test_disconnected(self):
+        cancelled = asyncio.Event()
+        token = CancellationToken()
+
+        async def stuck():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with pytest.raises(ClientDisconnectedError):
+            await run_until_disconnect(stuck(), disconnecting_receive(0.01), token)
+        await asyncio.sleep(0)
+        assert cancelled.is_set()
+        assert token.cancelled
+
+    @pytest.mark.asyncio
+    async def test_errors_get_raised(self):
+        async def failing():
+            raise ValueError("failed")
+
+        with pytest.raises(ValueError):
+            await run_until_disconnect(
+                failing(), disconnecting_receive(1), CancellationToken()
+            )
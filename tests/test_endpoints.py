@@ -1,7 +1,9 @@
 import pytest
 
+from asymmetric.configs import ExecutorConfig
 from asymmetric.endpoints import Endpoint, Endpoints
 from asymmetric.errors import DuplicatedEndpointError
+from asymmetric.executors import BoundedExecutor
 
 
 class TestEndpointClass:
@@ -43,6 +45,24 @@ class TestEndpointClass:
         assert instance.docstring == "No description provided."
         assert instance.callback is False
         assert instance.response_code == self.response_code
+        assert instance.run_in is None
+        assert instance.executor is None
+        assert instance.batcher is None
+        assert instance.cache is None
+        assert instance.flights is None
+
+    def test_endpoint_executor(self):
+        executor = BoundedExecutor(ExecutorConfig(max_workers=2))
+        instance = Endpoint(
+            self.route,
+            self.method,
+            self.function,
+            self.decorated_function,
+            run_in="thread",
+            executor=executor,
+        )
+        assert instance.run_in == "thread"
+        assert instance.executor is executor
 
     def test_docstring_endpoint_function(self):
         instance = Endpoint(
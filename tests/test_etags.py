@@ -0,0 +1,114 @@
+import pytest
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+
+from asymmetric.errors import InvalidETagError
+from asymmetric.etags import (
+    conditional_response,
+    get_base_etag,
+    get_encoded_etag,
+    get_etag,
+    get_matching_etag,
+    get_version,
+    get_version_etag,
+    is_not_modified,
+    parse_if_none_match,
+    validate_etags,
+)
+from asymmetric.plans import get_call_plan
+
+
+def request(method="GET", if_none_match=None):
+    headers = []
+    if if_none_match is not None:
+        headers.append((b"if-none-match", if_none_match.encode()))
+    return Request({"type": "http", "method": method, "headers": headers})
+
+
+class TestValidateETags:
+    def setup_method(self):
+        self.plan = get_call_plan(lambda x: x)
+
+    def test_valid_etags(self):
+        validate_etags(self.plan)
+        validate_etags(self.plan, version=lambda x: 1)
+        validate_etags(self.plan, etag=False)
+
+    def test_invalid_etags(self):
+        with pytest.raises(InvalidETagError):
+            validate_etags(self.plan, version="v1")
+        with pytest.raises(InvalidETagError):
+            validate_etags(self.plan, etag=False, version=lambda: 1)
+        with pytest.raises(InvalidETagError):
+            validate_etags(self.plan, version=lambda: 1, callback=True)
+
+
+class TestETags:
+    def test_get_etag(self):
+        assert get_etag(b"body") == get_etag(b"body")
+        assert get_etag(b"body") != get_etag(b"other")
+        assert get_etag(b"body").startswith('"')
+
+    def test_get_version_etag(self):
+        assert get_version_etag({"x": 1}, 1) == get_version_etag({"x": 1}, 1)
+        assert get_version_etag({"x": 1}, 1) != get_version_etag({"x": 1}, 2)
+        assert get_version_etag({"x": 1}, 1) != get_version_etag({"x": 2}, 1)
+
+    @pytest.mark.asyncio
+    async def test_get_version(self):
+        async def version(x):
+            return x + 1
+
+        assert await get_version(lambda x: x, {"x": 1}) == 1
+        assert await get_version(lambda: "v1", {"x": 1}) == "v1"
+        assert await get_version(version, {"x": 1}) == 2
+
+    def test_parse_if_none_match(self):
+        assert parse_if_none_match('"a", W/"b" ,') == ['"a"', '"b"']
+
+    def test_is_not_modified(self):
+        assert is_not_modified(request(if_none_match='"a", "b"'), '"b"')
+        assert is_not_modified(request(if_none_match="*"), '"b"')
+        assert not is_not_modified(request(if_none_match='"a"'), '"b"')
+        assert not is_not_modified(request(), '"b"')
+        assert not is_not_modified(request("POST", if_none_match='"b"'), '"b"')
+        assert is_not_modified(request(if_none_match='"b-gzip"'), '"b"')
+
+    def test_encoded_etags(self):
+        assert get_encoded_etag('"a"', "gzip") == '"a-gzip"'
+        assert get_encoded_etag('W/"a"', "br") == 'W/"a-br"'
+        assert get_base_etag('"a-gzip"') == '"a"'
+        assert get_base_etag('"a-br"') == '"a"'
+        assert get_base_etag('"a-b"') == '"a-b"'
+
+    def test_get_matching_etag(self):
+        assert get_matching_etag(request(if_none_match='"a", "b-br"'), '"b"') == (
+            '"b-br"'
+        )
+        assert get_matching_etag(request(if_none_match="*"), '"b"') == '"b"'
+        assert get_matching_etag(request(if_none_match='"a"'), '"b"') is None
+
+
+class TestConditionalResponse:
+    def test_tagged_response(self):
+        response = conditional_response(request(), Response(b"body"))
+        assert response.status_code == 200
+        assert response.headers["etag"] == get_etag(b"body")
+
+    def test_not_modified_response(self):
+        response = conditional_response(
+            request(if_none_match=get_etag(b"body")), Response(b"body")
+        )
+        assert response.status_code == 304
+        assert response.body == b""
+        assert response.headers["etag"] == get_etag(b"body")
+
+    def test_untagged_responses(self):
+        failed = conditional_response(request(), Response(b"body", status_code=500))
+        assert "etag" not in failed.headers
+        stream = conditional_response(request(), StreamingResponse(iter([b"body"])))
+        assert "etag" not in stream.headers
+        tagged_stream = conditional_response(
+            request(), StreamingResponse(iter([b"body"])), etag='"v1"'
+        )
+        assert tagged_stream.headers["etag"] == '"v1"'
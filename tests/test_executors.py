@@ -0,0 +1,223 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from asymmetric.configs import ExecutorConfig
+from asymmetric.constants import RUN_IN_LOOP, RUN_IN_PROCESS, RUN_IN_THREAD
+from asymmetric.errors import EndpointOverloadedError, InvalidExecutionModeError
+from asymmetric.executors import (
+    BoundedExecutor,
+    Executors,
+    runs_in_process,
+    validate_execution_mode,
+    validate_process_function,
+)
+from asymmetric.plans import get_call_plan
+from asymmetric.utils import generic_call
+
+
+def process_function(x):
+    return {"square": x * x, "pid": os.getpid()}
+
+
+def process_generator(x):
+    yield x
+
+
+class TestValidateExecutionMode:
+    def test_valid_execution_modes(self):
+        validate_execution_mode(RUN_IN_LOOP)
+        validate_execution_mode(RUN_IN_THREAD)
+
+    def test_invalid_execution_mode(self):
+        with pytest.raises(InvalidExecutionModeError):
+            validate_execution_mode("somewhere")
+
+
+class TestValidateProcessFunction:
+    def test_valid_process_function(self):
+        validate_process_function(get_call_plan(process_function))
+
+    def test_local_process_function(self):
+        def local_function(x):
+            return x
+
+        with pytest.raises(InvalidExecutionModeError):
+            validate_process_function(get_call_plan(local_function))
+
+    def test_generator_process_function(self):
+        with pytest.raises(InvalidExecutionModeError):
+            validate_process_function(get_call_plan(process_generator))
+
+    def test_async_process_function(self):
+        async def async_function(x):
+            return x
+
+        with pytest.raises(InvalidExecutionModeError):
+            validate_process_function(get_call_plan(async_function))
+
+
+class TestExecutorsClass:
+    def setup_method(self):
+        self.executors = Executors()
+
+    def teardown_method(self):
+        self.executors.shutdown()
+
+    def test_default_run_in(self):
+        assert self.executors.run_in == RUN_IN_THREAD
+        assert isinstance(self.executors.get_executor(), ThreadPoolExecutor)
+
+    def test_loop_run_in(self):
+        self.executors.run_in = RUN_IN_LOOP
+        assert self.executors.get_executor() is None
+        assert self.executors.get_executor(RUN_IN_THREAD) is not None
+
+    def test_run_in_override(self):
+        assert self.executors.get_executor(RUN_IN_LOOP) is None
+
+    def test_invalid_run_in(self):
+        with pytest.raises(InvalidExecutionModeError):
+            self.executors.run_in = "somewhere"
+
+    def test_process_run_in(self):
+        with pytest.raises(InvalidExecutionModeError):
+            self.executors.run_in = RUN_IN_PROCESS
+        assert isinstance(
+            self.executors.get_executor(RUN_IN_PROCESS), ProcessPoolExecutor
+        )
+
+    def test_process_pool_size(self):
+        assert self.executors.process_pool_size == (os.cpu_count() or 1)
+        self.executors.process_pool_size = 2
+        assert self.executors.process_pool_size == 2
+        with pytest.raises(ValueError):
+            self.executors.process_pool_size = 0
+
+    @pytest.mark.asyncio
+    async def test_process_pool_call(self):
+        self.executors.process_pool_size = 1
+        self.executors.register_process_function(get_call_plan(process_function))
+        await self.executors.start()
+        value = await generic_call(
+            process_function,
+            {"x": 3},
+            executor=self.executors.get_executor(RUN_IN_PROCESS),
+        )
+        assert value["square"] == 9
+        assert value["pid"] != os.getpid()
+
+    def test_lazy_thread_pool(self):
+        assert self.executors._Executors__thread_pool is None
+        thread_pool = self.executors.thread_pool
+        assert self.executors.thread_pool is thread_pool
+
+    def test_thread_pool_size(self):
+        thread_pool = self.executors.thread_pool
+        self.executors.thread_pool_size = 3
+        assert self.executors.thread_pool_size == 3
+        assert self.executors.thread_pool is not thread_pool
+        assert self.executors.thread_pool._max_workers == 3
+
+    def test_invalid_thread_pool_size(self):
+        with pytest.raises(ValueError):
+            self.executors.thread_pool_size = 0
+
+    def test_shutdown(self):
+        self.executors.thread_pool
+        self.executors.shutdown()
+        assert self.executors._Executors__thread_pool is None
+
+
+class TestRunsInProcess:
+    def test_runs_in_process(self):
+        config = ExecutorConfig(max_workers=1)
+        assert runs_in_process(ProcessPoolExecutor(max_workers=1))
+        assert runs_in_process(BoundedExecutor(config, run_in=RUN_IN_PROCESS))
+        assert not runs_in_process(ThreadPoolExecutor(max_workers=1))
+        assert not runs_in_process(BoundedExecutor(config))
+        assert not runs_in_process(None)
+
+
+class TestBoundedExecutorClass:
+    def setup_method(self):
+        self.event = threading.Event()
+        self.executor = BoundedExecutor(ExecutorConfig(max_workers=1, max_queue=1))
+
+    def teardown_method(self):
+        self.event.set()
+        self.executor.shutdown()
+
+    def test_invalid_config(self):
+        with pytest.raises(ValueError):
+            BoundedExecutor(ExecutorConfig(max_workers=0))
+        with pytest.raises(ValueError):
+            BoundedExecutor(ExecutorConfig(max_workers=1, max_queue=-1))
+
+    def test_submit(self):
+        assert self.executor.submit(lambda x: x * 2, 3).result() == 6
+
+    def test_counters(self):
+        assert self.executor.active_count == 0
+        assert self.executor.queue_depth == 0
+        running = self.executor.submit(self.event.wait)
+        queued = self.executor.submit(self.event.wait)
+        assert self.executor.active_count == 1
+        assert self.executor.queue_depth == 1
+        self.event.set()
+        running.result()
+        queued.result()
+        assert self.executor.active_count == 0
+        assert self.executor.queue_depth == 0
+
+    def test_overload(self):
+        self.executor.submit(self.event.wait)
+        self.executor.submit(self.event.wait)
+        with pytest.raises(EndpointOverloadedError):
+            self.executor.submit(self.event.wait)
+
+
+class TestCreateBoundedExecutor:
+    def setup_method(self):
+        self.executors = Executors()
+        self.config = ExecutorConfig(max_workers=2)
+
+    def teardown_method(self):
+        self.executors.shutdown()
+
+    def test_thread_bounded_executor(self):
+        plan = get_call_plan(process_function)
+        executor = self.executors.create_bounded_executor(self.config, plan)
+        assert executor.run_in == RUN_IN_THREAD
+        assert executor.config == self.config
+        assert isinstance(executor.pool, ThreadPoolExecutor)
+
+    def test_process_bounded_executor(self):
+        plan = get_call_plan(process_function)
+        executor = self.executors.create_bounded_executor(
+            self.config, plan, run_in=RUN_IN_PROCESS
+        )
+        assert executor.run_in == RUN_IN_PROCESS
+        assert isinstance(executor.pool, ProcessPoolExecutor)
+
+    def test_invalid_bounded_executors(self):
+        async def async_function():
+            pass
+
+        def local_function():
+            pass
+
+        with pytest.raises(InvalidExecutionModeError):
+            self.executors.create_bounded_executor(
+                self.config, get_call_plan(async_function)
+            )
+        with pytest.raises(InvalidExecutionModeError):
+            self.executors.create_bounded_executor(
+                self.config, get_call_plan(process_function), run_in=RUN_IN_LOOP
+            )
+        with pytest.raises(InvalidExecutionModeError):
+            self.executors.create_bounded_executor(
+                self.config, get_call_plan(local_function), run_in=RUN_IN_PROCESS
+            )
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from asymmetric.errors import InvalidSingleFlightError
+from asymmetric.flights import SingleFlight, validate_single_flight
+from asymmetric.plans import get_call_plan
+
+
+class TestValidateSingleFlight:
+    def test_valid_single_flight(self):
+        validate_single_flight(get_call_plan(lambda x: x))
+
+    def test_invalid_single_flight(self):
+        def generator():
+            yield 1
+
+        with pytest.raises(InvalidSingleFlightError):
+            validate_single_flight(get_call_plan(generator))
+        with pytest.raises(InvalidSingleFlightError):
+            validate_single_flight(get_call_plan(lambda x: x), callback=True)
+        with pytest.raises(InvalidSingleFlightError):
+            validate_single_flight(get_call_plan(lambda x: x), stream_body=True)
+
+
+class TestSingleFlight:
+    def setup_method(self):
+        self.calls = 0
+
+    async def call(self, fail=False):
+        self.calls += 1
+        call_number = self.calls
+        await asyncio.sleep(0.01)
+        if fail:
+            raise ValueError("Failed!")
+        return call_number
+
+    @pytest.mark.asyncio
+    async def test_shared_calls(self):
+        flights = SingleFlight()
+        results = await asyncio.gather(
+            *[flights.run("key", self.call) for _ in range(5)],
+            flights.run("other", self.call),
+        )
+        assert self.calls == 2
+        assert results == [1] * 5 + [2]
+        assert flights.shared_count == 4
+        assert flights.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_sequential_calls(self):
+        flights = SingleFlight()
+        assert await flights.run("key", self.call) == 1
+        assert await flights.run("key", self.call) == 2
+
+    @pytest.mark.asyncio
+    async def test_shared_errors(self):
+        flights = SingleFlight()
+        results = await asyncio.gather(
+            *[flights.run("key", lambda: self.call(fail=True)) for _ in range(3)],
+            return_exceptions=True,
+        )
+        assert self.calls == 1
+        assert all(isinstance(result, ValueError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller(self):
+        flights = SingleFlight()
+        first = asyncio.ensure_future(flights.run("key", self.call))
+        second = asyncio.ensure_future(flights.run("key", self.call))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second == 1
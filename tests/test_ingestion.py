@@ -0,0 +1,182 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Iterator
+
+import pytest
+
+from asymmetric.codecs import JSONCodec
+from asymmetric.errors import InvalidStreamedBodyError, InvalidStreamingParameterError
+from asymmetric.ingestion import (
+    BlockingIterator,
+    JSONArraySplitter,
+    get_streaming_parameter,
+    iterate_json_array,
+    iterate_ndjson,
+    iterate_records,
+    validate_body_streaming,
+)
+from asymmetric.plans import get_call_plan
+
+
+async def collect(iterator):
+    return [item async for item in iterator]
+
+
+async def async_chunks(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+def split_bytes(data, size):
+    return [data[index : index + size] for index in range(0, len(data), size)]
+
+
+class TestJSONArraySplitter:
+    def setup_method(self):
+        self.body = b' [1, "a,]\\"b", {"c": [1, 2]}, [3, {"d": "}"}], null] '
+
+    def test_split_whole_array(self):
+        splitter = JSONArraySplitter()
+        elements = splitter.feed(self.body)
+        assert [element.strip() for element in elements] == [
+            b"1",
+            b'"a,]\\"b"',
+            b'{"c": [1, 2]}',
+            b'[3, {"d": "}"}]',
+            b"null",
+        ]
+        assert splitter.finished is True
+        splitter.close()
+
+    def test_split_byte_by_byte(self):
+        splitter = JSONArraySplitter()
+        elements = []
+        for chunk in split_bytes(self.body, 1):
+            elements.extend(splitter.feed(chunk))
+        assert len(elements) == 5
+        assert elements[1].strip() == b'"a,]\\"b"'
+
+    def test_split_empty_array(self):
+        splitter = JSONArraySplitter()
+        assert splitter.feed(b"[ ]") == []
+        splitter.close()
+
+    def test_not_an_array(self):
+        with pytest.raises(InvalidStreamedBodyError):
+            JSONArraySplitter().feed(b'{"a": 1}')
+
+    def test_data_after_the_array(self):
+        with pytest.raises(InvalidStreamedBodyError):
+            JSONArraySplitter().feed(b"[1] 2")
+
+    def test_unclosed_array(self):
+        splitter = JSONArraySplitter()
+        splitter.feed(b"[1, 2")
+        with pytest.raises(InvalidStreamedBodyError):
+            splitter.close()
+
+
+class TestIterateRecords:
+    def setup_method(self):
+        self.codec = JSONCodec()
+
+    @pytest.mark.asyncio
+    async def test_iterate_ndjson(self):
+        chunks = async_chunks(b'{"a": 1}\n{"a"', b': 2}\n\n{"a": 3}')
+        records = await collect(iterate_ndjson(chunks, self.codec))
+        assert records == [{"a": 1}, {"a": 2}, {"a": 3}]
+
+    @pytest.mark.asyncio
+    async def test_iterate_json_array(self):
+        chunks = async_chunks(b'[{"a": 1}, {"a"', b": 2}]")
+        records = await collect(iterate_json_array(chunks, self.codec))
+        assert records == [{"a": 1}, {"a": 2}]
+
+    @pytest.mark.asyncio
+    async def test_iterate_invalid_record(self):
+        chunks = async_chunks(b'{"a": 1}\n{"a": }\n')
+        with pytest.raises(InvalidStreamedBodyError):
+            await collect(iterate_ndjson(chunks, self.codec))
+
+    @pytest.mark.asyncio
+    async def test_iterate_records_format(self):
+        array = await collect(
+            iterate_records(async_chunks(b"", b" [1, ", b"2]"), self.codec)
+        )
+        ndjson = await collect(iterate_records(async_chunks(b"1\n2\n"), self.codec))
+        declared = await collect(
+            iterate_records(
+                async_chunks(b"[1]\n[2]\n"), self.codec, "application/x-ndjson"
+            )
+        )
+        assert array == [1, 2]
+        assert ndjson == [1, 2]
+        assert declared == [[1], [2]]
+
+    @pytest.mark.asyncio
+    async def test_iterate_empty_records(self):
+        assert await collect(iterate_records(async_chunks(), self.codec)) == []
+
+
+class TestBlockingIterator:
+    @pytest.mark.asyncio
+    async def test_blocking_iteration(self):
+        records = BlockingIterator(
+            iterate_ndjson(async_chunks(b"1\n2\n3\n"), JSONCodec()),
+            asyncio.get_event_loop(),
+        )
+        loop = asyncio.get_event_loop()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            total = await loop.run_in_executor(executor, sum, records)
+        assert total == 6
+
+
+class TestValidateBodyStreaming:
+    def test_valid_body_streaming(self):
+        def function(records: Iterator[dict], name):
+            pass
+
+        async def async_function(records: AsyncIterator[dict]):
+            pass
+
+        validate_body_streaming(get_call_plan(function), run_in="thread")
+        validate_body_streaming(get_call_plan(async_function))
+        assert get_streaming_parameter(get_call_plan(function)) == "records"
+
+    def test_missing_iterator_parameter(self):
+        def function(records):
+            pass
+
+        def two_iterators(records: Iterator[dict], others: Iterator[dict]):
+            pass
+
+        for invalid in (function, two_iterators):
+            with pytest.raises(InvalidStreamingParameterError):
+                validate_body_streaming(get_call_plan(invalid))
+
+    def test_mismatched_iterator_parameter(self):
+        def function(records: AsyncIterator[dict]):
+            pass
+
+        async def async_function(records: Iterator[dict]):
+            pass
+
+        for invalid in (function, async_function):
+            with pytest.raises(InvalidStreamingParameterError):
+                validate_body_streaming(get_call_plan(invalid))
+
+    def test_invalid_body_streaming_usage(self):
+        def function(records: Iterator[dict]):
+            pass
+
+        def generator(records: Iterator[dict]):
+            yield 1
+
+        plan = get_call_plan(function)
+        for run_in in ("loop", "process"):
+            with pytest.raises(InvalidStreamingParameterError):
+                validate_body_streaming(plan, run_in=run_in)
+        with pytest.raises(InvalidStreamingParameterError):
+            validate_body_streaming(plan, callback=True)
+        with pytest.raises(InvalidStreamingParameterError):
+            validate_body_streaming(get_call_plan(generator))
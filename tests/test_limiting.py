@@ -0,0 +1,154 @@
+import asyncio
+import time
+
+import pytest
+
+from asymmetric.configs import AdaptiveLimitConfig
+from asymmetric.errors import EndpointOverloadedError, InvalidConcurrencyLimitError
+from asymmetric.limiting import (
+    AdaptiveConcurrencyLimiter,
+    ConcurrencyLimiter,
+    validate_concurrency_limit,
+)
+
+
+class TestValidateConcurrencyLimit:
+    def test_valid_limit(self):
+        validate_concurrency_limit(None)
+        validate_concurrency_limit(1)
+        validate_concurrency_limit(4, max_queue=10)
+        validate_concurrency_limit(AdaptiveLimitConfig(), max_queue=10)
+
+    def test_invalid_limit(self):
+        with pytest.raises(InvalidConcurrencyLimitError):
+            validate_concurrency_limit(0)
+        with pytest.raises(InvalidConcurrencyLimitError):
+            validate_concurrency_limit(2, max_queue=-1)
+        with pytest.raises(InvalidConcurrencyLimitError):
+            validate_concurrency_limit(None, max_queue=2)
+
+    @pytest.mark.parametrize(
+        "config",
+        [
+            AdaptiveLimitConfig(min_limit=0),
+            AdaptiveLimitConfig(initial_limit=20, max_limit=10),
+            AdaptiveLimitConfig(latency_tolerance=1),
+            AdaptiveLimitConfig(max_loop_lag_ms=0),
+            AdaptiveLimitConfig(backoff=1),
+        ],
+    )
+    def test_invalid_adaptive_limit(self, config):
+        with pytest.raises(InvalidConcurrencyLimitError):
+            validate_concurrency_limit(config)
+
+
+class TestConcurrencyLimiter:
+    @pytest.mark.asyncio
+    async def test_limited_concurrency(self):
+        limiter = ConcurrencyLimiter(2, max_queue=1)
+        first = await limiter.acquire()
+        await limiter.acquire()
+        queued = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        assert (limiter.active_count, limiter.queue_depth) == (2, 1)
+
+        with pytest.raises(EndpointOverloadedError) as error:
+            await limiter.acquire()
+        assert error.value.headers == {"retry-after": "1"}
+        assert limiter.rejected_count == 1
+
+        limiter.release(first)
+        await queued
+        assert (limiter.active_count, limiter.queue_depth) == (2, 0)
+        assert limiter.average_duration is not None
+
+    @pytest.mark.asyncio
+    async def test_first_come_first_served(self):
+        limiter = ConcurrencyLimiter(1, max_queue=2)
+        order = []
+
+        async def request(name):
+            started_at = await limiter.acquire()
+            order.append(name)
+            await asyncio.sleep(0.01)
+            limiter.release(started_at)
+
+        await asyncio.gather(*[request(name) for name in "abc"])
+        assert order == ["a", "b", "c"]
+        assert limiter.active_count == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter(self):
+        limiter = ConcurrencyLimiter(1, max_queue=2)
+        started_at = await limiter.acquire()
+        cancelled = asyncio.ensure_future(limiter.acquire())
+        waiting = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        assert limiter.queue_depth == 1
+        limiter.release(started_at)
+        limiter.release(await waiting)
+        assert limiter.active_count == 0
+
+    def test_retry_after(self):
+        limiter = ConcurrencyLimiter(2)
+        assert limiter.retry_after() == 1
+        limiter.release(0.0)  # A really long request
+        assert limiter.retry_after() > 1
+
+
+class TestAdaptiveConcurrencyLimiter:
+    @staticmethod
+    async def handle(limiter, duration):
+        """Simulates a request to :limiter that takes :duration seconds."""
+        await limiter.acquire()
+        limiter.release(time.monotonic() - duration)
+
+    @pytest.mark.asyncio
+    async def test_additive_increase(self):
+        limiter = AdaptiveConcurrencyLimiter(
+            AdaptiveLimitConfig(initial_limit=2, max_limit=3)
+        )
+        for _ in range(4):
+            await self.handle(limiter, 0.01)
+        assert limiter.max_concurrency == 3
+        assert limiter.increase_count == 1
+        assert limiter.decrease_count == 0
+        assert limiter.baseline == pytest.approx(0.01, rel=0.5)
+
+    @pytest.mark.asyncio
+    async def test_multiplicative_decrease_on_latency(self):
+        limiter = AdaptiveConcurrencyLimiter(
+            AdaptiveLimitConfig(initial_limit=10, min_limit=4, backoff=0.5)
+        )
+        await self.handle(limiter, 0.01)
+        await self.handle(limiter, 0.1)
+        assert limiter.max_concurrency == 5
+        await self.handle(limiter, 0.1)
+        assert limiter.max_concurrency == 4
+        assert limiter.decrease_count == 2
+
+    @pytest.mark.asyncio
+    async def test_multiplicative_decrease_on_loop_lag(self):
+        limiter = AdaptiveConcurrencyLimiter(
+            AdaptiveLimitConfig(initial_limit=10, max_loop_lag_ms=10, backoff=0.5)
+        )
+        await self.handle(limiter, 0.01)
+        asyncio.get_event_loop().call_soon(time.sleep, 0.05)  # Block the loop
+        await self.handle(limiter, 0.01)
+        assert limiter.loop_lag >= 0.05
+        assert limiter.max_concurrency == 5
+
+    @pytest.mark.asyncio
+    async def test_rejects_over_the_current_limit(self):
+        limiter = AdaptiveConcurrencyLimiter(
+            AdaptiveLimitConfig(initial_limit=2, min_limit=1, backoff=0.5)
+        )
+        await self.handle(limiter, 0.01)
+        started_at = await limiter.acquire()
+        limiter.release(started_at - 0.1)  # Too slow, the limit gets halved
+        await limiter.acquire()
+        with pytest.raises(EndpointOverloadedError):
+            await limiter.acquire()
+        assert limiter.rejected_count == 1
@@ -5,7 +5,17 @@ import os
 import pytest
 from starlette.requests import Request
 
-from asymmetric.loggers import configure_loggers, log, log_request, log_request_body
+from asymmetric.codecs import JSONCodec
+from asymmetric.loggers import (
+    LOG_SETTINGS,
+    configure_loggers,
+    log,
+    log_critical_errors,
+    log_enabled,
+    log_request,
+    log_request_body,
+    parse_body_limit,
+)
 
 
 class TestLog:
@@ -87,6 +97,18 @@ class TestLog:
         return caplog.text
 
 
+class TestLogEnabled:
+    def test_enabled_level(self, caplog):
+        with caplog.at_level(logging.INFO):
+            assert log_enabled() is True
+            assert log_enabled("warning") is True
+
+    def test_disabled_level(self, caplog):
+        with caplog.at_level(logging.WARNING):
+            assert log_enabled() is False
+            assert log_enabled("debug") is False
+
+
 class TestLogRequest:
     def setup_method(self):
         def sample_function():
@@ -109,6 +131,25 @@ class TestLogRequest:
         assert self.route in caplog.text
         assert self.function_name in caplog.text
 
+    @pytest.mark.asyncio
+    async def test_log_request_with_body(self, caplog):
+        with caplog.at_level(logging.INFO):
+            await log_request(
+                self.request, self.route, self.function, body={"given": True}
+            )
+        assert self.route in caplog.text
+        assert "given" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_disabled_log_request(self, caplog):
+        async def failing_receive():
+            raise AssertionError("The body should not be read")
+
+        request = Request({"type": "http", "method": self.method}, failing_receive)
+        with caplog.at_level(logging.WARNING):
+            await log_request(request, self.route, self.function)
+        assert self.route not in caplog.text
+
 
 class TestLogRequestBody:
     def setup_method(self):
@@ -118,8 +159,68 @@ class TestLogRequestBody:
             "age": 22,
         }
 
+    def teardown_method(self):
+        os.environ.pop("LOG_BODY_LIMIT", None)
+        LOG_SETTINGS["body_limit"] = None
+
     def test_log_request_body(self, caplog):
         with caplog.at_level(logging.INFO):
             log_request_body(self.body)
         for key in self.body.keys():
             assert str(key) in caplog.text
+
+    def test_truncated_log_request_body(self, caplog):
+        LOG_SETTINGS["body_limit"] = 10
+        with caplog.at_level(logging.INFO):
+            log_request_body(self.body)
+        assert "valid" in caplog.text
+        assert "age" not in caplog.text
+        assert "bytes omitted" in caplog.text
+
+    def test_truncated_raw_log_request_body(self, caplog):
+        def failing_dumps(*args, **kwargs):
+            raise AssertionError("The body should not be encoded")
+
+        codec = JSONCodec()
+        codec.dumps = failing_dumps
+        raw_body = b'{"valid": true, "items": [' + b"1, " * 1000 + b"1]}"
+        LOG_SETTINGS["body_limit"] = 20
+        with caplog.at_level(logging.INFO):
+            log_request_body(self.body, codec=codec, raw_body=raw_body)
+        assert '{"valid": true, "ite...' in caplog.text
+        assert f"({len(raw_body) - 20} bytes omitted)" in caplog.text
+
+    def test_untruncated_log_request_body(self, caplog):
+        LOG_SETTINGS["body_limit"] = 1000
+        with caplog.at_level(logging.INFO):
+            log_request_body(self.body)
+        assert '"age": 22' in caplog.text
+        assert "omitted" not in caplog.text
+
+    def test_configured_log_body_limit(self):
+        os.environ["LOG_BODY_LIMIT"] = "10"
+        configure_loggers()
+        assert LOG_SETTINGS["body_limit"] == 10
+
+    def test_invalid_log_body_limit(self, caplog):
+        with caplog.at_level(logging.WARNING):
+            assert parse_body_limit("abc") is None
+            assert parse_body_limit("-1") is None
+        assert "LOG_BODY_LIMIT" in caplog.text
+
+
+class TestLogCriticalErrors:
+    def test_logged_error(self, caplog):
+        with caplog.at_level(logging.CRITICAL):
+            with pytest.raises(ValueError) as error:
+                with log_critical_errors(ValueError):
+                    raise ValueError("Invalid value")
+        assert "Invalid value" in caplog.text
+        assert isinstance(error.value.__cause__, ValueError)
+
+    def test_unrelated_error(self, caplog):
+        with caplog.at_level(logging.CRITICAL):
+            with pytest.raises(KeyError):
+                with log_critical_errors(ValueError):
+                    raise KeyError("key")
+        assert "key" not in caplog.text
@@ -0,0 +1,86 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from asymmetric.offloading import (
+    LoopTimer,
+    current_timer,
+    record_timing,
+    run_sized,
+    validate_offload_size,
+)
+
+
+def thread_name(*args):
+    return threading.current_thread().name
+
+
+class TestValidateOffloadSize:
+    def test_valid_offload_size(self):
+        validate_offload_size(1024)
+        validate_offload_size(None)
+
+    def test_invalid_offload_size(self):
+        with pytest.raises(ValueError):
+            validate_offload_size(0)
+        with pytest.raises(ValueError):
+            validate_offload_size("big")
+
+
+class TestLoopTimer:
+    def test_blocked_time(self):
+        timer = LoopTimer()
+        timer.record("decode", 0.002, blocking=True)
+        timer.record("call", 0.5, blocking=False)
+        timer.record("encode", 0.003, blocking=True)
+        assert timer.blocked == pytest.approx(0.005)
+        assert [name for name, _ in timer.timings] == ["decode", "call", "encode"]
+
+    def test_header(self):
+        timer = LoopTimer()
+        timer.record("decode", 0.0015, blocking=True)
+        assert timer.header() == "decode;dur=1.500, loop;dur=1.500"
+
+    def test_record_timing(self):
+        timer = LoopTimer()
+        token = current_timer.set(timer)
+        try:
+            record_timing("call", 0.001, blocking=True)
+        finally:
+            current_timer.reset(token)
+        record_timing("call", 0.001, blocking=True)  # No timer, no error
+        assert len(timer.timings) == 1
+
+
+class TestRunSized:
+    def setup_method(self):
+        self.executor = ThreadPoolExecutor(1, thread_name_prefix="offload")
+        self.timer = LoopTimer()
+        self.token = current_timer.set(self.timer)
+
+    def teardown_method(self):
+        current_timer.reset(self.token)
+        self.executor.shutdown()
+
+    async def run(self, size, offload_size):
+        return await run_sized(
+            "encode",
+            thread_name,
+            b"data",
+            size=size,
+            offload_size=offload_size,
+            executor=self.executor,
+        )
+
+    @pytest.mark.asyncio
+    async def test_inline(self):
+        assert await self.run(10, 100) == threading.current_thread().name
+        assert await self.run(10**9, None) == threading.current_thread().name
+        assert self.timer.blocked > 0
+
+    @pytest.mark.asyncio
+    async def test_offloaded(self):
+        assert (await self.run(100, 100)).startswith("offload")
+        assert self.timer.blocked == 0
+        assert self.timer.timings[0][0] == "encode"
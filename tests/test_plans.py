@@ -0,0 +1,81 @@
+import asyncio
+from typing import AsyncIterator, Iterator, List
+
+import pytest
+
+from asymmetric.plans import CallPlan, get_call_plan
+
+
+class TestGetCallPlan:
+    def setup_method(self):
+        def function(x: int, y, z: str = "z", w=None) -> int:
+            return x
+
+        def function_kwargs(x, **kwargs):
+            return x
+
+        async def async_function(x):
+            await asyncio.sleep(0)
+            return x
+
+        self.function = function
+        self.function_kwargs = function_kwargs
+        self.async_function = async_function
+
+    def test_call_plan_instance(self):
+        plan = get_call_plan(self.function)
+        assert isinstance(plan, CallPlan) is True
+        assert plan.function == self.function
+
+    def test_call_plan_args(self):
+        plan = get_call_plan(self.function)
+        assert plan.args == ("x", "y", "z", "w")
+        assert plan.accepted == frozenset({"x", "y", "z", "w"})
+
+    def test_call_plan_kwargs(self):
+        assert get_call_plan(self.function).accepts_kwargs is False
+        assert get_call_plan(self.function_kwargs).accepts_kwargs is True
+
+    def test_call_plan_async(self):
+        assert get_call_plan(self.function).is_async is False
+        assert get_call_plan(self.async_function).is_async is True
+
+    def test_call_plan_generators(self):
+        def generator():
+            yield 1
+
+        async def async_generator():
+            yield 1
+
+        assert get_call_plan(self.function).is_generator is False
+        assert get_call_plan(generator).is_generator is True
+        assert get_call_plan(generator).is_async_generator is False
+        assert get_call_plan(async_generator).is_async_generator is True
+        assert get_call_plan(async_generator).is_async is False
+
+    def test_call_plan_defaults(self):
+        plan = get_call_plan(self.function)
+        assert dict(plan.defaults) == {"z": "z", "w": None}
+        assert dict(get_call_plan(self.function_kwargs).defaults) == {}
+
+    def test_call_plan_annotations(self):
+        plan = get_call_plan(self.function)
+        assert dict(plan.annotations) == {"x": int, "z": str, "return": int}
+
+    def test_call_plan_immutability(self):
+        plan = get_call_plan(self.function)
+        with pytest.raises(AttributeError):
+            plan.is_async = True
+        with pytest.raises(TypeError):
+            plan.defaults["z"] = "other"
+
+    def test_call_plan_iterators(self):
+        def function(records: Iterator[dict], name: str, other: List[int]):
+            return records
+
+        async def async_function(records: AsyncIterator[dict], name):
+            return records
+
+        assert dict(get_call_plan(function).iterators) == {"records": False}
+        assert dict(get_call_plan(async_function).iterators) == {"records": True}
+        assert dict(get_call_plan(self.function).iterators) == {}
@@ -0,0 +1,79 @@
+import asyncio
+import logging
+
+import pytest
+
+from asymmetric.configs import PrecomputeConfig
+from asymmetric.errors import InvalidPrecomputingError
+from asymmetric.plans import get_call_plan
+from asymmetric.precomputing import PrecomputedTable, validate_precomputing
+
+
+class TestValidatePrecomputing:
+    def setup_method(self):
+        self.plan = get_call_plan(lambda x: x)
+
+    def test_valid_precomputing(self):
+        validate_precomputing(PrecomputeConfig([{"x": 1}], ttl=60), self.plan)
+        validate_precomputing(PrecomputeConfig(lambda: iter([])), self.plan)
+
+    def test_invalid_config(self):
+        with pytest.raises(InvalidPrecomputingError):
+            validate_precomputing(PrecomputeConfig([], ttl=0), self.plan)
+        with pytest.raises(InvalidPrecomputingError):
+            validate_precomputing(PrecomputeConfig(42), self.plan)
+
+    def test_invalid_function(self):
+        def generator():
+            yield 1
+
+        with pytest.raises(InvalidPrecomputingError):
+            validate_precomputing(PrecomputeConfig([]), get_call_plan(generator))
+        with pytest.raises(InvalidPrecomputingError):
+            validate_precomputing(PrecomputeConfig([]), self.plan, stream_body=True)
+        with pytest.raises(InvalidPrecomputingError):
+            validate_precomputing(PrecomputeConfig([]), self.plan, chunk_size=1024)
+
+
+class TestPrecomputedTable:
+    def setup_method(self):
+        def function(x):
+            return x
+
+        self.plan = get_call_plan(function)
+
+    async def compute(self, params):
+        if params["x"] < 0:
+            raise ValueError("Negative!")
+        return str(params["x"]).encode()
+
+    @pytest.mark.asyncio
+    async def test_warm(self, caplog):
+        table = PrecomputedTable(
+            PrecomputeConfig([{"x": 1}, {"x": -1}, {"x": 2, "y": 3}]), self.plan
+        )
+        with caplog.at_level(logging.ERROR):
+            await table.warm(self.compute)
+        assert len(table) == 2
+        assert table.errors == 1
+        assert "Negative!" in caplog.text
+        assert table.get(table.key({"x": 2})) == b"2"
+        assert table.get(table.key({"x": 3})) is None
+        assert table.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_callable_params(self):
+        table = PrecomputedTable(
+            PrecomputeConfig(lambda: ({"x": x} for x in range(3))), self.plan
+        )
+        await table.warm(self.compute)
+        assert len(table) == 3
+
+    @pytest.mark.asyncio
+    async def test_expiry(self):
+        table = PrecomputedTable(PrecomputeConfig([{"x": 1}], ttl=0.02), self.plan)
+        await table.warm(self.compute)
+        assert table.get(table.key({"x": 1})) == b"1"
+        await asyncio.sleep(0.03)
+        assert table.get(table.key({"x": 1})) is None
+        assert len(table) == 0
@@ -0,0 +1,26 @@
+import json
+
+from asymmetric.codecs import JSONCodec, get_codec
+from asymmetric.responses import CodecJSONResponse
+
+
+class TestCodecJSONResponse:
+    def setup_method(self):
+        self.content = {"message": "Hello, test!", "values": [1, 2, 3]}
+
+    def test_default_codec_response(self):
+        response = CodecJSONResponse(self.content)
+        assert isinstance(response.codec, JSONCodec)
+        assert json.loads(response.body) == self.content
+        assert response.media_type == "application/json"
+        assert response.status_code == 200
+
+    def test_codec_response(self):
+        codec = get_codec()
+        response = CodecJSONResponse(
+            self.content, status_code=201, headers={"X-Test": "yes"}, codec=codec
+        )
+        assert response.codec is codec
+        assert json.loads(response.body) == self.content
+        assert response.status_code == 201
+        assert response.headers["X-Test"] == "yes"
@@ -0,0 +1,205 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from asymmetric.codecs import JSONCodec, get_codec
+from asymmetric.errors import InvalidChunkSizeError, InvalidStreamingFormatError
+from asymmetric.responses import EncodedStreamingResponse
+from asymmetric.streaming import (
+    chunked_response,
+    encode_chunks,
+    encode_incrementally,
+    iterate_chunks,
+    pull_chunk,
+    split_chunks,
+    stream_items,
+    streaming_response,
+    validate_chunk_size,
+    validate_streaming_format,
+)
+
+
+async def collect(iterator):
+    return [item async for item in iterator]
+
+
+async def async_chunks(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+class TestValidateStreamingFormat:
+    def test_valid_streaming_formats(self):
+        validate_streaming_format("ndjson")
+        validate_streaming_format("array")
+
+    def test_invalid_streaming_format(self):
+        with pytest.raises(InvalidStreamingFormatError):
+            validate_streaming_format("xml")
+
+
+class TestPullChunk:
+    def test_pull_chunk(self):
+        items = iter(range(5))
+        assert pull_chunk(items, 3) == [0, 1, 2]
+        assert pull_chunk(items, 3) == [3, 4]
+        assert pull_chunk(items, 3) == []
+
+
+class TestIterateChunks:
+    @pytest.mark.asyncio
+    async def test_sync_iterate_chunks(self):
+        chunks = await collect(iterate_chunks(iter(range(100))))
+        assert [item for chunk in chunks for item in chunk] == list(range(100))
+        assert len(chunks) > 1
+
+    @pytest.mark.asyncio
+    async def test_executor_iterate_chunks(self):
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            chunks = await collect(iterate_chunks(iter(range(10)), executor))
+        assert chunks == [list(range(10))]
+
+    @pytest.mark.asyncio
+    async def test_async_iterate_chunks(self):
+        async def items():
+            for item in range(3):
+                yield item
+
+        chunks = await collect(iterate_chunks(items()))
+        assert chunks == [[0, 1, 2]]
+
+    @pytest.mark.asyncio
+    async def test_big_async_iterate_chunks(self):
+        async def items():
+            for item in range(1000):
+                yield item
+
+        chunks = await collect(iterate_chunks(items()))
+        assert [item for chunk in chunks for item in chunk] == list(range(1000))
+        assert len(chunks) == 16
+
+    @pytest.mark.asyncio
+    async def test_slow_async_iterate_chunks(self):
+        async def items():
+            yield 0
+            yield 1
+            await asyncio.sleep(0.01)
+            yield 2
+
+        chunks = await collect(iterate_chunks(items()))
+        assert chunks == [[0, 1], [2]]
+
+
+class TestEncodeChunks:
+    def setup_method(self):
+        self.codec = JSONCodec()
+
+    @pytest.mark.asyncio
+    async def test_ndjson_encode_chunks(self):
+        chunks = async_chunks([{"a": 1}, {"b": 2}], [{"c": 3}])
+        encoded = b"".join(await collect(encode_chunks(chunks, self.codec, "ndjson")))
+        assert encoded == b'{"a":1}\n{"b":2}\n{"c":3}\n'
+
+    @pytest.mark.asyncio
+    async def test_array_encode_chunks(self):
+        chunks = async_chunks([{"a": 1}, {"b": 2}], [{"c": 3}])
+        encoded = b"".join(await collect(encode_chunks(chunks, self.codec, "array")))
+        assert json.loads(encoded) == [{"a": 1}, {"b": 2}, {"c": 3}]
+
+    @pytest.mark.asyncio
+    async def test_empty_array_encode_chunks(self):
+        encoded = b"".join(
+            await collect(encode_chunks(async_chunks(), self.codec, "array"))
+        )
+        assert encoded == b"[]"
+
+
+class TestStreamItems:
+    def setup_method(self):
+        self.closed = False
+
+    def generator(self, fail=False):
+        try:
+            yield 1
+            if fail:
+                raise ValueError("Failed!")
+            yield 2
+        finally:
+            self.closed = True
+
+    @pytest.mark.asyncio
+    async def test_stream_items(self):
+        encoded = await collect(stream_items(self.generator(), JSONCodec(), "ndjson"))
+        assert b"".join(encoded) == b"1\n2\n"
+        assert self.closed is True
+
+    @pytest.mark.asyncio
+    async def test_failing_stream_items(self):
+        encoded = await collect(
+            stream_items(self.generator(fail=True), JSONCodec(), "array")
+        )
+        assert b"".join(encoded) == b""
+        assert self.closed is True
+
+    def test_streaming_response_media_type(self):
+        ndjson = streaming_response(iter([]), JSONCodec())
+        array = streaming_response(iter([]), JSONCodec(), stream="array")
+        assert ndjson.media_type == "application/x-ndjson"
+        assert array.media_type == "application/json"
+
+
+class TestValidateChunkSize:
+    def test_valid_chunk_sizes(self):
+        validate_chunk_size(None)
+        validate_chunk_size(1024)
+
+    def test_invalid_chunk_sizes(self):
+        for chunk_size in (0, -1, 1.5):
+            with pytest.raises(InvalidChunkSizeError):
+                validate_chunk_size(chunk_size)
+
+
+class TestEncodeIncrementally:
+    def setup_method(self):
+        self.data = {
+            "rows": [{"id": index, "tags": ["a", "b"]} for index in range(200)],
+            "flat": list(range(100)),
+            1: "non string key",
+            "empty": {},
+        }
+
+    def test_encode_incrementally(self):
+        for codec in (JSONCodec(), get_codec()):
+            pieces = list(encode_incrementally(self.data, codec))
+            assert len(pieces) > 1
+            assert json.loads(b"".join(pieces)) == json.loads(json.dumps(self.data))
+
+    def test_encode_inline(self):
+        assert list(encode_incrementally([1, 2, 3], JSONCodec())) == [b"[1,2,3]"]
+
+    def test_split_chunks(self):
+        chunks = list(split_chunks(iter([b"abc", b"d", b"efghij", b"k"]), 4))
+        assert chunks == [b"abcd", b"efgh", b"ijk"]
+
+
+class TestChunkedResponse:
+    @pytest.mark.asyncio
+    async def test_single_chunk_response(self):
+        response = await chunked_response({"a": [1, 2]}, JSONCodec(), 1024)
+        assert not isinstance(response, EncodedStreamingResponse)
+        assert response.body == b'{"a":[1,2]}'
+
+    @pytest.mark.asyncio
+    async def test_chunked_response(self):
+        data = [{"index": index} for index in range(1000)]
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            response = await chunked_response(
+                data, JSONCodec(), 256, status_code=201, executor=executor
+            )
+            chunks = await collect(response.body_iterator)
+        assert isinstance(response, EncodedStreamingResponse)
+        assert response.status_code == 201
+        assert all(len(chunk) == 256 for chunk in chunks[:-1])
+        assert json.loads(b"".join(chunks)) == data
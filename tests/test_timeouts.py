@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from asymmetric.errors import CallTimeoutError, InvalidTimeoutError
+from asymmetric.plans import get_call_plan
+from asymmetric.timeouts import validate_timeout, with_timeout
+
+
+class TestValidateTimeout:
+    def test_valid_timeout(self):
+        async def function():
+            pass
+
+        validate_timeout(None, get_call_plan(lambda: None), run_in="loop")
+        validate_timeout(1, get_call_plan(lambda: None))
+        validate_timeout(0.5, get_call_plan(lambda: None), run_in="thread")
+        validate_timeout(0.5, get_call_plan(function), run_in="loop")
+
+    @pytest.mark.parametrize("timeout", [0, -1, "1", True])
+    def test_invalid_timeout(self, timeout):
+        with pytest.raises(InvalidTimeoutError):
+            validate_timeout(timeout, get_call_plan(lambda: None))
+
+    def test_uninterruptible_function(self):
+        def generator():
+            yield 1
+
+        with pytest.raises(InvalidTimeoutError):
+            validate_timeout(1, get_call_plan(generator))
+        with pytest.raises(InvalidTimeoutError):
+            validate_timeout(1, get_call_plan(lambda: None), run_in="loop")
+
+
+class TestWithTimeout:
+    @pytest.mark.asyncio
+    async def test_in_time(self):
+        assert await with_timeout(asyncio.sleep(0, result=3), 1) == 3
+        assert await with_timeout(asyncio.sleep(0, result=3), None) == 3
+
+    @pytest.mark.asyncio
+    async def test_timed_out(self):
+        cancelled = asyncio.Event()
+
+        async def stuck():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with pytest.raises(CallTimeoutError) as error:
+            await with_timeout(stuck(), 0.0125)
+        assert cancelled.is_set()
+        assert "more than 0.0125 seconds" in str(error.value)
@@ -1,14 +1,21 @@
 import asyncio
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 from starlette.requests import Request
 
+from asymmetric.codecs import get_codec
 from asymmetric.errors import (
+    CallTimeoutError,
     DuplicatedEndpointError,
+    EndpointOverloadedError,
     InvalidCallbackHeadersError,
     InvalidCallbackObjectError,
 )
+from asymmetric.plans import get_call_plan
 from asymmetric.utils import (
     filter_params,
     generic_call,
@@ -37,9 +44,50 @@ class TestGenericCall:
         value = await generic_call(self.async_generic_call, self.params)
         assert value == 10
 
+    @pytest.mark.asyncio
+    async def test_planned_generic_call(self):
+        sync_plan = get_call_plan(self.sync_generic_call)
+        async_plan = get_call_plan(self.async_generic_call)
+        sync_value = await generic_call(
+            self.sync_generic_call, self.params, plan=sync_plan
+        )
+        async_value = await generic_call(
+            self.async_generic_call, self.params, plan=async_plan
+        )
+        assert sync_value == 10
+        assert async_value == 10
+
+    @pytest.mark.asyncio
+    async def test_executor_generic_call(self):
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            thread = await generic_call(threading.current_thread, {}, executor=executor)
+            value = await generic_call(
+                self.sync_generic_call, self.params, executor=executor
+            )
+        assert thread is not threading.current_thread()
+        assert value == 10
+
+    @pytest.mark.asyncio
+    async def test_timed_out_generic_call(self):
+        with pytest.raises(CallTimeoutError):
+            await generic_call(self.async_generic_call, self.params, timeout=0.001)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            with pytest.raises(CallTimeoutError):
+                await generic_call(
+                    self.blocking_call,
+                    {"seconds": 0.1},
+                    executor=executor,
+                    timeout=0.01,
+                )
+        value = await generic_call(self.async_generic_call, self.params, timeout=1)
+        assert value == 10
+
     def sync_generic_call(self, x, y, z):
         return x * (y + z)
 
+    def blocking_call(self, seconds):
+        time.sleep(seconds)
+
     async def async_generic_call(self, x, y, z):
         await asyncio.sleep(self.artificial_delay)
         return x * (y + z)
@@ -67,6 +115,17 @@ class TestHandleError:
         assert json.loads(response.body)["message"] == self.message
         assert response.status_code == 500
 
+    def test_status_code_error_handling(self):
+        endpoint_overloaded_error = EndpointOverloadedError(self.message)
+        response = handle_error(endpoint_overloaded_error)
+        assert json.loads(response.body)["message"] == self.message
+        assert response.status_code == 503
+
+    def test_timeout_error_handling(self):
+        response = handle_error(CallTimeoutError(self.message))
+        assert json.loads(response.body)["message"] == self.message
+        assert response.status_code == 504
+
 
 class TestFilterParams:
     def setup_method(self):
@@ -119,6 +178,22 @@ class TestFilterParams:
         assert params == {}
         assert params_subset == {}
 
+    def test_planned_params_filter(self):
+        """Tests that the call plan gets used to filter the params."""
+        plan = get_call_plan(self.function)
+        kwargs_plan = get_call_plan(self.function_kwargs)
+        no_params_plan = get_call_plan(self.function_no_params)
+        params = filter_params(self.function, self.params_superset, plan=plan)
+        kwargs_params = filter_params(
+            self.function_kwargs, self.params_superset, plan=kwargs_plan
+        )
+        no_params = filter_params(
+            self.function_no_params, self.params_superset, plan=no_params_plan
+        )
+        assert params == {"x": 5, "y": 6, "z": 7}
+        assert kwargs_params == self.params_superset
+        assert no_params == {}
+
 
 class TestGetBody:
     def setup_method(self):
@@ -136,6 +211,11 @@ class TestGetBody:
         body = await get_body(self.json_request)
         assert body == {"message": "This is a test!"}
 
+    @pytest.mark.asyncio
+    async def test_get_body_with_codec(self):
+        body = await get_body(self.json_request, codec=get_codec())
+        assert body == {"message": "This is a test!"}
+
     @pytest.mark.asyncio
     async def test_get_empty_body(self):
         body = await get_body(self.empty_request)